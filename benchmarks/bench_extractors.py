@@ -0,0 +1,104 @@
+"""Compare the link extractors speed on resources/webscraper.io.html scaled up to large pages.
+
+Usage:
+    python -m benchmarks.bench_extractors [--scales 1 10 100 1000] [--repeat 3]
+"""
+
+import argparse
+import os
+import re
+import time
+
+from tabulate import tabulate
+
+from src import fast_extractor, lxml_extractor, stream_extractor
+from src.scrapper import get_links_with_regex
+
+SEED_PAGE_PATH = os.path.join(os.path.dirname(__file__), os.pardir, "resources", "webscraper.io.html")
+
+
+def build_page(scale: int) -> str:
+    """Build a page by repeating the seed page body.
+
+    Args:
+        scale: The number of times the body is repeated
+
+    Returns:
+        The page content
+    """
+    with open(SEED_PAGE_PATH, "r") as file_handle:
+        seed_page = file_handle.read()
+
+    match = re.search(r"(<body[^\>]*>)([\s\S]*)(<\/body>)", seed_page)
+    return seed_page[: match.start(2)] + match.group(2) * scale + seed_page[match.end(2) :]
+
+
+def get_links_with_streaming(page_content: str, chunk_size: int = 64 * 1024) -> list:
+    """Extract the links by feeding the page by chunks to the streaming extractor
+
+    Args:
+        page_content: The page content
+        chunk_size: The chunk size
+
+    Returns:
+        The list of links
+    """
+    chunks = (page_content[start : start + chunk_size] for start in range(0, len(page_content), chunk_size))
+    return list(stream_extractor.iter_links(chunks))
+
+
+EXTRACTORS = {
+    "regex": get_links_with_regex,
+    "fast": fast_extractor.get_links,
+    "lxml": lxml_extractor.get_links,
+    "streaming": get_links_with_streaming,
+}
+
+
+def bench(extract_links, page_content: str, repeat: int) -> tuple:
+    """Time an extractor
+
+    Args:
+        extract_links: The extractor function
+        page_content: The page content
+        repeat: The number of runs (the best one is kept)
+
+    Returns:
+        (best time in secs, number of links found)
+    """
+    best_time_sec = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        links = extract_links(page_content)
+        best_time_sec = min(best_time_sec, time.perf_counter() - start)
+
+    return best_time_sec, len(links)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100, 1000], help="Page scales")
+    arg_parser.add_argument("--repeat", type=int, default=3, help="Runs per measure (the best one is kept)")
+    args = arg_parser.parse_args()
+
+    rows = []
+    for scale in args.scales:
+        page_content = build_page(scale)
+        for name, extract_links in EXTRACTORS.items():
+            time_sec, links_cnt = bench(extract_links, page_content, args.repeat)
+            rows.append(
+                [
+                    scale,
+                    f"{len(page_content) / 1e6:.2f}",
+                    name,
+                    links_cnt,
+                    f"{time_sec * 1000:.1f}",
+                    f"{len(page_content) / 1e6 / time_sec:.1f}",
+                ]
+            )
+
+    print(tabulate(rows, headers=["Scale", "Page (MB)", "Extractor", "Links", "Time (ms)", "MB/s"]))
+
+
+if __name__ == "__main__":
+    main()
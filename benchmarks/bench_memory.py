@@ -0,0 +1,161 @@
+"""Compare the memory used by the visited index and the dead links list on a synthetic crawl.
+
+The synthetic crawl has --links links spread on --hosts hosts, found on pages of --links_per_page links, and one
+link out of --dead_every is dead. Each storage is filled by the crawl links and its memory is measured with
+tracemalloc (only the memory still held once it is filled is counted). tracemalloc slows the allocations down, a
+million links take a few minutes.
+
+Storages:
+    visited index: the previous layout (a set of the canonical urls), the host prefix layout (VisitedIndex) and the
+                   fingerprints (VisitedIndex(compact=True))
+    dead links: the previous layout (a list of DeadLink with a reason formatted for each link) and DeadLinkList
+
+Usage:
+    python -m benchmarks.bench_memory [--links 1000000] [--hosts 200] [--dead_every 20]
+"""
+
+import argparse
+import gc
+import tracemalloc
+from typing import Callable, Iterator, Tuple
+
+from tabulate import tabulate
+
+from src.crawler import get_bad_status_reason
+from src.dead_links import DeadLinkList
+from src.reporters import DeadLink
+from src.url_index import VisitedIndex, canonicalize_url
+
+# (status code, reason phrase) of the dead links, None for a connection error
+DEAD_LINK_STATUSES = ((404, "Not Found"), (404, "Not Found"), (410, "Gone"), (500, "Internal Server Error"), None)
+
+
+def iter_links(links_cnt: int, hosts_cnt: int, links_per_page: int) -> Iterator[Tuple[str, str]]:
+    """Generate the links of the synthetic crawl
+
+    Args:
+        links_cnt: The number of links
+        hosts_cnt: The number of hosts
+        links_per_page: The number of links found on each page
+
+    Returns:
+        The (link, page where it was found) of the links. The links of a page share the same page string, like
+        in a crawl
+    """
+    page = None
+    for index in range(links_cnt):
+        if index % links_per_page == 0:
+            page = f"https://www.host{index % hosts_cnt}.example.com/pages/{index // links_per_page}/index.html"
+        yield (
+            f"https://www.host{index % hosts_cnt}.example.com/docs/section-{index % 97}/article-{index}.html"
+            f"?lang=en&ref={index % 13}"
+        ), page
+
+
+def iter_dead_links(args: argparse.Namespace, get_reason: Callable[[int, str], str]) -> Iterator[DeadLink]:
+    """Generate the dead links of the synthetic crawl
+
+    Args:
+        args: The command line arguments
+        get_reason: Gives the reason of a bad status code from the code and the reason phrase
+
+    Returns:
+        The dead links
+    """
+    for index, (link, page) in enumerate(iter_links(args.links, args.hosts, args.links_per_page)):
+        if index % args.dead_every != 0:
+            continue
+
+        status = DEAD_LINK_STATUSES[(index // args.dead_every) % len(DEAD_LINK_STATUSES)]
+        if status is None:
+            yield DeadLink(link, "Connection error", page, None, 5000.0 + index % 1000 / 10)
+        else:
+            yield DeadLink(link, get_reason(*status), page, status[0], 20.0 + index % 1000 / 10)
+
+
+def fill_set(args: argparse.Namespace) -> set:
+    """The previous visited index layout: a set of the canonical urls"""
+    urls = set()
+    for link, _ in iter_links(args.links, args.hosts, args.links_per_page):
+        urls.add(canonicalize_url(link))
+    return urls
+
+
+def fill_visited_index(args: argparse.Namespace, compact: bool = False) -> VisitedIndex:
+    """The visited index"""
+    visited_index = VisitedIndex(compact)
+    for link, _ in iter_links(args.links, args.hosts, args.links_per_page):
+        visited_index.add(link)
+    return visited_index
+
+
+def fill_dead_links_tuples(args: argparse.Namespace) -> list:
+    """The previous dead links layout: a list of DeadLink with a reason formatted for each link"""
+    return list(iter_dead_links(args, lambda status_code, reason: f"Bad status code: {status_code} '{reason}'"))
+
+
+def fill_dead_link_list(args: argparse.Namespace) -> DeadLinkList:
+    """The dead links list, with the reasons shared by get_bad_status_reason"""
+    dead_links = DeadLinkList()
+    for dead_link in iter_dead_links(args, get_bad_status_reason):
+        dead_links.append(dead_link)
+    return dead_links
+
+
+def measure(fill: Callable[[], object]) -> Tuple[int, int]:
+    """Measure the memory held by a storage
+
+    Args:
+        fill: Creates and fills the storage
+
+    Returns:
+        (bytes held, number of items)
+    """
+    gc.collect()
+    tracemalloc.start()
+    storage = fill()
+    gc.collect()
+    held_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    return held_bytes, len(storage)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--links", type=int, default=1000000, help="Number of links of the crawl")
+    arg_parser.add_argument("--hosts", type=int, default=200, help="Number of hosts")
+    arg_parser.add_argument("--links_per_page", type=int, default=50, help="Number of links found on each page")
+    arg_parser.add_argument("--dead_every", type=int, default=20, help="One link out of dead_every is dead")
+    args = arg_parser.parse_args()
+
+    scenarios = [
+        ("visited index", "set of urls (previous)", lambda: fill_set(args)),
+        ("visited index", "host prefix", lambda: fill_visited_index(args)),
+        ("visited index", "fingerprints (compact)", lambda: fill_visited_index(args, compact=True)),
+        ("dead links", "DeadLink list (previous)", lambda: fill_dead_links_tuples(args)),
+        ("dead links", "DeadLinkList", lambda: fill_dead_link_list(args)),
+    ]
+
+    rows = []
+    reference_bytes_by_storage = {}
+    for storage, layout, fill in scenarios:
+        held_bytes, items_cnt = measure(fill)
+        # The first layout of each storage is the reference
+        reference_bytes = reference_bytes_by_storage.setdefault(storage, held_bytes)
+        rows.append(
+            [
+                storage,
+                layout,
+                items_cnt,
+                f"{held_bytes / 1e6:.1f}",
+                f"{held_bytes / items_cnt:.0f}",
+                f"{(1 - held_bytes / reference_bytes) * 100:.0f}%",
+            ]
+        )
+
+    print(tabulate(rows, headers=["Storage", "Layout", "Items", "Memory (MB)", "Bytes/item", "Reduction"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""Measure the startup time of the main.py subcommands and check the modules they import.
+
+The file and html subcommands are run on offline pages (no external link), so the measure is the interpreter and
+import cost. Each command is also run once in an interpreter that lists the modules loaded by the run: the heavy
+modules (requests, tabulate, lxml, asyncio, ...) must only be imported by the commands that use them.
+
+The command fails (exit code 1) if a command imports a module it should not, or if its median time is above
+--max_ms, so it can guard the startup time in a CI job.
+
+Usage:
+    python -m benchmarks.bench_startup [--repeat 10] [--max_ms 150]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import List
+
+from tabulate import tabulate
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+MAIN_PATH = os.path.join(ROOT_DIR, "main.py")
+
+OFFLINE_PAGE = '<html><body><a href="/about.html">About</a><a href="docs/index.html">Docs</a></body></html>'
+
+# The modules that are slow to import, with the commands allowed to import them
+HEAVY_MODULES = ("requests", "urllib3", "tabulate", "lxml", "asyncio", "multiprocessing")
+
+# Runs main.py (argv[2:]) and prints the heavy modules (argv[1]) it imported
+LIST_MODULES_CODE = """
+import json, runpy, sys
+heavy_modules = set(json.loads(sys.argv[1]))
+sys.argv = sys.argv[2:]
+try:
+    runpy.run_path(sys.argv[0], run_name="__main__")
+except SystemExit:
+    pass
+print(json.dumps(sorted({name.split(".")[0] for name in sys.modules} & heavy_modules)))
+"""
+
+
+def get_commands(page_path: str) -> dict:
+    """Get the benchmarked commands
+
+    Args:
+        page_path: The offline page file path
+
+    Returns:
+        {name: (main.py arguments, stdin content, heavy modules allowed)}
+    """
+    return {
+        "help": (["-h"], None, ()),
+        "file": (["--no_cache", "file", page_path], None, ()),
+        "html": (["--no_cache", "html"], OFFLINE_PAGE, ()),
+        "file --stats": (["--no_cache", "--stats", "file", page_path], None, ("tabulate",)),
+        "file --extractor lxml": (["--no_cache", "--extractor", "lxml", "file", page_path], None, ("lxml",)),
+    }
+
+
+def run_command(command_line: List[str], stdin: str = None) -> float:
+    """Run a command
+
+    Args:
+        command_line: The command line
+        stdin: The stdin content, None for no stdin
+
+    Returns:
+        The wall time in secs
+    """
+    start = time.perf_counter()
+    subprocess.run(command_line, input=stdin, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, text=True)
+    return time.perf_counter() - start
+
+
+def get_heavy_modules(arguments: List[str], stdin: str) -> List[str]:
+    """Get the heavy modules imported by a main.py run
+
+    Args:
+        arguments: The main.py arguments
+        stdin: The stdin content, None for no stdin
+
+    Returns:
+        The heavy modules imported
+    """
+    process = subprocess.run(
+        [sys.executable, "-c", LIST_MODULES_CODE, json.dumps(HEAVY_MODULES), MAIN_PATH, *arguments],
+        input=stdin,
+        capture_output=True,
+        text=True,
+        # main.py imports the src package from the current directory
+        cwd=ROOT_DIR,
+    )
+    return json.loads(process.stdout.splitlines()[-1])
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--repeat", type=int, default=10, help="Runs per command (the median is kept)")
+    arg_parser.add_argument("--max_ms", type=float, default=None, help="Fail if a median time is above this")
+    args = arg_parser.parse_args()
+
+    # The interpreter alone, the part of the startup time that is not ours
+    baseline_sec = statistics.median([run_command([sys.executable, "-c", "pass"]) for _ in range(args.repeat)])
+
+    rows = []
+    failures = []
+    with tempfile.TemporaryDirectory() as directory:
+        page_path = os.path.join(directory, "page.html")
+        with open(page_path, "w") as file_handle:
+            file_handle.write(OFFLINE_PAGE)
+
+        for name, (arguments, stdin, allowed_modules) in get_commands(page_path).items():
+            times_sec = [run_command([sys.executable, MAIN_PATH, *arguments], stdin) for _ in range(args.repeat)]
+            median_ms = statistics.median(times_sec) * 1000
+            unexpected_modules = [
+                module for module in get_heavy_modules(arguments, stdin) if module not in allowed_modules
+            ]
+
+            rows.append(
+                [
+                    name,
+                    f"{median_ms:.1f}",
+                    f"{min(times_sec) * 1000:.1f}",
+                    f"{median_ms - baseline_sec * 1000:.1f}",
+                    ", ".join(unexpected_modules) or "-",
+                ]
+            )
+            if unexpected_modules:
+                failures.append(f"{name} imports {', '.join(unexpected_modules)}")
+            if args.max_ms is not None and median_ms > args.max_ms:
+                failures.append(f"{name} takes {median_ms:.1f} ms (max {args.max_ms} ms)")
+
+    print(f"Interpreter startup: {baseline_sec * 1000:.1f} ms")
+    print(tabulate(rows, headers=["Command", "Median (ms)", "Min (ms)", "Over interpreter (ms)", "Unexpected imports"]))
+
+    if failures:
+        print("\n".join(failures), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+"""Local http server serving a synthetic site, to benchmark the crawler without the network.
+
+The pages form a tree: page i links to the pages i * fan_out + 1 to i * fan_out + fan_out (up to the max depth and
+the number of pages), to the root page (a shared link), and to dead_ratio * fan_out missing pages (404).
+Each page is padded up to page_kb with text (synthetic profile) or with the body of resources/webscraper.io.html
+(webscraper profile, its absolute links are served by the mock server too).
+
+Usage:
+    python -m benchmarks.mock_server [--port 8000] [--pages 1000] [--fan_out 10] [--depth 5] [--latency_ms 0]
+                                     [--dead_ratio 0.1] [--page_kb 20] [--profile synthetic]
+"""
+
+import argparse
+import os
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Tuple
+
+SEED_PAGE_PATH = os.path.join(os.path.dirname(__file__), os.pardir, "resources", "webscraper.io.html")
+PROFILES = ("synthetic", "webscraper")
+
+FILLER_PARAGRAPH = "<p>Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod tempor incididunt.</p>\n"
+
+
+class SiteConfig:
+    def __init__(
+        self,
+        pages: int = 1000,
+        fan_out: int = 10,
+        depth: int = 5,
+        latency_ms: float = 0,
+        dead_ratio: float = 0.1,
+        page_kb: float = 20,
+        profile: str = "synthetic",
+    ) -> None:
+        """Init the synthetic site configuration.
+
+        Args:
+            pages: The maximum number of pages
+            fan_out: The number of child pages linked by each page
+            depth: The maximum depth of the pages (the root page has a depth of 0)
+            latency_ms: The time the server waits before answering each request
+            dead_ratio: The number of dead links of each page, relative to fan_out
+            page_kb: The minimum size of each page
+            profile: How the pages are padded (one of PROFILES)
+        """
+        self.pages = pages
+        self.fan_out = fan_out
+        self.depth = depth
+        self.latency_ms = latency_ms
+        self.dead_ratio = dead_ratio
+        self.page_kb = page_kb
+        self.profile = profile
+
+    @property
+    def pages_cnt(self) -> int:
+        """Get the number of pages of the site
+
+        Returns:
+            The number of pages within the max depth
+        """
+        pages_cnt, level_cnt = 0, 1
+        for _ in range(self.depth + 1):
+            pages_cnt += level_cnt
+            level_cnt *= self.fan_out
+            if pages_cnt >= self.pages:
+                return self.pages
+
+        return pages_cnt
+
+    def to_dict(self) -> dict:
+        return dict(vars(self), pages_cnt=self.pages_cnt)
+
+
+class SyntheticSite:
+    def __init__(self, config: SiteConfig, base_url: str = "") -> None:
+        """Init the site pages generator.
+
+        Args:
+            config: The site configuration
+            base_url: The server url, used for the absolute links of the webscraper profile
+        """
+        self.config = config
+        self.base_url = base_url
+        self.__padding = None
+
+    def get_page(self, path: str) -> Optional[str]:
+        """Get the content of a page
+
+        Args:
+            path: The request path
+
+        Returns:
+            The page content, None if the page does not exist
+        """
+        if path in ("", "/", "/index.html"):
+            return self.render_page(0)
+
+        if path.startswith("/ext/"):
+            # The external links of the webscraper profile
+            return "<html><body>external</body></html>"
+
+        match = re.fullmatch(r"/p(\d+)\.html", path)
+        if match is None or int(match.group(1)) >= self.config.pages_cnt:
+            return None
+
+        return self.render_page(int(match.group(1)))
+
+    def render_page(self, index: int) -> str:
+        """Render a page of the site
+
+        Args:
+            index: The page index (0 for the root page)
+
+        Returns:
+            The page content
+        """
+        config = self.config
+        first_child = index * config.fan_out + 1
+        children = range(first_child, min(first_child + config.fan_out, config.pages_cnt))
+        dead_links_cnt = round(config.fan_out * config.dead_ratio)
+
+        links = [f'<a href="/p{child}.html">page {child}</a>' for child in children]
+        links.append('<a href="/">home</a>')
+        links.extend(
+            f'<a href="/missing/p{index}_{dead_index}.html">missing</a>' for dead_index in range(dead_links_cnt)
+        )
+
+        title = f"<html><head><title>Page {index}</title></head>"
+        return f"{title}<body>\n{' '.join(links)}\n{self._get_padding()}</body></html>\n"
+
+    def _get_padding(self) -> str:
+        """Get the text added to each page to reach the page weight
+
+        Returns:
+            The padding
+        """
+        if self.__padding is None:
+            if self.config.profile == "webscraper":
+                with open(SEED_PAGE_PATH, "r") as file_handle:
+                    seed_body = re.search(r"<body[^\>]*>([\s\S]*)<\/body>", file_handle.read()).group(1)
+                # The external links point to the mock server, so the benchmark does not depend on the network
+                unit = re.sub(r"https?://", f"{self.base_url}/ext/", seed_body)
+            else:
+                unit = FILLER_PARAGRAPH
+
+            repeat = max(1, int(self.config.page_kb * 1024 / len(unit)) + 1) if self.config.page_kb > 0 else 0
+            self.__padding = unit * repeat
+
+        return self.__padding
+
+
+def _create_handler(site: SyntheticSite) -> type:
+    """Create the request handler class of a site
+
+    Args:
+        site: The site
+
+    Returns:
+        The handler class
+    """
+
+    class SyntheticSiteHandler(BaseHTTPRequestHandler):
+        # Keep-alive, like a real web server. The headers and the body are sent by separate writes, Nagle's
+        # algorithm would delay the body until the client acknowledges the headers (up to 40ms)
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def do_GET(self) -> None:
+            self._answer(send_body=True)
+
+        def do_HEAD(self) -> None:
+            self._answer(send_body=False)
+
+        def _answer(self, send_body: bool) -> None:
+            if site.config.latency_ms > 0:
+                time.sleep(site.config.latency_ms / 1000)
+
+            # The crawler builds the internal links by appending them to the page url (//p1.html)
+            page = site.get_page("/" + self.path.lstrip("/"))
+            body = (page if page is not None else "<html><body>Not found</body></html>").encode()
+
+            self.send_response(200 if page is not None else 404)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            if send_body:
+                self.wfile.write(body)
+
+        def log_message(self, format: str, *args) -> None:
+            # The access logs would slow down the server and flood the benchmark output
+            pass
+
+    return SyntheticSiteHandler
+
+
+def start_server(config: SiteConfig, port: int = 0) -> Tuple[ThreadingHTTPServer, str]:
+    """Start the mock server in a background thread
+
+    Args:
+        config: The site configuration
+        port: The port (0 for a free one)
+
+    Returns:
+        (server, base url). Call server.shutdown() to stop it
+    """
+    site = SyntheticSite(config)
+    server = ThreadingHTTPServer(("127.0.0.1", port), _create_handler(site))
+    server.daemon_threads = True
+    site.base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    return server, site.base_url
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--port", type=int, default=8000, help="Server port")
+    arg_parser.add_argument("--pages", type=int, default=1000, help="Maximum number of pages")
+    arg_parser.add_argument("--fan_out", type=int, default=10, help="Child pages linked by each page")
+    arg_parser.add_argument("--depth", type=int, default=5, help="Maximum depth of the pages")
+    arg_parser.add_argument("--latency_ms", type=float, default=0, help="Latency of each request")
+    arg_parser.add_argument("--dead_ratio", type=float, default=0.1, help="Dead links per page, relative to fan_out")
+    arg_parser.add_argument("--page_kb", type=float, default=20, help="Minimum size of each page")
+    arg_parser.add_argument("--profile", choices=PROFILES, default="synthetic", help="Page padding profile")
+    args = arg_parser.parse_args()
+
+    config = SiteConfig(
+        args.pages, args.fan_out, args.depth, args.latency_ms, args.dead_ratio, args.page_kb, args.profile
+    )
+    server, base_url = start_server(config, args.port)
+    print(f"Serving {config.pages_cnt} pages on {base_url} (Ctrl+C to stop)")
+
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+"""Measure the crawl pipeline throughput and peak memory on synthetic sites served by the local mock server.
+
+Scenarios:
+    get_links: Scraper.get_links on a generated page, for each extractor
+    web_crawler: WebCrawler on the mock server site (sequential and concurrent)
+    file_crawler: FileCrawler on the site pages written to files, read as text or memory mapped (the links are
+                  checked on the mock server)
+
+Each scenario runs on the synthetic profile and on the webscraper profile (resources/webscraper.io.html body).
+The results are printed and written as json, which can be compared with a previous run.
+
+Usage:
+    python -m benchmarks.run_benchmarks [--pages 200] [--repeat 3] [--output results.json] [--compare baseline.json]
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, List, Optional
+
+from tabulate import tabulate
+
+from benchmarks.mock_server import PROFILES, SiteConfig, SyntheticSite, start_server
+from src.file_crawler import FileCrawler
+from src.file_scrapper import FileScrapper
+from src.html_scraper import HTMLScrapper
+from src.http_client import configure_client
+from src.link_status_cache import configure_cache
+from src.link_status_store import configure_status_store
+from src.page_store import configure_page_store
+from src.reporters import configure_reporter
+from src.scrapper import EXTRACTORS, Scraper
+from src.web_crawler import WebCrawler
+
+
+def measure(run: Callable[[], int], repeat: int) -> dict:
+    """Time a scenario, then measure its peak memory
+
+    Args:
+        run: The scenario, returns the number of processed items
+        repeat: The number of timed runs (the best one is kept)
+
+    Returns:
+        The measures
+    """
+    best_time_sec = float("inf")
+    for _ in range(repeat):
+        _reset_shared_services()
+        start = time.perf_counter()
+        items_cnt = run()
+        best_time_sec = min(best_time_sec, time.perf_counter() - start)
+
+    # tracemalloc slows down the run, so the memory is measured by a separate run
+    _reset_shared_services()
+    tracemalloc.start()
+    try:
+        run()
+        _, peak_bytes = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "items": items_cnt,
+        "time_sec": best_time_sec,
+        "items_per_sec": items_cnt / best_time_sec if best_time_sec > 0 else 0.0,
+        "peak_mb": peak_bytes / 1e6,
+    }
+
+
+def _reset_shared_services() -> None:
+    """Give each run the same state as a new command line run (no cache, no stores reuse)"""
+    configure_client()
+    configure_cache(None)
+    configure_page_store(None)
+    configure_status_store(True)
+    configure_reporter("table")
+
+
+def bench_get_links(site: SyntheticSite, repeat: int) -> List[dict]:
+    """Benchmark Scraper.get_links on a site page, with each extractor
+
+    Args:
+        site: The site
+        repeat: The number of timed runs
+
+    Returns:
+        The results
+    """
+    page_content = site.render_page(0)
+    runs_cnt = 200
+
+    results = []
+    for extractor in EXTRACTORS:
+
+        def run() -> int:
+            for _ in range(runs_cnt):
+                HTMLScrapper.get_links(page_content, False)
+            return runs_cnt
+
+        default_extractor = Scraper.extractor
+        Scraper.extractor = extractor
+        try:
+            results.append({"scenario": "get_links", "variant": extractor, **measure(run, repeat)})
+        finally:
+            Scraper.extractor = default_extractor
+
+    return results
+
+
+def bench_web_crawler(base_url: str, repeat: int) -> List[dict]:
+    """Benchmark WebCrawler on the mock server site
+
+    Args:
+        base_url: The mock server url
+        repeat: The number of timed runs
+
+    Returns:
+        The results
+    """
+    results = []
+    for concurrency in (1, 8):
+
+        def run() -> int:
+            crawler = WebCrawler(base_url, False, 0, False, concurrency)
+            crawler.crawl()
+            return crawler.crawled_pages_cnt
+
+        results.append({"scenario": "web_crawler", "variant": f"concurrency={concurrency}", **measure(run, repeat)})
+
+    return results
+
+
+def bench_file_crawler(site: SyntheticSite, pages_cnt: int, repeat: int) -> List[dict]:
+    """Benchmark FileCrawler on the site pages written to files
+
+    Args:
+        site: The site
+        pages_cnt: The number of files
+        repeat: The number of timed runs
+
+    Returns:
+        The results
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        paths = []
+        for index in range(pages_cnt):
+            path = os.path.join(directory, f"p{index}.html")
+            # The links are made absolute, so the file crawler checks them on the mock server
+            with open(path, "w") as file_handle:
+                file_handle.write(site.render_page(index).replace('href="/', f'href="{site.base_url}/'))
+            paths.append(path)
+
+        def run() -> int:
+            for path in paths:
+                FileCrawler(path, False).crawl()
+            return len(paths)
+
+        results = []
+        for use_mmap in (False, True):
+            FileScrapper.use_mmap = use_mmap
+            try:
+                results.append(
+                    {"scenario": "file_crawler", "variant": "mmap" if use_mmap else "text", **measure(run, repeat)}
+                )
+            finally:
+                FileScrapper.use_mmap = False
+
+        return results
+
+
+def get_git_commit() -> Optional[str]:
+    """Get the commit of the benchmarked code
+
+    Returns:
+        The commit hash, None outside of a git repository
+    """
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def print_results(results: List[dict], baseline: Optional[dict]) -> None:
+    """Print the results, with the speedup against the baseline results
+
+    Args:
+        results: The results
+        baseline: The results of a previous run (None to skip the comparison)
+    """
+    baseline_results = {}
+    if baseline is not None:
+        baseline_results = {
+            (result["profile"], result["scenario"], result["variant"]): result for result in baseline["results"]
+        }
+
+    rows = []
+    for result in results:
+        row = [
+            result["profile"],
+            result["scenario"],
+            result["variant"],
+            result["items"],
+            f"{result['time_sec']:.3f}",
+            f"{result['items_per_sec']:.1f}",
+            f"{result['peak_mb']:.2f}",
+        ]
+        baseline_result = baseline_results.get((result["profile"], result["scenario"], result["variant"]))
+        if baseline is not None:
+            row.append(
+                f"x{result['items_per_sec'] / baseline_result['items_per_sec']:.2f}"
+                if baseline_result and baseline_result["items_per_sec"]
+                else "-"
+            )
+        rows.append(row)
+
+    headers = ["Profile", "Scenario", "Variant", "Items", "Time (s)", "Items/s", "Peak (MB)"]
+    if baseline is not None:
+        headers.append("Speedup")
+    print(tabulate(rows, headers=headers))
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--pages", type=int, default=200, help="Number of pages of the synthetic sites")
+    arg_parser.add_argument("--fan_out", type=int, default=10, help="Child pages linked by each page")
+    arg_parser.add_argument("--depth", type=int, default=5, help="Maximum depth of the pages")
+    arg_parser.add_argument("--latency_ms", type=float, default=0, help="Latency of each request")
+    arg_parser.add_argument("--dead_ratio", type=float, default=0.1, help="Dead links per page, relative to fan_out")
+    arg_parser.add_argument("--page_kb", type=float, default=20, help="Minimum size of each page")
+    arg_parser.add_argument("--profiles", nargs="+", choices=PROFILES, default=list(PROFILES), help="Page profiles")
+    arg_parser.add_argument("--repeat", type=int, default=3, help="Runs per measure (the best one is kept)")
+    arg_parser.add_argument("--output", default="benchmark_results.json", help="Json results file")
+    arg_parser.add_argument("--compare", help="Json results file of a previous run to compare with")
+    args = arg_parser.parse_args()
+
+    results = []
+    for profile in args.profiles:
+        config = SiteConfig(
+            args.pages, args.fan_out, args.depth, args.latency_ms, args.dead_ratio, args.page_kb, profile
+        )
+        server, base_url = start_server(config)
+        try:
+            site = SyntheticSite(config, base_url)
+            profile_results = [
+                *bench_get_links(site, args.repeat),
+                *bench_web_crawler(base_url, args.repeat),
+                *bench_file_crawler(site, min(config.pages_cnt, 20), args.repeat),
+            ]
+        finally:
+            server.shutdown()
+
+        results.extend({"profile": profile, "site": config.to_dict(), **result} for result in profile_results)
+
+    baseline = None
+    if args.compare is not None:
+        with open(args.compare, "r") as file_handle:
+            baseline = json.load(file_handle)
+
+    print_results(results, baseline)
+
+    with open(args.output, "w") as file_handle:
+        json.dump(
+            {
+                "commit": get_git_commit(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "results": results,
+            },
+            file_handle,
+            indent=2,
+        )
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
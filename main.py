@@ -1,16 +1,50 @@
+import os
 import re
 import sys
 import logging
 import argparse
-from tabulate import tabulate
-from typing import List, Callable
+import functools
+from typing import List, Callable, Optional, TextIO, Tuple
+
+from src.checkpoint import DEFAULT_CHECKPOINT_DIR, get_checkpoint_path
+from src.crawler import Crawler, CrawlerException, LIVENESS_CHECKS
+from src.http_client import HTML_CONTENT_TYPES, configure_client
+from src.link_status_cache import DEFAULT_CACHE_PATH, configure_cache, get_cache
+from src.link_status_store import configure_status_store
+from src.politeness import HostScheduler
+from src.page_store import DEFAULT_PAGE_STORE_PATH, configure_page_store, get_page_store
+from src.snapshot_store import DEFAULT_SNAPSHOT_PATH, configure_snapshot_store, get_snapshot_store
+from src.stats import configure_stats, dump_stats, get_stats
+from src.reporters import REPORT_FORMATS, configure_reporter, get_reporter
+from src.scrapper import EXTRACTORS, Scraper
+from src.file_crawler import HTML_FILE_EXTENSIONS, FileCrawler, find_files
+from src.file_scrapper import FileScrapper
+from src.shared_frontier import DEFAULT_FRONTIER_PATH, SharedFrontier, remove_shared_frontier
+
+# The modules only used by some subcommands (requests, asyncio, tabulate, lxml, multiprocessing, ...) are imported
+# where they are used, so the file and html subcommands (called once per file by the hooks) start faster. See
+# benchmarks/bench_startup.py
+logger = logging.getLogger(__name__)
 
-from src.crawler import Crawler, CrawlerException
-from src.file_crawler import FileCrawler
-from src.web_crawler import WebCrawler
-from src.html_crawler import HTMLCrawler
 
-logger = logging.getLogger(__name__)
+# Pure function
+def _parse_host_rps_override(value: str) -> Tuple[str, float]:
+    """Parse a --host_rps_override argument.
+
+    Args:
+        value: The HOST=RPS string
+
+    Raises:
+        argparse.ArgumentTypeError if the value is invalid
+
+    Returns:
+        (host, requests per second)
+    """
+    host, _, requests_per_sec = value.partition("=")
+    try:
+        return host.strip().lower(), float(requests_per_sec)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected HOST=RPS, got '{value}'")
 
 
 def _parse_args() -> argparse.Namespace:
@@ -30,9 +64,202 @@ def _parse_args() -> argparse.Namespace:
     arg_parser.add_argument(
         "--throttle_duration_sec",
         type=int,
-        help="Sleep time in secs between each 10 pages (to void rate limiters). only for urls",
+        help="Sleep time in secs between each 10 pages (to void rate limiters, see --host_rps). only for urls",
+        default=0,
+    )
+    arg_parser.add_argument(
+        "--concurrency",
+        type=int,
+        help="Number of concurrent fetchers (1 to crawl sequentially). only for urls",
+        default=1,
+    )
+    arg_parser.add_argument(
+        "--compact_visited_index",
+        action="store_true",
+        help="Store 64 bits url fingerprints instead of urls to bound memory on large crawls. only for urls",
+    )
+    arg_parser.add_argument(
+        "--max_connections_per_host",
+        type=int,
+        help="Size of the keep-alive connection pool of each host",
+        default=10,
+    )
+    arg_parser.add_argument(
+        "--max_retries",
+        type=int,
+        help="Number of retries on connection errors and 502/504 responses",
+        default=2,
+    )
+    arg_parser.add_argument(
+        "--connect_timeout_sec",
+        type=float,
+        help="Time to wait for a connection (0 to wait forever)",
+        default=10,
+    )
+    arg_parser.add_argument(
+        "--read_timeout_sec",
+        type=float,
+        help="Time to wait for each read of a response (0 to wait forever)",
+        default=30,
+    )
+    arg_parser.add_argument(
+        "--body_timeout_sec",
+        type=float,
+        help="Time allowed to download a page body, the body is cut after it (0 for no limit)",
+        default=60,
+    )
+    arg_parser.add_argument(
+        "--max_body_mb",
+        type=float,
+        help="The pages bodies are cut at this size (0 for no limit)",
+        default=10,
+    )
+    arg_parser.add_argument(
+        "--scraped_content_types",
+        nargs="+",
+        help="Content types of the pages that are downloaded and scraped (* for all). The other links are only "
+        "checked",
+        default=list(HTML_CONTENT_TYPES),
+    )
+    arg_parser.add_argument(
+        "--host_rps",
+        type=float,
+        help="Maximum number of requests per second sent to each host (0 for no limit)",
+        default=0,
+    )
+    arg_parser.add_argument(
+        "--host_rps_override",
+        action="append",
+        type=_parse_host_rps_override,
+        metavar="HOST=RPS",
+        help="Maximum number of requests per second sent to a specific host. Can be repeated",
+        default=[],
+    )
+    arg_parser.add_argument(
+        "--host_burst",
+        type=int,
+        help="Number of requests that can be sent at once to an idle host (with --host_rps)",
+        default=1,
+    )
+    arg_parser.add_argument(
+        "--host_max_concurrency",
+        type=int,
+        help="Maximum number of requests sent at the same time to each host (0 for no limit)",
         default=0,
     )
+    arg_parser.add_argument(
+        "--liveness_check",
+        choices=LIVENESS_CHECKS,
+        help="How the links that are not crawled are checked: HEAD request (GET fallback if HEAD is rejected), "
+        "streamed GET closed after the headers or full GET",
+        default="head",
+    )
+    arg_parser.add_argument(
+        "--cache_path",
+        help="Path of the sqlite file caching the links status between runs",
+        default=DEFAULT_CACHE_PATH,
+    )
+    arg_parser.add_argument("--no_cache", action="store_true", help="Check all the links without using the cache")
+    arg_parser.add_argument(
+        "--no_shared_status",
+        action="store_true",
+        help="Check the links of each resource separately instead of once per run. only for lists",
+    )
+    arg_parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only download the pages that changed since the last incremental crawl. only for urls",
+    )
+    arg_parser.add_argument(
+        "--page_store_path",
+        help="Path of the sqlite file storing the pages validators and links for the incremental crawl",
+        default=DEFAULT_PAGE_STORE_PATH,
+    )
+    arg_parser.add_argument(
+        "--since_snapshot",
+        action="store_true",
+        help="Only check the links that appeared on their page since the last snapshot run, plus a rotating sample "
+        "of the others. not for the distributed crawl",
+    )
+    arg_parser.add_argument(
+        "--snapshot_path",
+        help="Path of the sqlite file storing the link set of each page for the snapshot runs",
+        default=DEFAULT_SNAPSHOT_PATH,
+    )
+    arg_parser.add_argument(
+        "--snapshot_sample_ratio",
+        type=float,
+        help="Part of the known links checked again by each snapshot run (0 for none)",
+        default=0.05,
+    )
+    arg_parser.add_argument(
+        "--extractor",
+        choices=EXTRACTORS,
+        help="How the links are extracted: whole page regex, single pass regex (same links, faster), lxml html "
+        "parser or chunk by chunk streaming (bounded memory)",
+        default="fast",
+    )
+    arg_parser.add_argument(
+        "--mmap",
+        action="store_true",
+        help="Find the links in the memory mapped file bytes (like the fast extractor) instead of reading and "
+        "decoding the whole files. only for files",
+    )
+    arg_parser.add_argument(
+        "--output_format",
+        choices=REPORT_FORMATS,
+        help="How the dead links are reported: table printed once a resource is crawled, or one json/csv line "
+        "(resource, source page, link, reason, status code, latency) written as soon as a dead link is found",
+        default="table",
+    )
+    arg_parser.add_argument(
+        "--output_file",
+        help="File where the json/csv dead links are written, - for stdout (the logs then go to stderr)",
+        default="-",
+    )
+    arg_parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="Print the time spent in each phase, the latency per host, the bytes transferred and the pages/s",
+    )
+    arg_parser.add_argument("--stats_json", help="File where the statistics are written as json at the end of the run")
+    arg_parser.add_argument(
+        "--jobs",
+        type=int,
+        help="Number of resources crawled in parallel (threads for urls, processes for files). only for lists",
+        default=1,
+    )
+    arg_parser.add_argument(
+        "--max_depth",
+        type=int,
+        help="Maximum depth of the crawled pages (the links of the deepest pages are still checked). only for urls",
+    )
+    arg_parser.add_argument(
+        "--max_pages",
+        type=int,
+        help="Maximum number of crawled pages (the links found are still checked). only for urls",
+    )
+    arg_parser.add_argument(
+        "--time_budget_sec",
+        type=float,
+        help="Stop the crawl after this duration (it can be resumed from its checkpoint). only for urls",
+    )
+    arg_parser.add_argument(
+        "--checkpoint_dir",
+        help="Directory of the crawl state files, saved periodically to resume an interrupted crawl",
+        default=DEFAULT_CHECKPOINT_DIR,
+    )
+    arg_parser.add_argument(
+        "--checkpoint_interval",
+        type=int,
+        help="Number of crawled pages between two checkpoints (0 to disable the checkpoints). only for urls",
+        default=100,
+    )
+    arg_parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue the interrupted crawl from its last checkpoint. only for urls",
+    )
 
     subparsers = arg_parser.add_subparsers(help="Resource type")
 
@@ -52,10 +279,56 @@ def _parse_args() -> argparse.Namespace:
     std_in_parser.add_argument("file_list", nargs="?", type=argparse.FileType("r"), default=sys.stdin)
     std_in_parser.set_defaults(func=_crawl_file_list)
 
+    dir_parser = subparsers.add_parser("dir", help="Crawl the html files of a directory tree. dir -h for more details")
+    dir_parser.add_argument("directory", help="Root directory of the html files to crawl")
+    dir_parser.add_argument(
+        "--extensions",
+        nargs="+",
+        help="Extensions of the files to crawl",
+        default=list(HTML_FILE_EXTENSIONS),
+    )
+    dir_parser.set_defaults(func=_crawl_dir)
+
+    distributed_parser = subparsers.add_parser(
+        "distributed", help="Crawl URL with workers sharing a frontier. distributed -h for more details"
+    )
+    distributed_parser.add_argument("resource", help="Url for the web page to crawl")
+    distributed_parser.add_argument(
+        "--frontier_path",
+        help="Path of the sqlite file shared by the workers (frontier and dead links)",
+        default=DEFAULT_FRONTIER_PATH,
+    )
+    distributed_parser.add_argument(
+        "--workers", type=int, help="Number of workers (of all the hosts), each owning a shard of hosts", default=4
+    )
+    distributed_parser.add_argument(
+        "--worker_index",
+        type=int,
+        help="Only run this worker (the other ones run in other processes or hosts). The dead links are not printed",
+    )
+    distributed_parser.add_argument(
+        "--report_only", action="store_true", help="Only print the dead links found by the workers"
+    )
+    distributed_parser.set_defaults(func=_crawl_distributed)
+
     std_in_parser = subparsers.add_parser("url_list", help="Crawl url list from stdin. url_list -h for more details")
     std_in_parser.add_argument("url_list", nargs="?", type=argparse.FileType("r"), default=sys.stdin)
     std_in_parser.set_defaults(func=_crawl_url_list)
 
+    serve_parser = subparsers.add_parser(
+        "serve", help="Run the crawl jobs received as json lines, keeping the caches warm. serve -h for more details"
+    )
+    serve_parser.add_argument(
+        "--socket", help="Unix socket path to listen on (each connection sends jobs), else the jobs are read on stdin"
+    )
+    serve_parser.add_argument(
+        "--status_ttl_sec",
+        type=float,
+        help="How long the status of a link is kept in memory to answer the next jobs (0 to keep it forever)",
+        default=600,
+    )
+    serve_parser.set_defaults(func=_serve)
+
     args = arg_parser.parse_args()
     if not hasattr(args, "func"):
         # This is to handle an open bug in the argparse when using subparsers (empty subparser)
@@ -74,23 +347,26 @@ def _print_dead_links(dead_links: List):
         dead_links: The dead links list
     """
     if dead_links:
-        table = tabulate(dead_links, headers=["Link", "Reason"])
+        from tabulate import tabulate
+
+        table = tabulate([(dead_link.link, dead_link.reason) for dead_link in dead_links], headers=["Link", "Reason"])
         logger.info("dead links:\n%s", table)
     else:
         logger.info("No dead links found")
 
 
-def _setup_logger(logger_name: str, verbose: bool) -> None:
+def _setup_logger(logger_name: str, verbose: bool, console: TextIO) -> None:
     """Setup a logger.
     Args:
         logger_name: The logger name
         verbose: Flag to enable/disable debug message
+        console: The stream of the messages with level info or bellow
     """
     main_logger = logging.getLogger(logger_name)
     main_logger.setLevel(logging.DEBUG if verbose else logging.INFO)
 
     format_str = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-    out_stream = logging.StreamHandler(sys.stdout)
+    out_stream = logging.StreamHandler(console)
     out_stream.setLevel(logging.DEBUG)
     out_stream.setFormatter(logging.Formatter(format_str))
     # The filter help to select only the messages with level info or bellow to go
@@ -98,60 +374,168 @@ def _setup_logger(logger_name: str, verbose: bool) -> None:
     out_stream.addFilter(lambda record: record.levelno <= logging.INFO)
 
     error_stream = logging.StreamHandler(sys.stderr)
-    error_stream.setLevel(logging.ERROR)
+    error_stream.setLevel(logging.WARNING)
     error_stream.setFormatter(logging.Formatter(format_str))
 
     main_logger.addHandler(out_stream)
     main_logger.addHandler(error_stream)
 
 
-def _setup_loggers(verbose: bool) -> None:
+def _setup_loggers(verbose: bool, console: TextIO = sys.stdout) -> None:
     """Setup the application loggers.
     Args:
         verbose: Flag to enable/disable debug message
+        console: The stream of the messages with level info or bellow
+    """
+    _setup_logger(__name__, verbose, console)  # __name__: The current module
+    _setup_logger("src", verbose, console)  # src: The python module is the name of the source folder
+
+
+# Pure function
+def _get_console(args: argparse.Namespace) -> TextIO:
+    """Get the stream of the logs and headers
+
+    Args:
+        args: The command line arguments
+
+    Returns:
+        stderr if the dead links are streamed to stdout (so that stdout can be parsed), else stdout
     """
-    _setup_logger(__name__, verbose)  # __name__: The current module
-    _setup_logger("src", verbose)  # src: The python module is the name of the source folder
+    if args.output_format != "table" and args.output_file == "-":
+        return sys.stderr
+    if getattr(args, "func", None) is _serve and args.socket is None:
+        # The job results are sent on stdout
+        return sys.stderr
+
+    return sys.stdout
 
 
-def _print_header(resource: str) -> None:
+def _print_header(resource: str, console: TextIO = sys.stdout) -> None:
     """Print a header to console (usefull to split output when using list urls or files)
 
     Args:
         resource: The resource name
+        console: The console stream
     """
 
-    print("*" * 100)
-    print("*" * 100)
-    print(resource)
-    print("*" * 100)
+    print("*" * 100, file=console)
+    print("*" * 100, file=console)
+    print(resource, file=console)
+    print("*" * 100, file=console)
 
 
-def _crawl(crawler: Crawler, args: argparse.Namespace) -> int:
-    """Crawl using the provided crawler.
+def _run_crawler(crawler: Crawler, show_exception_tb: bool) -> Tuple[int, list, str]:
+    """Crawl using the provided crawler without printing the dead links.
 
     Args:
         crawler: The crawler object.
-        args: The command line arguments
+        show_exception_tb: Enables exception trace back logging
 
     Returns:
-        0 on success, else 1
+        (exit code, dead links, error message). The exit code is 0 on success, else 1
     """
-    failure_occured = False
     try:
         crawler.crawl()
-        _print_dead_links(crawler.dead_links)
     except CrawlerException as exception:
-        logger.error(str(exception))
-        failure_occured = True
+        return 1, [], str(exception)
     except Exception as exception:
-        failure_occured = True
         # Using Broad exception to catch all errors to give a proper error message
-        logger.error("Error occured while crawling")
-        if args.show_exception_tb:  # To keep the output clean
+        if show_exception_tb:  # To keep the output clean
             logger.exception(exception)
+        return 1, [], "Error occured while crawling"
+
+    return 0, crawler.dead_link_records, None
+
+
+def _report(exit_code: int, dead_links: list, error_message: str) -> int:
+    """Print the result of a crawl.
+
+    Args:
+        exit_code: The crawl exit code
+        dead_links: The dead links
+        error_message: The error message (None on success)
+
+    Returns:
+        The exit code
+    """
+    if error_message is not None:
+        logger.error(error_message)
+    elif get_reporter() is None:
+        # Otherwise the dead links were written as they were found
+        _print_dead_links(dead_links)
+
+    return exit_code
+
+
+def _crawl(crawler: Crawler, args: argparse.Namespace) -> int:
+    """Crawl using the provided crawler.
+
+    Args:
+        crawler: The crawler object.
+        args: The command line arguments
+
+    Returns:
+        0 on success, else 1
+    """
+    return _report(*_run_crawler(crawler, args.show_exception_tb))
+
+
+# The crawler factories are module level functions (not closures), so they can be sent to a process pool
+def _create_web_crawler(resource: str, args: argparse.Namespace) -> Crawler:
+    """Create a web crawler.
+
+    Args:
+        resource: The url
+        args: The command line arguments
+
+    Returns:
+        The crawler
+    """
+    from src.web_crawler import WebCrawler
+
+    return WebCrawler(
+        resource,
+        args.show_exception_tb,
+        args.throttle_duration_sec,
+        args.disable_crawling,
+        args.concurrency,
+        args.compact_visited_index,
+        args.liveness_check,
+        args.max_depth,
+        args.max_pages,
+        get_checkpoint_path(args.checkpoint_dir, resource) if args.checkpoint_interval > 0 else None,
+        args.checkpoint_interval,
+        args.resume,
+        args.time_budget_sec,
+    )
+
+
+def _create_file_crawler(resource: str, args: argparse.Namespace) -> FileCrawler:
+    """Create a file crawler.
+
+    Args:
+        resource: The file path
+        args: The command line arguments
 
-    return 1 if failure_occured else 0
+    Returns:
+        The crawler
+    """
+    return FileCrawler(resource, args.show_exception_tb, args.liveness_check)
+
+
+def _create_html_crawler(html_content: str, args: argparse.Namespace) -> Crawler:
+    """Create an html crawler.
+
+    Args:
+        html_content: The html content
+        args: The command line arguments
+
+    Returns:
+        The crawler
+    """
+    from src.html_crawler import HTMLCrawler
+
+    return HTMLCrawler(html_content, args.show_exception_tb, args.liveness_check)
 
 
 def _crawl_url(args: argparse.Namespace) -> int:
@@ -163,8 +547,7 @@ def _crawl_url(args: argparse.Namespace) -> int:
     Returns:
         0 on success, else 1
     """
-    crawler = WebCrawler(args.resource, args.show_exception_tb, args.throttle_duration_sec, args.disable_crawling)
-    return _crawl(crawler, args)
+    return _crawl(_create_web_crawler(args.resource, args), args)
 
 
 def _crawl_file(args: argparse.Namespace) -> int:
@@ -176,8 +559,7 @@ def _crawl_file(args: argparse.Namespace) -> int:
     Returns:
         0 on success, else 1
     """
-    crawler = FileCrawler(args.resource, args.show_exception_tb)
-    return _crawl(crawler, args)
+    return _crawl(_create_file_crawler(args.resource, args), args)
 
 
 def _crawl_html(args: argparse.Namespace) -> int:
@@ -189,27 +571,182 @@ def _crawl_html(args: argparse.Namespace) -> int:
     Returns:
         0 on success, else 1
     """
-    crawler = HTMLCrawler(args.html_content.read(), args.show_exception_tb)
-    return _crawl(crawler, args)
+    return _crawl(_create_html_crawler(args.html_content.read(), args), args)
+
+
+class _LogCollector(logging.Handler):
+    """Keeps the log records of a process pool worker, so they are printed under the header of their resource"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.records = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        # Formatted now, since the exceptions trace backs can't be sent to the main process
+        record.msg = self.format(record)
+        record.args = None
+        record.exc_info = None
+        record.exc_text = None
+        record.stack_info = None
+        if record.name == "__mp_main__":
+            # main.py is imported under this name by the spawned processes
+            record.name = "__main__"
+        self.records.append(record)
+
+
+def _crawl_list_resource(
+    create_crawler: Callable, args: argparse.Namespace, resource: str
+) -> Tuple[Tuple[int, list, str], Optional[dict], List[logging.LogRecord]]:
+    """Crawl one resource of a list in a pool worker.
+
+    Args:
+        create_crawler: The crawler factory
+        args: The command line arguments
+        resource: The resource
+
+    Returns:
+        (see _run_crawler, the statistics of a pool process or None, the log records of a pool process)
+    """
+    # The logs of a process would be printed as they come, in the middle of the other resources results. They are
+    # sent back with the result instead (the threads log directly)
+    log_collector = _LogCollector() if _is_pool_process() else None
+    if log_collector is not None:
+        for logger_name in (__name__, "src"):
+            logging.getLogger(logger_name).addHandler(log_collector)
+
+    try:
+        result = _run_crawler(create_crawler(resource, args), args.show_exception_tb)
+
+        # A process may be stopped by the pool without its stores being closed, so the results are saved now
+        _commit_stores()
+    finally:
+        if log_collector is not None:
+            for logger_name in (__name__, "src"):
+                logging.getLogger(logger_name).removeHandler(log_collector)
+
+    # The statistics of a pool process are sent to the main process (and reset so they are only sent once)
+    stats_snapshot = None
+    if get_stats() is not None and _is_pool_process():
+        stats_snapshot = get_stats().to_dict()
+        configure_stats(True)
+
+    return result, stats_snapshot, log_collector.records if log_collector is not None else []
+
+
+def _is_pool_process() -> bool:
+    """Check if the current process is a process pool worker
+
+    Returns:
+        True in a pool worker, False in the main process
+    """
+    import multiprocessing
+
+    return multiprocessing.parent_process() is not None
+
+
+def _get_spawn_context():
+    """Get the multiprocessing context of the process pools
+
+    Returns:
+        The spawn context
+    """
+    import multiprocessing
+
+    return multiprocessing.get_context("spawn")
+
+
+def _setup_worker_process(args: argparse.Namespace, collect_logs: bool = False) -> None:
+    """Setup a process pool worker like main does for the main process.
+
+    Args:
+        args: The command line arguments
+        collect_logs: The logs are sent back to the main process instead of being printed (see _LogCollector)
+    """
+    if collect_logs:
+        for logger_name in (__name__, "src"):
+            logging.getLogger(logger_name).setLevel(logging.DEBUG if args.verbose else logging.INFO)
+    else:
+        _setup_loggers(args.verbose, _get_console(args))
+    _configure(args)
+    # The processes can't share the output file, the dead links are sent back to the main process instead
+    configure_reporter("table")
+
+
+def _get_picklable_args(args: argparse.Namespace) -> argparse.Namespace:
+    """Get the command line arguments without the ones that can't be sent to another process.
+
+    Args:
+        args: The command line arguments
+
+    Returns:
+        The arguments copy
+    """
+    return argparse.Namespace(
+        **{name: value for name, value in vars(args).items() if name not in ("func", "file_list", "url_list")}
+    )
 
 
-def _crawl_resource_list(resource_list: List[str], args: argparse.Namespace, create_crawler: Callable):
+def _crawl_resource_list(
+    resource_list: List[str], args: argparse.Namespace, create_crawler: Callable, use_processes: bool
+):
     """Crawl a resource (file or urls).
 
     Args:
         resource_list: The resource list
         args: The command line arguments
+        create_crawler: The crawler factory (a module level function)
+        use_processes: Use a process pool (cpu bound resources) instead of a thread pool when args.jobs > 1
 
     Returns:
         0 on success, else 1
     """
+    if args.jobs <= 1:
+        over_all_exit_code = 0
+        for resource in resource_list:
+            _print_header(resource, _get_console(args))
+            crawler = create_crawler(resource, args)
+            exit_code = _crawl(crawler, args)
+            if exit_code == 1 and over_all_exit_code != 1:
+                over_all_exit_code = 1
+
+        return over_all_exit_code
+
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+    if use_processes:
+        # spawn (instead of fork) since the sqlite connections of the stores can't be shared with a child process
+        executor = ProcessPoolExecutor(
+            max_workers=args.jobs,
+            mp_context=_get_spawn_context(),
+            initializer=_setup_worker_process,
+            initargs=(_get_picklable_args(args), True),
+        )
+        worker_args = _get_picklable_args(args)
+    else:
+        executor = ThreadPoolExecutor(max_workers=args.jobs)
+        worker_args = args
+
     over_all_exit_code = 0
-    for resource in resource_list:
-        _print_header(resource)
-        crawler = create_crawler(resource, args)
-        exit_code = _crawl(crawler, args)
-        if exit_code == 1 and over_all_exit_code != 1:
-            over_all_exit_code = 1
+    with executor:
+        # map gives the results in the list order, so the output is the same whatever the crawl order is
+        results = executor.map(functools.partial(_crawl_list_resource, create_crawler, worker_args), resource_list)
+        for resource, (result, stats_snapshot, log_records) in zip(resource_list, results):
+            _print_header(resource, _get_console(args))
+            for log_record in log_records:
+                logging.getLogger(log_record.name).handle(log_record)
+            if stats_snapshot is not None:
+                get_stats().merge(stats_snapshot)
+
+            exit_code, dead_links, error_message = result
+            reporter = get_reporter()
+            if reporter is not None:
+                # Only the process pool workers give back their dead links when streaming
+                for dead_link in dead_links:
+                    reporter.report(resource, dead_link)
+
+            exit_code = _report(exit_code, dead_links, error_message)
+            if exit_code == 1 and over_all_exit_code != 1:
+                over_all_exit_code = 1
 
     return over_all_exit_code
 
@@ -223,12 +760,9 @@ def _crawl_url_list(args: argparse.Namespace) -> int:
     Returns:
         0 on success, else 1
     """
-
-    def create_crawler(resource, args):
-        return WebCrawler(resource, args.show_exception_tb, args.throttle_duration_sec, args.disable_crawling)
-
     url_list = re.split(r"\s+", args.url_list.read().strip())
-    return _crawl_resource_list(url_list, args, create_crawler)
+    # Crawling urls is network bound, threads are enough
+    return _crawl_resource_list(url_list, args, _create_web_crawler, use_processes=False)
 
 
 def _crawl_file_list(args: argparse.Namespace) -> int:
@@ -240,20 +774,274 @@ def _crawl_file_list(args: argparse.Namespace) -> int:
     Returns:
         0 on success, else 1
     """
+    file_list = re.split(r"\s+", args.file_list.read().strip())
+    # Parsing files is cpu bound, processes are needed to use several cores
+    return _crawl_resource_list(file_list, args, _create_file_crawler, use_processes=True)
 
-    def create_crawler(resource, args):
-        return FileCrawler(resource, args.show_exception_tb)
 
-    file_list = re.split(r"\s+", args.file_list.read().strip())
-    return _crawl_resource_list(file_list, args, create_crawler)
+def _crawl_dir(args: argparse.Namespace) -> int:
+    """Crawl the html files of a directory tree.
+
+    Args:
+        args: The command line arguments
+
+    Returns:
+        0 on success, else 1
+    """
+    if not os.path.isdir(args.directory):
+        logger.error("The source directory (%s) does not exists", args.directory)
+        return 1
+
+    file_list = list(find_files(args.directory, tuple(extension.lower() for extension in args.extensions)))
+    if not file_list:
+        logger.info("No file to crawl in %s", args.directory)
+        return 0
+
+    # Same as a file list
+    return _crawl_resource_list(file_list, args, _create_file_crawler, use_processes=True)
+
+
+def _run_distributed_worker(args: argparse.Namespace, worker_index: int) -> Tuple[int, str, Optional[dict]]:
+    """Run a worker of a distributed crawl.
+
+    Args:
+        args: The command line arguments
+        worker_index: The worker index
+
+    Returns:
+        (exit code, error message, the statistics of a pool process or None)
+    """
+    from src.distributed_crawler import DistributedCrawler
+
+    frontier = SharedFrontier(args.frontier_path)
+    try:
+        crawler = DistributedCrawler(
+            args.resource,
+            args.show_exception_tb,
+            args.throttle_duration_sec,
+            frontier,
+            worker_index,
+            args.workers,
+            args.liveness_check,
+            args.max_depth,
+            args.max_pages,
+            args.time_budget_sec,
+        )
+        exit_code, _, error_message = _run_crawler(crawler, args.show_exception_tb)
+    finally:
+        frontier.close()
+
+    _commit_stores()
+
+    stats_snapshot = None
+    if get_stats() is not None and _is_pool_process():
+        stats_snapshot = get_stats().to_dict()
+        configure_stats(True)
+
+    return exit_code, error_message, stats_snapshot
+
+
+def _report_distributed(args: argparse.Namespace) -> int:
+    """Print the dead links found by the workers of a distributed crawl.
+
+    Args:
+        args: The command line arguments
+
+    Returns:
+        0 on success, else 1
+    """
+    frontier = SharedFrontier(args.frontier_path)
+    try:
+        resource = frontier.get_resource()
+        if resource is None:
+            return _report(1, [], f"No crawl in {args.frontier_path}")
+
+        dead_links = frontier.get_dead_links()
+        if not frontier.is_done():
+            logger.info("The crawl is not done, the dead links found so far are reported")
+    finally:
+        frontier.close()
+
+    reporter = get_reporter()
+    if reporter is not None:
+        for dead_link in dead_links:
+            reporter.report(resource, dead_link)
+
+    return _report(0, dead_links, None)
+
+
+def _crawl_distributed(args: argparse.Namespace) -> int:
+    """Crawl a url with workers sharing a frontier.
+
+    Args:
+        args: The command line arguments
+
+    Returns:
+        0 on success, else 1
+    """
+    if args.report_only:
+        return _report_distributed(args)
+
+    if args.worker_index is not None:
+        exit_code, error_message, _ = _run_distributed_worker(args, args.worker_index)
+        if error_message is not None:
+            logger.error(error_message)
+        return exit_code
+
+    if not args.resume:
+        # The frontier file of a previous crawl would be continued
+        remove_shared_frontier(args.frontier_path)
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    # spawn since the sqlite connections can't be shared with a child process (like the file lists)
+    with ProcessPoolExecutor(
+        max_workers=args.workers,
+        mp_context=_get_spawn_context(),
+        initializer=_setup_worker_process,
+        initargs=(_get_picklable_args(args),),
+    ) as executor:
+        worker_args = _get_picklable_args(args)
+        futures = [executor.submit(_run_distributed_worker, worker_args, index) for index in range(args.workers)]
+
+        over_all_exit_code = 0
+        for future in futures:
+            exit_code, error_message, stats_snapshot = future.result()
+            if stats_snapshot is not None:
+                get_stats().merge(stats_snapshot)
+            if error_message is not None:
+                logger.error(error_message)
+            over_all_exit_code = max(over_all_exit_code, exit_code)
+
+    if over_all_exit_code != 0:
+        return over_all_exit_code
+
+    return _report_distributed(args)
+
+
+def _create_job_crawler(args: argparse.Namespace, resource_type: str, resource: str) -> Crawler:
+    """Create the crawler of a serve job.
+
+    Args:
+        args: The command line arguments
+        resource_type: The job type (url, file or html)
+        resource: The url, file path or html content
+
+    Returns:
+        The crawler
+    """
+    if resource_type == "url":
+        # The checkpoint path is derived from the url, so the jobs of the same url (run at once, or stopped by their
+        # time budget then sent again) would load and overwrite the checkpoint of each other. A job is never resumed
+        job_args = argparse.Namespace(**{**vars(args), "checkpoint_interval": 0, "resume": False})
+        return _create_web_crawler(resource, job_args)
+    if resource_type == "file":
+        return _create_file_crawler(resource, args)
+
+    return _create_html_crawler(resource, args)
+
+
+def _serve(args: argparse.Namespace) -> int:
+    """Run the crawl jobs received on stdin or on a unix socket.
+
+    Args:
+        args: The command line arguments
+
+    Returns:
+        0 once the jobs stream is closed (or the server stopped)
+    """
+    from src.server import CrawlServer
+
+    # The server runs for a long time, the links are checked again once their status is too old
+    configure_status_store(not args.no_shared_status, args.status_ttl_sec or None)
+    # The dead links are sent with the job results
+    configure_reporter("table")
+
+    server = CrawlServer(functools.partial(_create_job_crawler, args), args.jobs, _commit_stores)
+    if args.socket is None:
+        server.serve_stream(sys.stdin, sys.stdout)
+        return 0
+
+    try:
+        server.serve_socket(args.socket)
+    except KeyboardInterrupt:
+        logger.info("Server stopped")
+
+    return 0
+
+
+def _configure(args: argparse.Namespace) -> None:
+    """Configure the shared http client, stores and scrapers.
+
+    Args:
+        args: The command line arguments
+    """
+    scheduler = HostScheduler(args.host_rps, args.host_burst, args.host_max_concurrency, dict(args.host_rps_override))
+    configure_client(
+        max_connections_per_host=args.max_connections_per_host,
+        max_retries=args.max_retries,
+        scheduler=scheduler,
+        # requests waits forever with a None timeout
+        connect_timeout_sec=args.connect_timeout_sec or None,
+        read_timeout_sec=args.read_timeout_sec or None,
+        body_timeout_sec=args.body_timeout_sec or None,
+        max_body_bytes=int(args.max_body_mb * 1024 * 1024),
+        scraped_content_types=(
+            None
+            if "*" in args.scraped_content_types
+            else tuple(content_type.lower() for content_type in args.scraped_content_types)
+        ),
+    )
+    configure_cache(None if args.no_cache else args.cache_path)
+    configure_page_store(args.page_store_path if args.incremental else None)
+    configure_snapshot_store(args.snapshot_path if args.since_snapshot else None, args.snapshot_sample_ratio)
+    configure_status_store(not args.no_shared_status)
+    Scraper.extractor = args.extractor
+    FileScrapper.use_mmap = args.mmap
+    configure_stats(args.stats or args.stats_json is not None)
+    # A resumed crawl already reported the dead links found before its checkpoint
+    configure_reporter(args.output_format, args.output_file, append=args.resume)
+
+
+def _commit_stores() -> None:
+    """Save the pending writes of the shared stores"""
+    for store in (get_cache(), get_page_store(), get_snapshot_store()):
+        if store is not None:
+            store.commit()
+
+
+def _report_stats(args: argparse.Namespace) -> None:
+    """Print and/or dump the statistics of the run.
+
+    Args:
+        args: The command line arguments
+    """
+    stats = get_stats()
+    if stats is None:
+        return
+
+    if args.stats:
+        logger.info("Statistics:\n%s", stats.format_summary())
+    if args.stats_json is not None:
+        dump_stats(args.stats_json)
 
 
 def main():
     args = _parse_args()
 
-    _setup_loggers(args.verbose)
+    _setup_loggers(args.verbose, _get_console(args))
 
-    exit_code = args.func(args)
+    _configure(args)
+
+    try:
+        exit_code = args.func(args)
+        _report_stats(args)
+    finally:
+        # Commits and closes the stores
+        configure_cache(None)
+        configure_page_store(None)
+        configure_snapshot_store(None)
+        configure_reporter("table")
 
     sys.exit(exit_code)
 
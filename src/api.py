@@ -0,0 +1,198 @@
+"""Library API: crawl a resource and get the link checks as they are done.
+
+The crawl runs in a background thread, so it does not block the caller (or its event loop). Stopping the iteration
+(break, close, cancellation of the task) stops the crawl after the links being checked.
+
+Example:
+    crawler = WebCrawler("https://webscraper.io", False, 0, False, concurrency=8)
+    async for event in aiter_link_events(crawler, time_budget_sec=60, max_pages=100):
+        if event.is_dead:
+            print(event.link, event.reason)
+"""
+
+import asyncio
+import queue
+import threading
+from typing import AsyncIterator, Iterator, NamedTuple, Optional, Tuple
+
+from src.crawler import Crawler, CrawlerException, LinkStatus
+
+# The max number of events waiting for the caller, the crawl waits when the caller is slower
+EVENTS_QUEUE_SIZE = 1000
+
+# Sent after the last event
+_END_OF_CRAWL = object()
+
+
+class LinkEvent(NamedTuple):
+    """A link check done by a crawler"""
+
+    link: str
+    # The page where the link was found
+    source: Optional[str]
+    is_dead: bool
+    reason: Optional[str]
+    # None if no response was received
+    status_code: Optional[int]
+    # None if the status comes from the link status cache
+    latency_ms: Optional[float]
+    # The link is a page that is crawled for more links
+    is_crawled: bool
+
+
+# Pure function
+def _create_event(link: str, page: str, link_status: LinkStatus, to_crawl: bool) -> LinkEvent:
+    """Create the event of a link check (see Crawler.link_listener)
+
+    Args:
+        link: The link
+        page: The page where the link was found
+        link_status: The link status
+        to_crawl: The link was reserved to be crawled
+
+    Returns:
+        The event
+    """
+    return LinkEvent(
+        link,
+        page,
+        link_status.is_dead,
+        link_status.reason,
+        link_status.status_code,
+        link_status.latency_ms,
+        to_crawl and not link_status.is_dead,
+    )
+
+
+def _set_limits(
+    crawler: Crawler, time_budget_sec: Optional[float], max_pages: Optional[int]
+) -> Tuple[Optional[float], Optional[int]]:
+    """Set the crawl limits, the ones that are None are left unchanged
+
+    Args:
+        crawler: The crawler
+        time_budget_sec: Stop the crawl after this duration
+        max_pages: The maximum number of crawled pages
+
+    Returns:
+        The previous (time_budget_sec, max_pages) of the crawler, given back to it once the crawl is done
+    """
+    previous_limits = crawler.time_budget_sec, crawler.max_pages
+    if time_budget_sec is not None:
+        crawler.time_budget_sec = time_budget_sec
+    if max_pages is not None:
+        crawler.max_pages = max_pages
+
+    return previous_limits
+
+
+def iter_link_events(
+    crawler: Crawler, time_budget_sec: Optional[float] = None, max_pages: Optional[int] = None
+) -> Iterator[LinkEvent]:
+    """Crawl in a background thread and give the link checks as they are done
+
+    Args:
+        crawler: The crawler (not running)
+        time_budget_sec: Stop the crawl after this duration, None to keep the crawler limit
+        max_pages: The maximum number of crawled pages, None to keep the crawler limit
+
+    Returns:
+        The link events. The crawl errors (CrawlerException, ...) are raised after the last event
+    """
+    previous_limits = _set_limits(crawler, time_budget_sec, max_pages)
+    events = queue.Queue(EVENTS_QUEUE_SIZE)
+    errors = []
+
+    def run() -> None:
+        try:
+            crawler.crawl()
+        except BaseException as e:
+            errors.append(e)
+        finally:
+            events.put(_END_OF_CRAWL)
+
+    crawler.link_listener = lambda *args: events.put(_create_event(*args))
+    thread = threading.Thread(target=run, name="crawl", daemon=True)
+    thread.start()
+
+    event = None
+    try:
+        event = events.get()
+        while event is not _END_OF_CRAWL:
+            yield event
+            event = events.get()
+    finally:
+        # The caller may stop before the end of the crawl, the queue is emptied so the crawl is never blocked
+        if thread.is_alive():
+            crawler.stop()
+        while event is not _END_OF_CRAWL:
+            event = events.get()
+        thread.join()
+        crawler.link_listener = None
+        crawler.time_budget_sec, crawler.max_pages = previous_limits
+
+    if errors:
+        raise errors[0]
+
+
+async def aiter_link_events(
+    crawler: Crawler, time_budget_sec: Optional[float] = None, max_pages: Optional[int] = None
+) -> AsyncIterator[LinkEvent]:
+    """Crawl in a background thread and give the link checks as they are done, without blocking the event loop
+
+    Args:
+        crawler: The crawler (not running)
+        time_budget_sec: Stop the crawl after this duration, None to keep the crawler limit
+        max_pages: The maximum number of crawled pages, None to keep the crawler limit
+
+    Returns:
+        The link events. The crawl errors (CrawlerException, ...) are raised after the last event
+    """
+    previous_limits = _set_limits(crawler, time_budget_sec, max_pages)
+    loop = asyncio.get_running_loop()
+    events = asyncio.Queue(EVENTS_QUEUE_SIZE)
+
+    def put_event(event) -> None:
+        # The crawl thread waits for the event loop when the queue is full, like the sync iterator
+        asyncio.run_coroutine_threadsafe(events.put(event), loop).result()
+
+    crawler.link_listener = lambda *args: put_event(_create_event(*args))
+    crawl_done = loop.create_future()
+
+    def run() -> None:
+        try:
+            crawler.crawl()
+        except Exception as e:
+            loop.call_soon_threadsafe(crawl_done.set_exception, e)
+        except BaseException as e:
+            # A future can't hold a KeyboardInterrupt or a SystemExit, the iterator would never end
+            error = CrawlerException(f"The crawl was interrupted ({type(e).__name__})")
+            error.__cause__ = e
+            loop.call_soon_threadsafe(crawl_done.set_exception, error)
+        else:
+            loop.call_soon_threadsafe(crawl_done.set_result, None)
+        finally:
+            put_event(_END_OF_CRAWL)
+
+    # A thread of its own, a long crawl would hold a worker of the loop default executor
+    threading.Thread(target=run, name="crawl", daemon=True).start()
+
+    event = None
+    try:
+        event = await events.get()
+        while event is not _END_OF_CRAWL:
+            yield event
+            event = await events.get()
+    finally:
+        if event is not _END_OF_CRAWL:
+            # Cancelled or closed before the end of the crawl. The queue is emptied so the crawl is never blocked
+            crawler.stop()
+            while event is not _END_OF_CRAWL:
+                event = await events.get()
+            await asyncio.wait([crawl_done])
+            # The caller stopped listening, the crawl errors are not raised
+            crawl_done.exception()
+        crawler.link_listener = None
+        crawler.time_budget_sec, crawler.max_pages = previous_limits
+
+    crawl_done.result()
@@ -0,0 +1,88 @@
+import gzip
+import hashlib
+import logging
+import os
+import pickle
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHECKPOINT_DIR = os.path.join(os.path.expanduser("~"), ".cache", "web_scraper", "checkpoints")
+
+# Bumped when the state layout changes, so an old checkpoint is ignored instead of breaking the resume
+CHECKPOINT_VERSION = 3
+
+
+# Pure function
+def get_checkpoint_path(directory: str, resource: str) -> str:
+    """Get the checkpoint file of a resource
+
+    Args:
+        directory: The checkpoints directory
+        resource: The crawled resource
+
+    Returns:
+        The checkpoint file path
+    """
+    # Each resource of a list has its own checkpoint, so a list can be resumed too
+    return os.path.join(directory, hashlib.sha1(resource.encode("utf-8")).hexdigest() + ".ckpt.gz")
+
+
+def save_checkpoint(path: str, resource: str, state: dict) -> None:
+    """Save the state of a crawl
+
+    Args:
+        path: The checkpoint file path
+        resource: The crawled resource
+        state: The crawl state (must be picklable)
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    # Written to a temporary file then renamed, so a crash while saving keeps the previous checkpoint
+    tmp_path = path + ".tmp"
+    with gzip.open(tmp_path, "wb", compresslevel=1) as file_handle:
+        pickle.dump(
+            {"version": CHECKPOINT_VERSION, "resource": resource, "state": state},
+            file_handle,
+            protocol=pickle.HIGHEST_PROTOCOL,
+        )
+    os.replace(tmp_path, path)
+
+
+def load_checkpoint(path: str, resource: str) -> Optional[dict]:
+    """Load the state of a crawl
+
+    Args:
+        path: The checkpoint file path
+        resource: The crawled resource
+
+    Returns:
+        The crawl state, None if there is no usable checkpoint for the resource
+    """
+    if not os.path.exists(path):
+        return None
+
+    try:
+        with gzip.open(path, "rb") as file_handle:
+            checkpoint = pickle.load(file_handle)
+    except Exception:
+        logger.warning("Ignoring the unreadable checkpoint %s", path, exc_info=True)
+        return None
+
+    if checkpoint.get("version") != CHECKPOINT_VERSION or checkpoint.get("resource") != resource:
+        logger.warning("Ignoring the checkpoint %s made for another crawl", path)
+        return None
+
+    return checkpoint["state"]
+
+
+def remove_checkpoint(path: str) -> None:
+    """Remove the checkpoint of a finished crawl
+
+    Args:
+        path: The checkpoint file path
+    """
+    if os.path.exists(path):
+        os.remove(path)
@@ -1,19 +1,72 @@
+import functools
 import logging
-import requests
+import threading
 import time
-from typing import Tuple
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Callable, Iterable, List, NamedTuple, Optional, Tuple
 
 from abc import ABC, abstractmethod
 
+from src.checkpoint import load_checkpoint, remove_checkpoint, save_checkpoint
+from src.dead_links import DeadLinkList
+from src.http_client import get_client
+from src.link_status_cache import get_cache
+from src.link_status_store import get_status_store
+from src.page_store import get_page_store
+from src.reporters import DeadLink, get_reporter
+from src.snapshot_store import SnapshotStore, get_snapshot_store
 from src.scrapper import Scraper
+from src.stats import get_stats, timed
+from src.url_index import VisitedIndex
+
+if TYPE_CHECKING:
+    import asyncio
 
 logger = logging.getLogger(__name__)
 
+# How the links that are not crawled are checked:
+#   head: HEAD request, with a GET fallback for the servers that do not implement HEAD
+#   stream: GET request closed as soon as the headers are received
+#   get: GET request downloading the whole body
+LIVENESS_CHECKS = ("head", "stream", "get")
+
+# Status codes returned by the servers that reject HEAD requests
+HEAD_REJECTED_STATUS_CODES = (405, 501)
+
 
 class CrawlerException(Exception):
     pass
 
 
+# Pure function
+@functools.lru_cache(maxsize=1024)
+def get_bad_status_reason(status_code: int, http_reason: str) -> str:
+    """Get the reason of a link with a bad status code
+
+    The reasons are cached, so all the links with the same status share one string instead of formatting their own.
+
+    Args:
+        status_code: The status code
+        http_reason: The reason phrase sent by the server
+
+    Returns:
+        The reason
+    """
+    return f"Bad status code: {status_code} '{http_reason}'"
+
+
+class LinkStatus(NamedTuple):
+    """The result of a link check"""
+
+    is_dead: bool
+    reason: Optional[str]
+    # None if no response was received
+    status_code: Optional[int]
+    # None if the status comes from the link status cache
+    latency_ms: Optional[float]
+
+
 class Crawler(ABC):
     def __init__(
         self,
@@ -22,6 +75,15 @@ class Crawler(ABC):
         disable_crawling: bool,
         throttle_duration_sec: int,
         scrapper: Scraper,
+        concurrency: int = 1,
+        compact_visited_index: bool = False,
+        liveness_check: str = "head",
+        max_depth: Optional[int] = None,
+        max_pages: Optional[int] = None,
+        checkpoint_path: Optional[str] = None,
+        checkpoint_interval: int = 100,
+        resume: bool = False,
+        time_budget_sec: Optional[float] = None,
     ) -> None:
         """Init the crawler object.
 
@@ -30,13 +92,35 @@ class Crawler(ABC):
             show_exception_tb: Enables exception trace back logging
             disable_crawling: Disables crawling
             throttle_duration_sec: The trottle duration
+            concurrency: The number of concurrent fetchers (1 keeps the sequential crawl)
+            compact_visited_index: Store urls fingerprints instead of urls in the visited index
+            liveness_check: How the links that are not crawled are checked (one of LIVENESS_CHECKS)
+            max_depth: The maximum depth of the crawled pages (the root page links have a depth of 1), None for
+                no limit. The links of the deepest pages are still checked
+            max_pages: The maximum number of crawled pages, None for no limit. The links found are still checked
+            checkpoint_path: The file where the crawl state is saved, None to disable the checkpoints
+            checkpoint_interval: The number of crawled pages between two checkpoints
+            resume: Continue the crawl from the checkpoint (if there is one)
+            time_budget_sec: Stop the crawl after this duration, None for no limit. A stopped crawl keeps its
+                checkpoint, so it can be resumed
         """
         # By using the '__' it will create a "private" var effect
         # Since mangling variables names is required to access the value
-        self.__visited_links = []
-        self.__dead_links = []
+        self.__visited_links = VisitedIndex(compact_visited_index)
+        self.__dead_links = DeadLinkList()
         self.__crawled_pages_cnt = 0
+        self.__reserved_pages_cnt = 0
+        # The links being checked/scraped, with True if they reserved a page. They are saved with the frontier
+        # so that an interrupted check is done again on resume
+        self.__in_progress = {}
+        self.__pages_since_checkpoint = 0
+        # The links of the scraped pages are staged under this id in the snapshot store until the crawl is done
+        self.__snapshot_crawl_id = None
         self.__scrapper = scrapper
+        # Set from another thread by stop(), checked between two link checks
+        self.__stop_event = threading.Event()
+        self.__deadline = None
+        self.__stopped = False
 
         self._resource = resource  # Act as protected member
 
@@ -44,17 +128,61 @@ class Crawler(ABC):
         self.throttle_duration_sec = throttle_duration_sec
         self.show_exception_tb = show_exception_tb
         self.disable_crawling = disable_crawling
+        self.concurrency = concurrency
+        self.liveness_check = liveness_check
+        self.max_depth = max_depth
+        self.max_pages = max_pages
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_interval = checkpoint_interval
+        self.resume = resume
+        self.time_budget_sec = time_budget_sec
+        # Called with (link, page, link status, to crawl) after each link check, from the crawl thread
+        self.link_listener = None
 
     @property
-    def dead_links(self) -> list:
+    def dead_links(self) -> List[Tuple[str, str]]:
         """Get the dead links.
 
         Returns:
-            The dead links list
+            The (link, reason) list of the dead links (see dead_link_records for the other fields)
+        """
+        return [(dead_link.link, dead_link.reason) for dead_link in self.__dead_links]
+
+    @property
+    def dead_link_records(self) -> DeadLinkList:
+        """Get the dead links records.
+
+        Returns:
+            The dead links list (a compact list of DeadLink, with their source page, status code and latency)
         """
         # Using a property to make sure that the dead links can't be modified (unless you mangle the name)
         return self.__dead_links
 
+    @property
+    def crawled_pages_cnt(self) -> int:
+        """Get the number of crawled (scraped) pages.
+
+        Returns:
+            The crawled pages count
+        """
+        return self.__crawled_pages_cnt
+
+    @property
+    def stopped(self) -> bool:
+        """Check if the last crawl was stopped before all the links were checked.
+
+        Returns:
+            True if the crawl was stopped (see stop and time_budget_sec)
+        """
+        return self.__stopped
+
+    def stop(self) -> None:
+        """Ask the running crawl to stop (can be called from any thread).
+
+        The crawl stops after the links being checked, and saves its checkpoint so it can be resumed.
+        """
+        self.__stop_event.set()
+
     @abstractmethod
     def _create_full_link(self, source_link: str, link: str) -> str:
         raise NotImplementedError()
@@ -73,47 +201,456 @@ class Crawler(ABC):
 
     def clear(self) -> None:
         """Clears the visited and dead links lists"""
-        self.__visited_links = []
-        self.__dead_links = []
+        self.__visited_links = VisitedIndex(self.__visited_links.compact)
+        self.__dead_links = DeadLinkList()
         self.__crawled_pages_cnt = 0
+        self.__reserved_pages_cnt = 0
+        self.__in_progress = {}
+        self.__pages_since_checkpoint = 0
 
     def crawl(self) -> None:
         """Crawl the resource given to the init"""
-        self.clear()
-
-        self._verify_source_resource()
+        self.__deadline = time.monotonic() + self.time_budget_sec if self.time_budget_sec is not None else None
+        self.__stopped = False
+        try:
+            self._crawl_resource()
+        finally:
+            # A stop request only applies to the running crawl
+            self.__stop_event.clear()
 
-        self._crawl(self._resource, self._get_root_route())
+        if self.__stopped:
+            logger.info("Crawl stopped before all the links were checked")
 
         logger.info("Visited %d page(s)", len(self.__visited_links))
 
-    def _crawl(self, source: str, route: str) -> None:
-        """Crawl the page.
+    def _crawl_resource(self) -> None:
+        """Crawl the resource from its root route or from its checkpoint"""
+        state = None
+        if self.resume and self.checkpoint_path is not None:
+            state = load_checkpoint(self.checkpoint_path, self._resource)
+
+        if state is None:
+            self.clear()
+            self._verify_source_resource()
+            frontier_items = None
+        else:
+            # The source was verified by the interrupted crawl, and the root page is already scraped
+            frontier_items = self._restore_state(state)
+            logger.info("Resuming from %s. %d link(s) left to check", self.checkpoint_path, len(frontier_items))
+
+        # A resumed crawl stages its snapshots again: the pages scraped before the checkpoint are not saved, the next
+        # run checks all their links again
+        self.__snapshot_crawl_id = SnapshotStore.new_crawl_id()
+        is_done = False
+        try:
+            if self.concurrency > 1:
+                # asyncio is slow to import, the sequential crawls (files, html) don't import it
+                import asyncio
+
+                asyncio.run(self._crawl_concurrently(self._resource, self._get_root_route(), frontier_items))
+            else:
+                self._crawl(self._resource, self._get_root_route(), frontier_items)
+            is_done = not self.__stopped
+        finally:
+            # The links of a stopped (or failed) crawl are not all checked, they must not be known by the next run
+            self._save_page_snapshots(is_done)
+
+        if self.checkpoint_path is not None and not self.__stopped:
+            remove_checkpoint(self.checkpoint_path)
+
+    def _crawl(self, source: str, route: str, frontier_items: Optional[list] = None) -> None:
+        """Crawl the pages reachable from the route, breadth first.
+
+        The frontier only holds the links to check (not the pages), so a page is dropped as soon as its
+        links are added to the frontier.
 
         Args:
             source: The page source
-            route: The page route
+            route: The root route
+            frontier_items: The (link, depth, page) items of a resumed crawl, None to start from the root route
+        """
+        if frontier_items is None:
+            frontier = deque()
+            self._reserve_page()
+            self._check_trottle()
+            root_page = self._create_full_link(source, route)
+            self._add_to_frontier(source, root_page, self._get_page_links(source, route), 1, frontier.append)
+        else:
+            frontier = deque(frontier_items)
+
+        try:
+            while frontier:
+                if self._is_stop_requested():
+                    self._stop_crawl(frontier)
+                    break
+
+                item = frontier.popleft()
+                link, depth, page = item
+                self._sample_frontier(len(frontier), depth)
+
+                full_link = self._create_full_link(source, link)
+                to_crawl = self._should_crawl(link, source, depth)
+                self.__in_progress[item] = to_crawl
+                # The body of a page to crawl is kept so that it is not fetched twice
+                link_status = self._get_link_status(full_link, keep_body=to_crawl)
+                self._on_link_checked(full_link, page, link_status, to_crawl)
+
+                if to_crawl and not link_status.is_dead:
+                    self._check_trottle()
+                    links = self._get_page_links(source, link)
+                    self._add_to_frontier(source, full_link, links, depth + 1, frontier.append)
+                    self.__pages_since_checkpoint += 1
+                del self.__in_progress[item]
+
+                if self._is_checkpoint_due():
+                    self._save_checkpoint(frontier)
+        except BaseException:
+            # Including KeyboardInterrupt, so that a stopped crawl can be resumed from where it was
+            self._save_checkpoint(frontier)
+            raise
+
+    async def _crawl_concurrently(self, source: str, route: str, frontier_items: Optional[list] = None) -> None:
+        """Crawl the resource using a frontier queue consumed by concurrent fetchers.
+
+        The requests library is blocking, so the network calls are sent to a thread pool while the
+        frontier and the visited/dead links bookkeeping stay in the event loop (no locks needed).
+
+        Args:
+            source: The page source
+            route: The root route
+            frontier_items: The (link, depth, page) items of a resumed crawl, None to start from the root route
+        """
+        import asyncio
+
+        frontier = asyncio.Queue()
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            if frontier_items is None:
+                self._reserve_page()
+                with timed("throttle"):
+                    await asyncio.sleep(self._get_trottle_delay())
+                links = await asyncio.get_running_loop().run_in_executor(executor, self._get_page_links, source, route)
+                self._add_to_frontier(source, self._create_full_link(source, route), links, 1, frontier.put_nowait)
+            else:
+                for item in frontier_items:
+                    frontier.put_nowait(item)
+
+            workers = [
+                asyncio.create_task(self._crawl_worker(source, frontier, executor)) for _ in range(self.concurrency)
+            ]
+            join_task = asyncio.create_task(frontier.join())
+
+            try:
+                # A worker only finishes before the join if it raised or if the crawl is stopped. In this case we
+                # stop the crawl like the sequential crawl would do.
+                await asyncio.wait([join_task, *workers], return_when=asyncio.FIRST_COMPLETED)
+                for worker in workers:
+                    if worker.done():
+                        worker.result()
+                # A worker returned before the frontier was done
+                is_stopped = not join_task.done()
+            except BaseException:
+                # Including the cancellation of the crawl on KeyboardInterrupt. The workers only update the state
+                # between two awaits, so it is consistent here
+                self._save_checkpoint(self._get_queued_items(frontier))
+                raise
+            finally:
+                join_task.cancel()
+                for worker in workers:
+                    worker.cancel()
+                await asyncio.gather(join_task, *workers, return_exceptions=True)
+
+            if is_stopped:
+                # The other workers were cancelled between two awaits, so the state is consistent here too
+                self._stop_crawl(self._get_queued_items(frontier))
+
+    async def _crawl_worker(self, source: str, frontier: "asyncio.Queue", executor: ThreadPoolExecutor) -> None:
+        """Check the links from the frontier and scrape the internal ones.
+
+        Args:
+            source: The page source
+            frontier: The queue of links to check
+            executor: The executor used for the blocking calls
+        """
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+
+        while not self._is_stop_requested():
+            item = await frontier.get()
+            link, depth, page = item
+            self._sample_frontier(frontier.qsize(), depth)
+            try:
+                full_link = self._create_full_link(source, link)
+                to_crawl = self._should_crawl(link, source, depth)
+                self.__in_progress[item] = to_crawl
+                link_status = await loop.run_in_executor(executor, self._get_link_status, full_link, to_crawl)
+                self._on_link_checked(full_link, page, link_status, to_crawl)
+
+                if to_crawl and not link_status.is_dead:
+                    with timed("throttle"):
+                        await asyncio.sleep(self._get_trottle_delay())
+                    links = await loop.run_in_executor(executor, self._get_page_links, source, link)
+                    self._add_to_frontier(source, full_link, links, depth + 1, frontier.put_nowait)
+                    self.__pages_since_checkpoint += 1
+                del self.__in_progress[item]
+
+                if self._is_checkpoint_due():
+                    self._save_checkpoint(self._get_queued_items(frontier))
+            finally:
+                frontier.task_done()
+
+    def _is_stop_requested(self) -> bool:
+        """Check if the crawl should stop before the frontier is empty
+
+        Returns:
+            True if stop was called or if the time budget is spent
+        """
+        return self.__stop_event.is_set() or (self.__deadline is not None and time.monotonic() >= self.__deadline)
+
+    def _stop_crawl(self, frontier_items: Iterable) -> None:
+        """Stop the crawl and save its state
+
+        Args:
+            frontier_items: The (link, depth, page) items left in the frontier
+        """
+        self.__stopped = True
+        self._save_checkpoint(frontier_items)
+
+    # Pure function
+    @staticmethod
+    def _get_queued_items(frontier: "asyncio.Queue") -> list:
+        """Get the items of the frontier queue, without removing them
+
+        Args:
+            frontier: The queue
+
+        Returns:
+            The queued items, in order
+        """
+        # asyncio.Queue can't be read without taking the items, so they are put back in the same order
+        items = [frontier.get_nowait() for _ in range(frontier.qsize())]
+        for item in items:
+            frontier.put_nowait(item)
+            # put_nowait counts a new unfinished task, but the item was counted when it was first queued
+            frontier.task_done()
+
+        return items
+
+    def _is_checkpoint_due(self) -> bool:
+        """Check if enough pages were crawled since the last checkpoint
+
+        Returns:
+            True if the state should be saved
+        """
+        return (
+            self.checkpoint_path is not None
+            and self.checkpoint_interval > 0
+            and self.__pages_since_checkpoint >= self.checkpoint_interval
+        )
+
+    def _save_checkpoint(self, frontier_items: Iterable) -> None:
+        """Save the crawl state to the checkpoint file
+
+        Args:
+            frontier_items: The (link, depth, page) items left in the frontier
         """
-        self._check_trottle()
+        if self.checkpoint_path is None:
+            return
 
+        # The links in progress are checked again on resume, so they give back their reserved page
+        state = {
+            "frontier": [*self.__in_progress, *frontier_items],
+            "visited_links": self.__visited_links,
+            "dead_links": self.__dead_links,
+            "crawled_pages_cnt": self.__crawled_pages_cnt,
+            "reserved_pages_cnt": self.__reserved_pages_cnt - sum(self.__in_progress.values()),
+        }
+        save_checkpoint(self.checkpoint_path, self._resource, state)
+        self.__pages_since_checkpoint = 0
+
+        logger.debug("Checkpoint saved: %d link(s) left to check", len(state["frontier"]))
+
+    def _restore_state(self, state: dict) -> list:
+        """Restore the crawl state from a checkpoint
+
+        Args:
+            state: The state saved by _save_checkpoint
+
+        Returns:
+            The (link, depth, page) items of the frontier
+        """
+        self.__visited_links = state["visited_links"]
+        self.__dead_links = state["dead_links"]
+        self.__crawled_pages_cnt = state["crawled_pages_cnt"]
+        self.__reserved_pages_cnt = state["reserved_pages_cnt"]
+        self.__in_progress = {}
+        self.__pages_since_checkpoint = 0
+
+        return state["frontier"]
+
+    def _get_page_links(self, source: str, route: str) -> list:
+        """Scrape a page.
+
+        Args:
+            source: The page source
+            route: The page route
+
+        Returns:
+            The page links
+        """
         full_link = self._create_full_link(source, route)
-        links = self.__scrapper.get_links(full_link, self.show_exception_tb)
+        with timed("get_links"):
+            links = self.__scrapper.get_links(full_link, self.show_exception_tb)
+
+        stats = get_stats()
+        if stats is not None:
+            stats.count("pages")
 
         logger.debug("Crawling: %s. Found %d link(s)", full_link, len(links))
 
+        return links
+
+    def _add_to_frontier(self, source: str, page: str, links: list, depth: int, add: Callable) -> None:
+        """Add the unvisited links of a page to the frontier.
+
+        Args:
+            source: The page source
+            page: The page full link (reported as the source page of its dead links)
+            links: The page links
+            depth: The links depth (the root page links have a depth of 1)
+            add: The function adding a (link, depth, page) item to the frontier
+        """
+        # In snapshot mode, the links that the page already had in the last run are not checked again
+        snapshot_store = get_snapshot_store()
+        known_links = set()
+        if snapshot_store is not None:
+            known_links = snapshot_store.get_known_links(page, links)
+            snapshot_store.put(self.__snapshot_crawl_id, page, links)
+
         for link in links:
             full_link = self._create_full_link(source, link)
 
-            if not self._is_visited(full_link):
-                self._mark_visited(full_link)
+            # The link is marked visited when queued (not when checked) so that it is never queued twice
+            if self._is_visited(full_link):
+                continue
+            # A skipped link is not marked visited, another page may have it as a new link
+            if link in known_links and self._is_known_link_skipped(link, full_link, source, depth):
+                continue
+
+            self._mark_visited(full_link)
+            if self._is_link_to_check(full_link):
+                add((link, depth, page))
+
+    def _is_known_link_skipped(self, link: str, full_link: str, source: str, depth: int) -> bool:
+        """Check if a link already in the snapshot of its page is not checked again (see snapshot_store)
 
-                if self._is_link_to_check(full_link):
-                    is_dead_link, status_code = self._is_dead_link(full_link)
-                    logger.debug("Checking: %s %s", full_link, "Dead" if is_dead_link else "OK!")
-                    if is_dead_link:
-                        self._mark_dead(full_link, status_code)
-                    elif not self.disable_crawling and self._is_internal_link(link, source):
-                        self._crawl(source, link)
+        Args:
+            link: The link
+            full_link: The full link
+            source: The page source
+            depth: The link depth
+
+        Returns:
+            True if the link is skipped
+        """
+        # The pages to crawl are still fetched, their own links may have changed
+        if not self._is_link_to_check(full_link) or self._is_crawlable(link, source, depth):
+            return False
+
+        # The links found dead are checked until they are fixed, so they are reported by each run
+        snapshot_store = get_snapshot_store()
+        if snapshot_store.is_dead(full_link) or snapshot_store.is_sampled(full_link):
+            return False
+
+        stats = get_stats()
+        if stats is not None:
+            stats.count("links_unchanged")
+
+        return True
+
+    def _save_page_snapshots(self, is_done: bool) -> None:
+        """Publish the links of the scraped pages staged in the snapshot store, or drop them
+
+        Args:
+            is_done: All the links of the crawl were checked
+        """
+        snapshot_store = get_snapshot_store()
+        if snapshot_store is not None:
+            if is_done:
+                snapshot_store.publish(self.__snapshot_crawl_id)
+            else:
+                snapshot_store.discard(self.__snapshot_crawl_id)
+
+        self.__snapshot_crawl_id = None
+
+    def _should_crawl(self, link: str, source: str, depth: int) -> bool:
+        """Check if a link should be crawled (once checked) and reserve a page if so.
+
+        Args:
+            link: The link
+            source: The page source
+            depth: The link depth
+
+        Returns:
+            True if the link should be crawled
+        """
+        return self._is_crawlable(link, source, depth) and self._reserve_page()
+
+    def _is_crawlable(self, link: str, source: str, depth: int) -> bool:
+        """Check if a link is a page to crawl, without the max_pages budget (see _should_crawl)
+
+        Args:
+            link: The link
+            source: The page source
+            depth: The link depth
+
+        Returns:
+            True if the link is a page to crawl
+        """
+        if self.disable_crawling or not self._is_internal_link(link, source):
+            return False
+
+        return self.max_depth is None or depth <= self.max_depth
+
+    def _reserve_page(self) -> bool:
+        """Reserve a page from the max_pages budget.
+
+        Returns:
+            True if the page can be crawled
+        """
+        # Reserved before the page is fetched, so the concurrent fetchers can't go over the budget
+        if self.max_pages is not None and self.__reserved_pages_cnt >= self.max_pages:
+            return False
+
+        self.__reserved_pages_cnt += 1
+        return True
+
+    def _on_link_checked(self, full_link: str, page: str, link_status: LinkStatus, to_crawl: bool) -> None:
+        """Record the result of a link check.
+
+        Args:
+            full_link: The link
+            page: The page where the link was found
+            link_status: The link status
+            to_crawl: The link was reserved to be crawled
+        """
+        logger.debug("Checking: %s %s", full_link, "Dead" if link_status.is_dead else "OK!")
+
+        if self.link_listener is not None:
+            self.link_listener(full_link, page, link_status, to_crawl)
+
+        snapshot_store = get_snapshot_store()
+        if snapshot_store is not None:
+            snapshot_store.set_dead(full_link, link_status.is_dead)
+
+        if link_status.is_dead:
+            self._mark_dead(
+                DeadLink(full_link, link_status.reason, page, link_status.status_code, link_status.latency_ms)
+            )
+            if to_crawl:
+                # Give back the page that won't be crawled
+                self.__reserved_pages_cnt -= 1
 
     def _is_visited(self, link: str) -> bool:
         """Check if the link is already visited
@@ -124,6 +661,7 @@ class Crawler(ABC):
         Returns:
             True if the link is visited
         """
+        # The index is keyed on the canonical url, so http://Hello.com:80/a/ and http://hello.com/a are the same.
         # For advanced check, we can hash the body of page to exclude adds and un-used query parameters
         # But we felt that this would make a bigger project (to implement the right hashing function)
         return link in self.__visited_links
@@ -135,16 +673,21 @@ class Crawler(ABC):
             link: The link to mark
 
         """
-        self.__visited_links.append(link)
+        self.__visited_links.add(link)
 
-    def _mark_dead(self, link: str, error_status_code: int) -> None:
+    def _mark_dead(self, dead_link: DeadLink) -> None:
         """Mark the link as dead
 
         Args:
-            link: The link to mark
+            dead_link: The dead link to mark
 
         """
-        self.__dead_links.append((link, error_status_code))
+        reporter = get_reporter()
+        if reporter is not None:
+            # Written as soon as it is found, so the dead links are not kept in memory
+            reporter.report(self._resource, dead_link)
+        else:
+            self.__dead_links.append(dead_link)
 
     # Pure function
     @staticmethod
@@ -163,26 +706,118 @@ class Crawler(ABC):
 
         return False
 
-    def _is_dead_link(self, link: str) -> Tuple[str, str]:
+    def _is_dead_link(self, link: str, keep_body: bool = False) -> Tuple[str, str]:
         """Check if link is dead using the http response code
 
         Args:
             link: The link
+            keep_body: Keep the page body for the scraper (the link is about to be crawled)
 
         Return:
             (True, Reason) if the link is dead else (False, None)
         """
+        link_status = self._get_link_status(link, keep_body)
+        return link_status.is_dead, link_status.reason
+
+    def _get_link_status(self, link: str, keep_body: bool = False) -> LinkStatus:
+        """Check a link, using the shared stores if possible
 
+        Args:
+            link: The link
+            keep_body: Keep the page body for the scraper (the link is about to be crawled)
+
+        Return:
+            The link status
+        """
+        stats = get_stats()
+        if stats is not None:
+            stats.count("links_checked")
+
+        with timed("check_link"):
+            return self._get_uncounted_link_status(link, keep_body)
+
+    def _get_uncounted_link_status(self, link: str, keep_body: bool) -> LinkStatus:
+        """Check a link, using the shared stores if possible (see _get_link_status)
+
+        Args:
+            link: The link
+            keep_body: Keep the page body for the scraper
+
+        Return:
+            The link status
+        """
+        store = get_status_store()
+
+        if keep_body:
+            # A page to crawl is fetched anyway, so the cache is only used for the links that are just checked.
+            # A page known dead by another crawler of the run is not fetched since there is nothing to scrape
+            link_status = store.get(link) if store is not None else None
+            if link_status is not None and link_status.is_dead:
+                return link_status
+
+            link_status = self._check_link(link, keep_body)
+            if store is not None:
+                store.put(link, link_status)
+            return link_status
+
+        if store is not None:
+            return store.get_or_check(link, self._check_cached_link)
+
+        return self._check_cached_link(link)
+
+    def _check_cached_link(self, link: str) -> LinkStatus:
+        """Check a link using the link status cache
+
+        Args:
+            link: The link
+
+        Return:
+            The link status
+        """
+        cache = get_cache()
+
+        if cache is not None:
+            cached_status = cache.get(link)
+            if cached_status is not None:
+                return LinkStatus(*cached_status, latency_ms=None)
+
+        link_status = self._check_link(link, False)
+
+        if cache is not None:
+            cache.put(link, link_status.is_dead, link_status.reason, link_status.status_code)
+
+        return link_status
+
+    def _check_link(self, link: str, keep_body: bool) -> LinkStatus:
+        """Send a request to check if link is dead
+
+        Args:
+            link: The link
+            keep_body: Keep the page body for the scraper
+
+        Return:
+            The link status
+        """
+        # requests is slow to import, it is only imported once a link is sent (the pages without external
+        # links are checked offline)
+        import requests
+
+        start = time.perf_counter()
         try:
-            response = requests.get(link)
+            response = self._send_liveness_request(link, keep_body)
 
             # Using "raise_for_status", the requests library will check if the status code
             # is within the valid range
             response.raise_for_status()
 
-            return False, None
+            return LinkStatus(False, None, response.status_code, self._get_latency_ms(start))
         except requests.exceptions.HTTPError as e:
-            return True, f"Bad status code: {e.response.status_code} '{e.response.reason}'"
+            return LinkStatus(
+                True,
+                get_bad_status_reason(e.response.status_code, e.response.reason),
+                e.response.status_code,
+                self._get_latency_ms(start),
+            )
         except Exception as e:
             if self.show_exception_tb:
                 logger.error("Error occured while checking %s", link, exc_info=True)
@@ -190,12 +825,83 @@ class Crawler(ABC):
             # "Connection Error" is used to abstract the real error message sine it can be
             # Hard to read/understand. An advanced user can still see the origina exception
             # using the verbose mode.
-            return True, "Connection error"
+            return LinkStatus(True, "Connection error", None, self._get_latency_ms(start))
+
+    # Pure function
+    @staticmethod
+    def _get_latency_ms(start: float) -> float:
+        """Get the time elapsed since start
+
+        Args:
+            start: The perf_counter value when the request was sent
+
+        Returns:
+            The elapsed time in ms (rounded to 0.1 ms)
+        """
+        return round((time.perf_counter() - start) * 1000, 1)
+
+    def _send_liveness_request(self, link: str, keep_body: bool):
+        """Send the request used to check a link
+
+        Args:
+            link: The link
+            keep_body: Download and keep the page body for the scraper
+
+        Returns:
+            The response
+        """
+        client = get_client()
+
+        if keep_body:
+            # In incremental mode, the page is only downloaded if it changed since the last crawl
+            page_store = get_page_store()
+            headers = page_store.get_conditional_headers(link) if page_store is not None else None
+            # A streaming scraper reads the body by chunks, so it is not downloaded (nor kept) here
+            return client.get(link, keep_body=True, headers=headers, stream=self.__scrapper.extractor == "streaming")
+
+        if self.liveness_check == "get":
+            return client.get(link)
+
+        if self.liveness_check == "head":
+            response = client.head(link)
+            if response.status_code not in HEAD_REJECTED_STATUS_CODES:
+                return response
+            logger.debug("HEAD rejected by %s, falling back to GET", link)
+            return client.get(link)
+
+        # Closing the streamed response before reading the content skips the body download
+        response = client.get(link, stream=True)
+        response.close()
+        return response
 
     def _check_trottle(self) -> None:
         """Check if a trottle is needed and sleep is yes"""
+        with timed("throttle"):
+            time.sleep(self._get_trottle_delay())
+
+    # Pure function
+    @staticmethod
+    def _sample_frontier(size: int, depth: int) -> None:
+        """Add a frontier sample to the statistics (if enabled)
+
+        Args:
+            size: The number of links left in the frontier
+            depth: The depth of the link taken from the frontier
+        """
+        stats = get_stats()
+        if stats is not None:
+            stats.add_frontier_sample(size, depth)
+
+    def _get_trottle_delay(self) -> int:
+        """Count the crawled page and get the time to sleep before crawling it.
+
+        Returns:
+            The sleep duration in secs (0 if no trottle is needed)
+        """
         self.__crawled_pages_cnt += 1
 
         if self.throttle_duration_sec > 0 and self.__crawled_pages_cnt % 10 == 0:
             logger.debug("Sleeping for %d", self.throttle_duration_sec)
-            time.sleep(self.throttle_duration_sec)
+            return self.throttle_duration_sec
+
+        return 0
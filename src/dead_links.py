@@ -0,0 +1,91 @@
+import math
+from array import array
+from typing import Iterator, List, Optional, Union
+
+from src.reporters import DeadLink
+from src.url_index import split_url_prefix
+
+
+class DeadLinkList:
+    def __init__(self) -> None:
+        """Init the dead links list.
+
+        A crawl can find a lot of dead links, so they are not kept as DeadLink tuples (about 100 bytes each, plus
+        their strings). The fields are stored by column: the strings shared by many dead links (the reasons, the
+        source pages and the scheme://host prefixes of the links) are stored once and referenced by their number,
+        and the numbers are kept in arrays. The DeadLink tuples are created again when the list is read.
+        """
+        # The shared strings, and their number
+        self.__strings = []
+        self.__string_ids = {}
+
+        self.__link_prefix_ids = array("I")
+        self.__link_rests = []
+        self.__reason_ids = array("I")
+        # The source ids and the status codes are -1 for None, the latencies nan
+        self.__source_ids = array("i")
+        self.__status_codes = array("i")
+        self.__latencies_ms = array("d")
+
+    def append(self, dead_link: DeadLink) -> None:
+        """Add a dead link
+
+        Args:
+            dead_link: The dead link
+        """
+        prefix, rest = split_url_prefix(dead_link.link)
+        self.__link_prefix_ids.append(self._get_string_id(prefix))
+        self.__link_rests.append(rest)
+        self.__reason_ids.append(self._get_string_id(dead_link.reason))
+        self.__source_ids.append(self._get_string_id(dead_link.source) if dead_link.source is not None else -1)
+        self.__status_codes.append(dead_link.status_code if dead_link.status_code is not None else -1)
+        self.__latencies_ms.append(dead_link.latency_ms if dead_link.latency_ms is not None else math.nan)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[DeadLink, List[DeadLink]]:
+        if isinstance(index, slice):
+            # Like a list, a slice is a new list
+            return [self[position] for position in range(*index.indices(len(self)))]
+
+        source_id = self.__source_ids[index]
+        status_code = self.__status_codes[index]
+        latency_ms = self.__latencies_ms[index]
+
+        return DeadLink(
+            self.__strings[self.__link_prefix_ids[index]] + self.__link_rests[index],
+            self.__strings[self.__reason_ids[index]],
+            self.__strings[source_id] if source_id != -1 else None,
+            status_code if status_code != -1 else None,
+            latency_ms if not math.isnan(latency_ms) else None,
+        )
+
+    def __iter__(self) -> Iterator[DeadLink]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def __len__(self) -> int:
+        return len(self.__link_rests)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, (DeadLinkList, list, tuple)):
+            return NotImplemented
+
+        return list(self) == list(other)
+
+    def __repr__(self) -> str:
+        return f"DeadLinkList({list(self)!r})"
+
+    def _get_string_id(self, value: Optional[str]) -> int:
+        """Get the number of a shared string, adding it if it is new
+
+        Args:
+            value: The string
+
+        Returns:
+            The string number
+        """
+        string_id = self.__string_ids.get(value)
+        if string_id is None:
+            string_id = self.__string_ids[value] = len(self.__strings)
+            self.__strings.append(value)
+
+        return string_id
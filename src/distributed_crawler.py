@@ -0,0 +1,178 @@
+import logging
+import time
+from typing import List, Optional, Tuple
+
+from src.crawler import CrawlerException, LinkStatus
+from src.reporters import DeadLink
+from src.shared_frontier import SharedFrontier, get_shard
+from src.web_crawler import WebCrawler
+
+logger = logging.getLogger(__name__)
+
+
+class DistributedCrawler(WebCrawler):
+    def __init__(
+        self,
+        webpage_url: str,
+        show_exception_tb: bool,
+        throttle_duration_sec: int,
+        frontier: SharedFrontier,
+        worker_index: int,
+        workers_cnt: int,
+        liveness_check: str = "head",
+        max_depth: Optional[int] = None,
+        max_pages: Optional[int] = None,
+        time_budget_sec: Optional[float] = None,
+        lease_size: int = 16,
+        poll_interval_sec: float = 0.5,
+    ) -> None:
+        """Init a worker of a distributed crawl.
+
+        The workers share the frontier and the dead links report (see SharedFrontier). A worker only checks the
+        links of the hosts of its shard, so the requests sent to a host come from one worker (unless its worker
+        stopped, then its shard is checked by the others).
+
+        Args:
+            webpage_url: The web page url to crawl
+            show_exception_tb: Enables exception trace back logging
+            throttle_duration_sec: The trottle duration
+            frontier: The shared frontier
+            worker_index: The index of the worker, which is its shard
+            workers_cnt: The number of workers of the crawl
+            liveness_check: How the links that are not crawled are checked (one of LIVENESS_CHECKS)
+            max_depth: The maximum depth of the crawled pages, None for no limit
+            max_pages: The maximum number of pages crawled by all the workers, None for no limit
+            time_budget_sec: Stop the worker after this duration, None for no limit
+            lease_size: The number of links taken from the frontier at once
+            poll_interval_sec: How long the worker waits when its shard has no link left but the crawl is not done
+        """
+        super().__init__(
+            webpage_url,
+            show_exception_tb,
+            throttle_duration_sec,
+            False,
+            liveness_check=liveness_check,
+            max_depth=max_depth,
+            max_pages=max_pages,
+            time_budget_sec=time_budget_sec,
+        )
+        self.__frontier = frontier
+        self.worker_index = worker_index
+        self.workers_cnt = workers_cnt
+        self.lease_size = lease_size
+        self.poll_interval_sec = poll_interval_sec
+
+    def _crawl_resource(self) -> None:
+        """Join the crawl of the resource and check the links of the worker shard until the frontier is empty
+
+        The source is not verified by each worker: the root link is checked (and scraped) by the worker of its
+        shard like the other links, which aborts the crawl of all the workers if it is dead.
+        """
+        self.clear()
+
+        if not self.__frontier.seed(self._resource, self.workers_cnt, self._get_root_route(), self.worker_index):
+            raise CrawlerException(f"The shared frontier belongs to another crawl than {self._resource}")
+
+        leased_ids = []
+        try:
+            while not self._is_stop_requested():
+                error_message = self.__frontier.get_error()
+                if error_message is not None:
+                    raise CrawlerException(error_message)
+
+                items = self.__frontier.lease(self.worker_index, self.lease_size)
+                if not items:
+                    if self.__frontier.is_done():
+                        return
+
+                    # The other workers may still find links for this shard
+                    time.sleep(self.poll_interval_sec)
+                    continue
+
+                leased_ids = [item[0] for item in items]
+                for item_id, link, depth, page in items:
+                    if self._is_stop_requested():
+                        break
+
+                    self.__frontier.complete(self.worker_index, item_id, self._check_item(link, depth, page))
+                    leased_ids.remove(item_id)
+
+            # The links of the frontier are left for the next run
+            self._stop_crawl([])
+        finally:
+            # Stopped, done or failed, the links taken but not checked and the shard of this worker are given to
+            # the other workers, which would otherwise wait for them forever
+            if leased_ids:
+                self.__frontier.release(leased_ids)
+            self.__frontier.leave(self.worker_index)
+
+    def _check_item(self, link: str, depth: int, page: Optional[str]) -> List[Tuple[str, str, int, str, int]]:
+        """Check a link of the frontier and scrape it if it is an internal page
+
+        Args:
+            link: The link
+            depth: The link depth
+            page: The page where the link was found
+
+        Returns:
+            The (full link, link, depth, page, shard) of the links to add to the frontier
+        """
+        source = self._resource
+        full_link = self._create_full_link(source, link)
+
+        # The same link may have been added by several pages (its shard is owned by this worker only)
+        if self._is_visited(full_link):
+            return []
+        self._mark_visited(full_link)
+
+        to_crawl = self._should_crawl(link, source, depth)
+        link_status = self._get_link_status(full_link, keep_body=to_crawl)
+        self._on_link_checked(full_link, page, link_status, to_crawl)
+
+        if page is None and link_status.is_dead:
+            # The root link: like the source check of the other crawlers, there is no need to continue
+            error_message = f"The source web page link ({self._resource}) is not accessible"
+            self.__frontier.abort(error_message)
+            raise CrawlerException(error_message)
+
+        if not to_crawl or link_status.is_dead:
+            return []
+
+        self._check_trottle()
+        new_items = []
+        for new_link in self._get_page_links(source, link):
+            new_full_link = self._create_full_link(source, new_link)
+            shard = get_shard(new_full_link, self.workers_cnt)
+            # Only the visited index of this worker shard is known here, the other workers filter their links
+            if shard == self.worker_index and self._is_visited(new_full_link):
+                continue
+            if self._is_link_to_check(new_full_link):
+                new_items.append((new_full_link, new_link, depth + 1, full_link, shard))
+
+        return new_items
+
+    def _reserve_page(self) -> bool:
+        """Reserve a page from the max_pages budget shared by the workers.
+
+        Returns:
+            True if the page can be crawled
+        """
+        if self.max_pages is None:
+            return True
+
+        return self.__frontier.reserve_page(self.max_pages)
+
+    def _on_link_checked(self, full_link: str, page: str, link_status: LinkStatus, to_crawl: bool) -> None:
+        super()._on_link_checked(full_link, page, link_status, to_crawl)
+
+        if link_status.is_dead and to_crawl and self.max_pages is not None:
+            # Give back the shared page that won't be crawled
+            self.__frontier.reserve_page(self.max_pages, -1)
+
+    def _mark_dead(self, dead_link: DeadLink) -> None:
+        """Add the dead link to the report shared by the workers
+
+        Args:
+            dead_link: The dead link to mark
+        """
+        self.__frontier.add_dead_link(self.worker_index, dead_link)
@@ -0,0 +1,52 @@
+import logging
+from typing import Iterator
+
+from src.stream_extractor import BODY_END_TAG, BODY_START_PATTERN, LINK_PATTERN
+
+logger = logging.getLogger(__name__)
+
+BODY_START_TAG = "<body"
+
+
+def iter_links(page_content: str) -> Iterator[str]:
+    """Extract the links of the page body, as they are found
+
+    Gives the same links as the regex extractor (Scraper._extract_body then Scraper._get_links_from_body) in a
+    single pass: the body bounds are found by offset and the links are searched between them, so the body is
+    never copied and no list is built.
+
+    Args:
+        page_content: The page content
+
+    Returns:
+        The links
+    """
+    # The <body> regex can't match without "<body", a plain substring search is much faster
+    body_start = BODY_START_PATTERN.search(page_content) if BODY_START_TAG in page_content else None
+    # Like the greedy body regex, the body ends at the last </body> tag
+    body_end = page_content.rfind(BODY_END_TAG) if body_start is not None else -1
+
+    if body_start is None or body_end < body_start.end():
+        logger.error("Failed to extract web page body for %s", page_content)
+        return
+
+    for match in LINK_PATTERN.finditer(page_content, body_start.end(), body_end):
+        href_link, scheme, host, path = match.groups()
+        if href_link:
+            yield href_link
+        if scheme:
+            # Text url
+            yield scheme + host + (path or "")
+
+
+# Pure function
+def get_links(page_content: str) -> list:
+    """Extract the links of the page body (see iter_links)
+
+    Args:
+        page_content: The page content
+
+    Returns:
+        The list of links
+    """
+    return list(iter_links(page_content))
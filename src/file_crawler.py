@@ -1,18 +1,41 @@
 import os
+from typing import Iterator, Tuple
 
 from src.crawler import Crawler, CrawlerException
 from src.file_scrapper import FileScrapper
 
+# The files crawled by the dir resource type
+HTML_FILE_EXTENSIONS = (".html", ".htm")
+
+
+def find_files(directory: str, extensions: Tuple[str, ...] = HTML_FILE_EXTENSIONS) -> Iterator[str]:
+    """Walk a directory tree to find the files to crawl
+
+    Args:
+        directory: The root directory
+        extensions: The extensions of the files to find (case insensitive)
+
+    Returns:
+        The file paths, sorted so the output is the same for each run
+    """
+    for root, directories, files in os.walk(directory):
+        # os.walk follows the order of the list when it goes down the tree
+        directories.sort()
+        for file_name in sorted(files):
+            if file_name.lower().endswith(extensions):
+                yield os.path.join(root, file_name)
+
 
 class FileCrawler(Crawler):
-    def __init__(self, file_path: str, show_exception_tb: bool) -> None:
+    def __init__(self, file_path: str, show_exception_tb: bool, liveness_check: str = "head") -> None:
         """Init the file crawler object.
 
         Args:
             file_path: The file path to crawl
             show_exception_tb: Enables exception trace back logging
+            liveness_check: How the links are checked (one of LIVENESS_CHECKS)
         """
-        super().__init__(file_path, show_exception_tb, True, -1, FileScrapper)
+        super().__init__(file_path, show_exception_tb, True, -1, FileScrapper, liveness_check=liveness_check)
 
     # Pure function
     def _get_root_route(self) -> str:
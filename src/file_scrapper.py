@@ -1,12 +1,55 @@
 import logging
-from lxml import etree
-from io import StringIO
+from typing import Iterator
+from src import mmap_extractor
 from src.scrapper import Scraper
+from src.stats import timed
 
 logger = logging.getLogger(__name__)
 
 
 class FileScrapper(Scraper):
+    # Set by main.py (--mmap): the links are found in the memory mapped file bytes instead of the decoded content
+    use_mmap = False
+
+    @classmethod
+    def get_links(cls, resource: str, show_exception_tb: bool) -> list:
+        """Extract the links for the resource
+
+        Args:
+            resource: The resource file path
+            show_exception_tb: Enables exception trace back logging
+
+        Returns:
+            The list of links
+        """
+        if cls.use_mmap:
+            return list(cls.iter_links(resource, show_exception_tb))
+
+        return super().get_links(resource, show_exception_tb)
+
+    @classmethod
+    def iter_links(cls, resource: str, show_exception_tb: bool) -> Iterator[str]:
+        """Extract the links for the resource as they are found
+
+        Args:
+            resource: The resource file path
+            show_exception_tb: Enables exception trace back logging
+
+        Returns:
+            The links as they are found (no link on failure)
+        """
+        if not cls.use_mmap:
+            yield from super().iter_links(resource, show_exception_tb)
+            return
+
+        try:
+            with timed("extract_links"):
+                yield from mmap_extractor.iter_file_links(resource)
+        except Exception as e:
+            logger.error("Failed to get page content for %s", resource)
+            if show_exception_tb:
+                logger.exception(e)
+
     @classmethod
     def _get_page_content(cls, resource: str, show_exception_tb: bool) -> str:
         """Get the page content
@@ -29,3 +72,25 @@ class FileScrapper(Scraper):
             return ""
 
         return web_page_content
+
+    @classmethod
+    def _iter_page_content(cls, resource: str, show_exception_tb: bool) -> Iterator[str]:
+        """Get the page content chunk by chunk
+
+        Args:
+            resource: The resource file path
+            show_exception_tb: Enables exception trace back logging
+
+        Returns:
+            The page content chunks (no chunk on failure)
+        """
+        try:
+            with open(resource, "r") as file_handle:
+                chunk = file_handle.read(cls.chunk_size)
+                while chunk:
+                    yield chunk
+                    chunk = file_handle.read(cls.chunk_size)
+        except Exception as e:
+            logger.error("Failed to get page content for %s", resource)
+            if show_exception_tb:
+                logger.exception(e)
@@ -3,14 +3,15 @@ from src.html_scraper import HTMLScrapper
 
 
 class HTMLCrawler(Crawler):
-    def __init__(self, html_content: str, show_exception_tb: bool) -> None:
+    def __init__(self, html_content: str, show_exception_tb: bool, liveness_check: str = "head") -> None:
         """Init the html crawler object.
 
         Args:
             html_content: The html content
             show_exception_tb: Enables exception trace back logging
+            liveness_check: How the links are checked (one of LIVENESS_CHECKS)
         """
-        super().__init__(html_content, show_exception_tb, True, -1, HTMLScrapper)
+        super().__init__(html_content, show_exception_tb, True, -1, HTMLScrapper, liveness_check=liveness_check)
 
     # Pure function
     def _get_root_route(self) -> str:
@@ -1,6 +1,4 @@
 import logging
-from lxml import etree
-from io import StringIO
 from src.scrapper import Scraper
 
 logger = logging.getLogger(__name__)
@@ -0,0 +1,407 @@
+import logging
+import socket
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Callable, Iterator, Optional, Tuple
+
+from src.politeness import HostScheduler, parse_retry_after
+from src.stats import get_stats
+from src.url_index import canonicalize_url
+
+if TYPE_CHECKING:
+    import requests
+
+logger = logging.getLogger(__name__)
+
+# Status codes sent by overloaded or rate limiting servers, with a Retry-After header
+RETRY_AFTER_STATUS_CODES = (429, 503)
+
+# The content types of the pages that are downloaded and scraped
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml")
+
+
+class HttpClient:
+    def __init__(
+        self,
+        max_connections_per_host: int = 10,
+        max_retries: int = 2,
+        retry_backoff_sec: float = 0.3,
+        max_prefetched_pages: int = 100,
+        scheduler: Optional[HostScheduler] = None,
+        max_retry_after_attempts: int = 2,
+        connect_timeout_sec: Optional[float] = 10,
+        read_timeout_sec: Optional[float] = 30,
+        max_body_bytes: int = 10 * 1024 * 1024,
+        scraped_content_types: Optional[Tuple[str, ...]] = HTML_CONTENT_TYPES,
+        body_timeout_sec: Optional[float] = 60,
+    ) -> None:
+        """Init the http client.
+
+        Args:
+            max_connections_per_host: The size of the keep-alive connection pool of each host
+            max_retries: The number of retries on connection errors and 502/504 responses
+            retry_backoff_sec: The backoff factor between the retries
+            max_prefetched_pages: The maximum number of page bodies kept for reuse
+            scheduler: The per host politeness scheduler (no limit by default)
+            max_retry_after_attempts: The number of retries of a 429/503 response with a Retry-After header
+            connect_timeout_sec: The time to wait for a connection, None to wait forever
+            read_timeout_sec: The time to wait for each read of the response (not for the whole body), None to
+                wait forever
+            max_body_bytes: The body of a larger response is cut at this size, 0 for no limit
+            scraped_content_types: The content types of the bodies that are downloaded, None to download them all.
+                The responses without a Content-Type header are downloaded
+            body_timeout_sec: The time allowed to download a body, None for no limit. The chunks read until then
+                are kept, like a body cut at max_body_bytes
+        """
+        # requests is slow to import, so it is only imported once a client is needed (see get_client)
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        self.max_prefetched_pages = max_prefetched_pages
+        self.scheduler = scheduler if scheduler is not None else HostScheduler()
+        self.max_retry_after_attempts = max_retry_after_attempts
+        self.timeout = (connect_timeout_sec, read_timeout_sec)
+        self.max_body_bytes = max_body_bytes
+        self.scraped_content_types = scraped_content_types
+        self.body_timeout_sec = body_timeout_sec
+
+        # raise_on_status=False gives back the last response once the retries are exhausted, so the
+        # caller reports the real status code instead of a retry error.
+        # 429/503 are retried by _send since their Retry-After pauses the whole host, not only this request
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=retry_backoff_sec,
+            status_forcelist=(502, 504),
+            raise_on_status=False,
+        )
+        # pool_block makes the per host limit a hard limit (threads wait for a free connection)
+        adapter = HTTPAdapter(
+            pool_connections=max_connections_per_host,
+            pool_maxsize=max_connections_per_host,
+            max_retries=retry,
+            pool_block=True,
+        )
+
+        self.__session = requests.Session()
+        self.__session.mount("http://", adapter)
+        self.__session.mount("https://", adapter)
+
+        self.__prefetched = OrderedDict()
+        self.__prefetched_lock = threading.Lock()
+
+    def get(self, url: str, keep_body: bool = False, stream: bool = False, headers: dict = None) -> "requests.Response":
+        """Send a GET request using the pooled session
+
+        Args:
+            url: The url
+            keep_body: Keep the response of a successful request (including a 304 Not Modified) so the page
+                can be scraped without being fetched again (see pop_prefetched). A streamed response is not kept
+            stream: Only wait for the headers. The body is not downloaded unless the content is read (see
+                iter_body)
+            headers: The request headers
+
+        Returns:
+            The response. Without stream, its content is the body cut at max_body_bytes, empty if the content
+            type is not scraped
+        """
+        # The headers are received first, so an unwanted body is never downloaded
+        response = self._send("GET", url, stream=True, headers=headers)
+        if not stream:
+            self._read_body(response)
+
+        if keep_body and response.ok and not stream:
+            with self.__prefetched_lock:
+                # Keyed on the canonical url, so http://hello.com/ and http://hello.com are the same page
+                self.__prefetched[canonicalize_url(url)] = response
+                if len(self.__prefetched) > self.max_prefetched_pages:
+                    # Drop the oldest one, it will just be fetched again if it is ever scraped
+                    _, dropped_response = self.__prefetched.popitem(last=False)
+                    dropped_response.close()
+        elif keep_body and stream:
+            # A streamed response holds its pooled connection until its body is read. Kept until the page is
+            # scraped (or forever if it never is), it would block the other requests to the host (pool_block), so
+            # the connection is released now and the scraper streams the page again
+            response.close()
+
+        return response
+
+    def head(self, url: str) -> "requests.Response":
+        """Send a HEAD request using the pooled session
+
+        Args:
+            url: The url
+
+        Returns:
+            The response
+        """
+        # Unlike get, requests does not follow the redirects of a HEAD request by default
+        return self._send("HEAD", url, allow_redirects=True)
+
+    def is_scraped(self, response: "requests.Response") -> bool:
+        """Check if the body of a response should be downloaded (see scraped_content_types)
+
+        Args:
+            response: The response
+
+        Returns:
+            True if the content type is scraped
+        """
+        content_type = response.headers.get("Content-Type")
+        if self.scraped_content_types is None or not content_type:
+            return True
+
+        # Without the parameters (text/html; charset=utf-8)
+        return content_type.split(";")[0].strip().lower() in self.scraped_content_types
+
+    def is_body_cut(self, response: "requests.Response") -> bool:
+        """Check if the downloaded body was cut at max_body_bytes or body_timeout_sec
+
+        Args:
+            response: The response (not streamed)
+
+        Returns:
+            True if the body was cut
+        """
+        # Set by iter_body
+        return getattr(response, "_body_cut", False)
+
+    def iter_body(self, response: "requests.Response", chunk_size: int) -> Iterator[bytes]:
+        """Read the body of a streamed response chunk by chunk, up to max_body_bytes
+
+        Args:
+            response: The streamed response
+            chunk_size: The chunk size
+
+        Returns:
+            The body chunks, until body_timeout_sec. The response is closed once they are read
+        """
+        read_bytes_cnt = 0
+        start = time.perf_counter()
+
+        # The read timeout applies to each read, so a server sending a byte now and then could hold the download
+        # for max_body_bytes reads. At the deadline, the connection is shut down, which ends the read in progress
+        timed_out = threading.Event()
+        deadline_timer = None
+        if self.body_timeout_sec is not None:
+            deadline_timer = threading.Timer(self.body_timeout_sec, self._stop_download, (response, timed_out))
+            deadline_timer.daemon = True
+            deadline_timer.start()
+
+        try:
+            for chunk in response.iter_content(chunk_size):
+                if self.max_body_bytes > 0 and read_bytes_cnt + len(chunk) > self.max_body_bytes:
+                    logger.warning("Body of %s cut at %d bytes", response.url, self.max_body_bytes)
+                    response._body_cut = True
+                    chunk = chunk[: self.max_body_bytes - read_bytes_cnt]
+                    read_bytes_cnt += len(chunk)
+                    yield chunk
+                    break
+
+                read_bytes_cnt += len(chunk)
+                yield chunk
+
+                if timed_out.is_set():
+                    break
+        except Exception:
+            # The read ended by the shutdown fails (incomplete body), the chunks read until then are kept
+            if not timed_out.is_set():
+                raise
+        finally:
+            if deadline_timer is not None:
+                deadline_timer.cancel()
+            response.close()
+
+            stats = get_stats()
+            if stats is not None:
+                stats.add_phase_time("http_body", time.perf_counter() - start)
+                stats.add_bytes(response.url, read_bytes_cnt)
+
+        if timed_out.is_set():
+            response._body_cut = True
+            logger.warning(
+                "Body of %s cut after %s sec(s) (%d bytes)", response.url, self.body_timeout_sec, read_bytes_cnt
+            )
+
+    @staticmethod
+    def _stop_download(response: "requests.Response", timed_out: threading.Event) -> None:
+        """Stop the download of a body from another thread (see iter_body)
+
+        Args:
+            response: The streamed response
+            timed_out: Set to tell the reading thread that the download was stopped
+        """
+        timed_out.set()
+
+        # Closing the socket would not end a read in progress, shutting it down does
+        connection = getattr(response.raw, "_connection", None)
+        connection_socket = getattr(connection, "sock", None)
+        if connection_socket is not None:
+            try:
+                connection_socket.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                # The connection was closed in the meantime
+                pass
+
+    def _read_body(self, response: "requests.Response") -> None:
+        """Download the body of a streamed response, if its content type is scraped
+
+        Args:
+            response: The streamed response
+        """
+        if self.is_scraped(response):
+            content = b"".join(self.iter_body(response, 64 * 1024))
+        else:
+            logger.debug("Body of %s not downloaded (%s)", response.url, response.headers.get("Content-Type"))
+            response.close()
+            content = b""
+
+        # The body was read by chunks, requests gives it back as if it was downloaded with the response
+        response._content = content
+        response._content_consumed = True
+
+    def _send(self, method: str, url: str, **kwargs) -> "requests.Response":
+        """Send a request when the scheduler allows it, honoring the Retry-After headers
+
+        Args:
+            method: The http method
+            url: The url
+            kwargs: The requests arguments
+
+        Returns:
+            The response
+        """
+        import requests
+
+        for attempt in range(self.max_retry_after_attempts + 1):
+            requested_at = time.perf_counter()
+            release_slot = self.scheduler.acquire_slot(url)
+            sent_at = time.perf_counter()
+            try:
+                response = self.__session.request(method, url, timeout=self.timeout, **kwargs)
+            except BaseException as e:
+                release_slot()
+                if isinstance(e, requests.exceptions.RequestException) and get_stats() is not None:
+                    get_stats().count("connection_errors")
+                raise
+            received_at = time.perf_counter()
+
+            if kwargs.get("stream"):
+                # The body is still to be downloaded, so the host slot is held until the response is closed (the
+                # body reads close it), and --host_max_concurrency also limits the downloads
+                self._release_on_close(response, release_slot)
+            else:
+                release_slot()
+
+            self._add_stats(url, response, sent_at - requested_at, received_at - sent_at)
+
+            if response.status_code not in RETRY_AFTER_STATUS_CODES or attempt == self.max_retry_after_attempts:
+                break
+
+            retry_after_sec = parse_retry_after(response.headers.get("Retry-After"))
+            if retry_after_sec is None:
+                break
+
+            # Pausing the host (instead of sleeping here) also holds the other requests sent to it
+            response.close()
+            self.scheduler.pause_host(url, retry_after_sec)
+
+        return response
+
+    # Pure function
+    @staticmethod
+    def _release_on_close(response: "requests.Response", release_slot: Callable[[], None]) -> None:
+        """Release the host slot of a streamed response once it is closed
+
+        Args:
+            response: The streamed response
+            release_slot: The function releasing the slot
+        """
+        close = response.close
+
+        def close_and_release() -> None:
+            try:
+                close()
+            finally:
+                release_slot()
+
+        response.close = close_and_release
+        # A response dropped without being closed gives its slot back when it is collected
+        weakref.finalize(response, release_slot)
+
+    # Pure function
+    @staticmethod
+    def _add_stats(url: str, response: "requests.Response", wait_sec: float, request_sec: float) -> None:
+        """Add a request to the statistics (if enabled)
+
+        Args:
+            url: The url
+            response: The response
+            wait_sec: The time waited for the politeness scheduler
+            request_sec: The request duration, until the headers (the bodies are counted by iter_body)
+        """
+        stats = get_stats()
+        if stats is None:
+            return
+
+        stats.add_phase_time("politeness_wait", wait_sec)
+        stats.add_phase_time("http_request", request_sec)
+        # elapsed is the time until the headers were parsed (DNS, connection, server time)
+        stats.add_phase_time("http_first_byte", response.elapsed.total_seconds())
+        stats.add_request(url, request_sec)
+
+    def pop_prefetched(self, url: str) -> Optional["requests.Response"]:
+        """Get (and forget) the response kept by a previous get
+
+        Args:
+            url: The url
+
+        Returns:
+            The response if it was kept else None
+        """
+        with self.__prefetched_lock:
+            return self.__prefetched.pop(canonicalize_url(url), None)
+
+    def close(self) -> None:
+        """Close the pooled connections"""
+        self.__session.close()
+
+
+# The client is shared by the crawlers and the scrapers (which are used as classes), so it lives at the
+# module level. main.py configures it from the command line arguments.
+# The client is only created when a request is sent, so a crawl without request never imports requests.
+_client = None
+_client_kwargs = {}
+_client_lock = threading.Lock()
+
+
+def configure_client(**kwargs) -> None:
+    """Replace the shared client, the new one is created on the next get_client call
+
+    Args:
+        kwargs: The HttpClient init arguments
+    """
+    global _client, _client_kwargs
+
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+        _client = None
+        _client_kwargs = kwargs
+
+
+def get_client() -> HttpClient:
+    """Get the shared client (created with the configured arguments on the first call)
+
+    Returns:
+        The shared client
+    """
+    global _client
+
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient(**_client_kwargs)
+
+    return _client
@@ -0,0 +1,183 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional, Tuple
+
+from src.url_index import canonicalize_url
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "web_scraper", "link_status.sqlite")
+
+
+class LinkStatusCache:
+    def __init__(
+        self,
+        path: str,
+        alive_ttl_sec: int = 24 * 3600,
+        bad_status_ttl_sec: int = 3600,
+        connection_error_ttl_sec: int = 600,
+        max_entries: int = 200000,
+        commit_every: int = 100,
+    ) -> None:
+        """Init the link status cache.
+
+        Args:
+            path: The sqlite file path (created if it does not exist)
+            alive_ttl_sec: How long an alive link is trusted
+            bad_status_ttl_sec: How long a link with a bad status code is trusted
+            connection_error_ttl_sec: How long a link with a connection error is trusted
+            max_entries: The number of links kept, the least recently used ones are evicted
+            commit_every: The number of writes between two commits
+        """
+        self.alive_ttl_sec = alive_ttl_sec
+        self.bad_status_ttl_sec = bad_status_ttl_sec
+        self.connection_error_ttl_sec = connection_error_ttl_sec
+        self.max_entries = max_entries
+        self.commit_every = commit_every
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # The crawler checks the links from several threads when crawling concurrently, the lock
+        # serializes the access to the connection. Other processes (--jobs) may write to the same file,
+        # the timeout is how long sqlite waits for them.
+        self.__lock = threading.Lock()
+        self.__connection = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self.__connection.execute(
+            "CREATE TABLE IF NOT EXISTS link_status ("
+            "url TEXT PRIMARY KEY, is_dead INTEGER, reason TEXT, expires_at REAL, last_access REAL, "
+            "status_code INTEGER)"
+        )
+        columns = [row[1] for row in self.__connection.execute("PRAGMA table_info(link_status)")]
+        if "status_code" not in columns:
+            # Cache files created before the status codes were reported
+            self.__connection.execute("ALTER TABLE link_status ADD COLUMN status_code INTEGER")
+        self.__connection.execute("CREATE INDEX IF NOT EXISTS link_status_lru ON link_status (last_access)")
+        self.__entries_cnt = self.__connection.execute("SELECT COUNT(*) FROM link_status").fetchone()[0]
+        self.__pending_writes = 0
+
+    def get(self, link: str) -> Optional[Tuple[bool, str, Optional[int]]]:
+        """Get the cached status of a link
+
+        Args:
+            link: The link
+
+        Returns:
+            (is_dead, reason, status_code) if the link status is cached and not expired else None
+        """
+        url = canonicalize_url(link)
+        now = time.time()
+
+        with self.__lock:
+            row = self.__connection.execute(
+                "SELECT is_dead, reason, status_code FROM link_status WHERE url = ? AND expires_at > ?", (url, now)
+            ).fetchone()
+            if row is None:
+                return None
+
+            self.__connection.execute("UPDATE link_status SET last_access = ? WHERE url = ?", (now, url))
+            self._count_write()
+
+        return bool(row[0]), row[1], row[2]
+
+    def put(self, link: str, is_dead: bool, reason: str, status_code: Optional[int]) -> None:
+        """Cache the status of a link
+
+        Args:
+            link: The link
+            is_dead: True if the link is dead
+            reason: The reason why the link is dead
+            status_code: The response status code (None if no response was received)
+        """
+        if not is_dead:
+            ttl_sec = self.alive_ttl_sec
+        elif status_code is None:
+            ttl_sec = self.connection_error_ttl_sec
+        else:
+            ttl_sec = self.bad_status_ttl_sec
+
+        url = canonicalize_url(link)
+        now = time.time()
+
+        with self.__lock:
+            cursor = self.__connection.execute(
+                "INSERT OR REPLACE INTO link_status VALUES (?, ?, ?, ?, ?, ?)",
+                (url, is_dead, reason, now + ttl_sec, now, status_code),
+            )
+            # rowcount is 1 on a replace too, so the count is an upper bound that _evict refreshes
+            self.__entries_cnt += cursor.rowcount
+            if self.__entries_cnt > self.max_entries:
+                self._evict()
+            self._count_write()
+
+    def _evict(self) -> None:
+        """Remove the expired links, then the least recently used ones (the lock must be held)"""
+        self.__connection.execute("DELETE FROM link_status WHERE expires_at <= ?", (time.time(),))
+        self.__entries_cnt = self.__connection.execute("SELECT COUNT(*) FROM link_status").fetchone()[0]
+
+        if self.__entries_cnt > self.max_entries:
+            # 10% more than needed is evicted, so the eviction does not run on each put
+            overflow_cnt = self.__entries_cnt - self.max_entries + self.max_entries // 10
+            self.__connection.execute(
+                "DELETE FROM link_status WHERE url IN (SELECT url FROM link_status ORDER BY last_access LIMIT ?)",
+                (overflow_cnt,),
+            )
+            self.__entries_cnt -= overflow_cnt
+
+        logger.debug("Link status cache evicted down to %d link(s)", self.__entries_cnt)
+
+    def _count_write(self) -> None:
+        """Commit every commit_every writes (the lock must be held)"""
+        self.__pending_writes += 1
+        if self.__pending_writes >= self.commit_every:
+            self.__connection.commit()
+            self.__pending_writes = 0
+
+    def commit(self) -> None:
+        """Commit the pending writes"""
+        with self.__lock:
+            self.__connection.commit()
+            self.__pending_writes = 0
+
+    def close(self) -> None:
+        """Commit the pending writes and close the cache"""
+        with self.__lock:
+            self.__connection.commit()
+            self.__connection.close()
+
+
+# Like the http client, the cache is shared by all the crawlers of a run. It is disabled until main.py
+# configures it.
+_cache = None
+
+
+def configure_cache(path: Optional[str], **kwargs) -> Optional[LinkStatusCache]:
+    """Replace the shared cache
+
+    Args:
+        path: The sqlite file path, None disables the cache
+        kwargs: The LinkStatusCache init arguments
+
+    Returns:
+        The new shared cache
+    """
+    global _cache
+
+    if _cache is not None:
+        _cache.close()
+    _cache = LinkStatusCache(path, **kwargs) if path else None
+
+    return _cache
+
+
+def get_cache() -> Optional[LinkStatusCache]:
+    """Get the shared cache
+
+    Returns:
+        The shared cache, None if it is disabled
+    """
+    return _cache
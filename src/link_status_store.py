@@ -0,0 +1,164 @@
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Optional
+
+from src.url_index import canonicalize_url
+
+
+class LinkStatusStore:
+    def __init__(self, max_age_sec: Optional[float] = None) -> None:
+        """Init the link status store.
+
+        The store keeps the status of the links checked during a run, so a link shared by the resources of a list
+        (a footer link for example) is only checked once. Unlike the link status cache, it is in memory and
+        the concurrent checks of the same link are coalesced.
+
+        Args:
+            max_age_sec: How long a status is kept, None to keep it for the whole run (a server runs for days,
+                so its links are checked again)
+        """
+        self.max_age_sec = max_age_sec
+        # url: (link status, time of the check)
+        self.__statuses = {}
+        self.__in_flight = {}
+        self.__lock = threading.Lock()
+        self.__purged_at = time.monotonic()
+
+    def get(self, link: str) -> Optional[Any]:
+        """Get the status of a link
+
+        Args:
+            link: The link
+
+        Returns:
+            The link status if the link was checked else None
+        """
+        with self.__lock:
+            return self._get_status(canonicalize_url(link))
+
+    def get_or_check(self, link: str, check_link: Callable[[str], Any]) -> Any:
+        """Get the status of a link, checking it if no other crawler did
+
+        If the link is being checked by another thread, its result is waited for instead of sending a
+        second request.
+
+        Args:
+            link: The link
+            check_link: The function checking the link, returns the link status
+
+        Returns:
+            The link status
+        """
+        url = canonicalize_url(link)
+
+        with self.__lock:
+            status = self._get_status(url)
+            if status is not None:
+                return status
+
+            future = self.__in_flight.get(url)
+            is_owner = future is None
+            if is_owner:
+                future = Future()
+                self.__in_flight[url] = future
+
+        if not is_owner:
+            return future.result()
+
+        try:
+            status = check_link(link)
+        except BaseException as e:
+            # The waiting threads get the error too, the next check of the link will try again
+            with self.__lock:
+                del self.__in_flight[url]
+            future.set_exception(e)
+            raise
+
+        with self.__lock:
+            self._set_status(url, status)
+            del self.__in_flight[url]
+        future.set_result(status)
+
+        return status
+
+    def put(self, link: str, link_status: Any) -> None:
+        """Store the status of a link checked without the store (a crawled page)
+
+        Args:
+            link: The link
+            link_status: The link status
+        """
+        with self.__lock:
+            self._set_status(canonicalize_url(link), link_status)
+
+    def __len__(self) -> int:
+        return len(self.__statuses)
+
+    def _get_status(self, url: str) -> Optional[Any]:
+        """Get the status of a url if it is not too old (the lock must be held)
+
+        Args:
+            url: The canonical url
+
+        Returns:
+            The link status, None if the url was not checked or if its status expired
+        """
+        entry = self.__statuses.get(url)
+        if entry is None:
+            return None
+
+        status, checked_at = entry
+        if self.max_age_sec is not None and time.monotonic() - checked_at > self.max_age_sec:
+            del self.__statuses[url]
+            return None
+
+        return status
+
+    def _set_status(self, url: str, status: Any) -> None:
+        """Set the status of a url (the lock must be held)
+
+        Args:
+            url: The canonical url
+            status: The link status
+        """
+        now = time.monotonic()
+        self.__statuses[url] = (status, now)
+
+        if self.max_age_sec is not None and now - self.__purged_at > self.max_age_sec:
+            # The expired statuses of the links that are not checked again would be kept forever
+            self.__statuses = {
+                url: entry for url, entry in self.__statuses.items() if now - entry[1] <= self.max_age_sec
+            }
+            self.__purged_at = now
+
+
+# Shared by all the crawlers of a run, like the http client. Each process of a process pool has its own store.
+# It is disabled until main.py configures it.
+_store = None
+
+
+def configure_status_store(enabled: bool = True, max_age_sec: Optional[float] = None) -> Optional[LinkStatusStore]:
+    """Replace the shared store
+
+    Args:
+        enabled: False disables the store (each crawler checks its links)
+        max_age_sec: How long a status is kept, None to keep it for the whole run
+
+    Returns:
+        The new shared store
+    """
+    global _store
+
+    _store = LinkStatusStore(max_age_sec) if enabled else None
+
+    return _store
+
+
+def get_status_store() -> Optional[LinkStatusStore]:
+    """Get the shared store
+
+    Returns:
+        The shared store, None if it is disabled
+    """
+    return _store
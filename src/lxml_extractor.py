@@ -0,0 +1,77 @@
+import re
+
+from lxml import etree
+
+# The text links part of the Scraper regex. A link can start the text of an element, so there may be no
+# character before it
+TEXT_LINK_PATTERN = re.compile(
+    r"(?:^|[^\'\"/])(http[s]?://|www.)([\w_-]+(?:(?:\.[\w_-]+)+))([\w.,@?^=%&:/~+#-]*[\w@?^=%&/~+#-])?"
+)
+LINK_ATTRIBUTES = ("href", "src")
+
+
+class _LinkCollector:
+    """lxml parser target collecting the links of the body"""
+
+    def __init__(self) -> None:
+        self.links = []
+        self.__in_body = False
+        self.__text_parts = []
+
+    def start(self, tag: str, attrib: dict) -> None:
+        self._flush_text()
+
+        if tag == "body":
+            self.__in_body = True
+        elif self.__in_body:
+            for attribute in LINK_ATTRIBUTES:
+                value = attrib.get(attribute, "").strip()
+                # Like the regex, only the internal (/...) and http(s) links are kept. The protocol relative
+                # links (//cdn...) are skipped since the crawler would take them for internal links
+                if (value.startswith("/") and not value.startswith("//")) or value.startswith("http"):
+                    self.links.append(value)
+
+    def end(self, tag: str) -> None:
+        self._flush_text()
+
+        if tag == "body":
+            self.__in_body = False
+
+    def data(self, data: str) -> None:
+        if self.__in_body:
+            # A text can be given by parts, it is parsed when the next tag starts or ends
+            self.__text_parts.append(data)
+
+    def close(self) -> list:
+        self._flush_text()
+        return self.links
+
+    def _flush_text(self) -> None:
+        """Extract the links of the text received since the last tag"""
+        if self.__text_parts:
+            text = "".join(self.__text_parts)
+            self.__text_parts = []
+            for scheme, host, path in TEXT_LINK_PATTERN.findall(text):
+                self.links.append(scheme + host + path)
+
+
+def get_links(page_content: str) -> list:
+    """Extract the links of the page body using the lxml (libxml2) html parser
+
+    Unlike the regex, the href/src attributes of all the elements are found wherever they are in the tag,
+    and the parser repairs malformed pages (a page without <body> tag is parsed as a body).
+
+    Args:
+        page_content: The page content
+
+    Returns:
+        The list of links
+    """
+    if not page_content:
+        return []
+
+    # The parser target receives the tags as they are parsed, so no tree is built
+    parser = etree.HTMLParser(target=_LinkCollector())
+    parser.feed(page_content)
+
+    return parser.close()
@@ -0,0 +1,62 @@
+import logging
+import mmap
+import re
+from typing import Iterator
+
+from src.stream_extractor import BODY_END_TAG, BODY_START_PATTERN, LINK_PATTERN
+
+logger = logging.getLogger(__name__)
+
+# The fast extractor patterns, for bytes. \w only matches ascii characters in a bytes pattern, so a text url
+# stops at its first non ascii character (the href links are not affected)
+BYTES_LINK_PATTERN = re.compile(LINK_PATTERN.pattern.encode())
+BYTES_BODY_START_PATTERN = re.compile(BODY_START_PATTERN.pattern.encode())
+BYTES_BODY_START_TAG = b"<body"
+BYTES_BODY_END_TAG = BODY_END_TAG.encode()
+
+
+def iter_links(buffer) -> Iterator[str]:
+    """Extract the links of the page body from its bytes, as they are found
+
+    Works like the fast extractor on any bytes-like buffer (bytes, mmap): the body bounds are found by offset and
+    only the matched links are decoded.
+
+    Args:
+        buffer: The page content bytes
+
+    Returns:
+        The links
+    """
+    body_start = BYTES_BODY_START_PATTERN.search(buffer) if buffer.find(BYTES_BODY_START_TAG) != -1 else None
+    body_end = buffer.rfind(BYTES_BODY_END_TAG) if body_start is not None else -1
+
+    if body_start is None or body_end < body_start.end():
+        logger.error("Failed to extract web page body (%d bytes)", len(buffer))
+        return
+
+    for match in BYTES_LINK_PATTERN.finditer(buffer, body_start.end(), body_end):
+        href_link, scheme, host, path = match.groups()
+        if href_link:
+            yield href_link.decode("utf-8", "replace")
+        if scheme:
+            # Text url
+            yield (scheme + host + (path or b"")).decode("utf-8", "replace")
+
+
+def iter_file_links(path: str) -> Iterator[str]:
+    """Extract the links of a html file without reading it (the file is memory mapped)
+
+    Args:
+        path: The file path
+
+    Returns:
+        The links
+    """
+    with open(path, "rb") as file_handle:
+        # An empty file can't be mapped
+        if file_handle.seek(0, 2) == 0:
+            yield from iter_links(b"")
+            return
+
+        with mmap.mmap(file_handle.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            yield from iter_links(buffer)
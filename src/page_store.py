@@ -0,0 +1,140 @@
+import json
+import os
+import sqlite3
+import threading
+from typing import List, Optional
+
+from src.url_index import canonicalize_url
+
+DEFAULT_PAGE_STORE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "web_scraper", "pages.sqlite")
+
+
+class PageStore:
+    def __init__(self, path: str, commit_every: int = 100) -> None:
+        """Init the page store.
+
+        The store keeps the validators (ETag and Last-Modified headers) and the links of each crawled page,
+        so the next run can send conditional requests and reuse the links of the pages that did not change.
+
+        Args:
+            path: The sqlite file path (created if it does not exist)
+            commit_every: The number of writes between two commits
+        """
+        self.commit_every = commit_every
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.__lock = threading.Lock()
+        self.__connection = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self.__connection.execute(
+            "CREATE TABLE IF NOT EXISTS pages (url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, links TEXT)"
+        )
+        self.__pending_writes = 0
+
+    def get_conditional_headers(self, page_url: str) -> dict:
+        """Get the headers of a conditional request for a page
+
+        Args:
+            page_url: The page url
+
+        Returns:
+            The If-None-Match/If-Modified-Since headers (empty if the page is not stored)
+        """
+        with self.__lock:
+            row = self.__connection.execute(
+                "SELECT etag, last_modified FROM pages WHERE url = ?", (canonicalize_url(page_url),)
+            ).fetchone()
+
+        headers = {}
+        if row is not None:
+            etag, last_modified = row
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+
+        return headers
+
+    def get_links(self, page_url: str) -> Optional[List[str]]:
+        """Get the stored links of a page
+
+        Args:
+            page_url: The page url
+
+        Returns:
+            The links, None if the page is not stored
+        """
+        with self.__lock:
+            row = self.__connection.execute(
+                "SELECT links FROM pages WHERE url = ?", (canonicalize_url(page_url),)
+            ).fetchone()
+
+        return None if row is None else json.loads(row[0])
+
+    def put(self, page_url: str, etag: Optional[str], last_modified: Optional[str], links: List[str]) -> None:
+        """Store a page
+
+        Args:
+            page_url: The page url
+            etag: The ETag response header
+            last_modified: The Last-Modified response header
+            links: The page links
+        """
+        if not etag and not last_modified:
+            # The server can't answer a conditional request for this page, so there is no need to keep it
+            return
+
+        with self.__lock:
+            self.__connection.execute(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?)",
+                (canonicalize_url(page_url), etag, last_modified, json.dumps(links)),
+            )
+            self.__pending_writes += 1
+            if self.__pending_writes >= self.commit_every:
+                self.__connection.commit()
+                self.__pending_writes = 0
+
+    def commit(self) -> None:
+        """Commit the pending writes"""
+        with self.__lock:
+            self.__connection.commit()
+            self.__pending_writes = 0
+
+    def close(self) -> None:
+        """Commit the pending writes and close the store"""
+        with self.__lock:
+            self.__connection.commit()
+            self.__connection.close()
+
+
+# Shared by all the crawlers of a run. It is disabled (no incremental crawl) until main.py configures it.
+_page_store = None
+
+
+def configure_page_store(path: Optional[str]) -> Optional[PageStore]:
+    """Replace the shared page store
+
+    Args:
+        path: The sqlite file path, None disables the incremental crawl
+
+    Returns:
+        The new shared page store
+    """
+    global _page_store
+
+    if _page_store is not None:
+        _page_store.close()
+    _page_store = PageStore(path) if path else None
+
+    return _page_store
+
+
+def get_page_store() -> Optional[PageStore]:
+    """Get the shared page store
+
+    Returns:
+        The shared page store, None if the incremental crawl is disabled
+    """
+    return _page_store
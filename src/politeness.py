@@ -0,0 +1,170 @@
+import logging
+import threading
+import time
+from typing import Callable, Dict, Optional
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+
+class _HostState:
+    """The token bucket and the limits of a host"""
+
+    __slots__ = ("requests_per_sec", "tokens", "refilled_at", "blocked_until", "semaphore")
+
+    def __init__(self, requests_per_sec: float, burst: int, max_concurrency: int) -> None:
+        self.requests_per_sec = requests_per_sec
+        self.tokens = burst
+        self.refilled_at = time.monotonic()
+        self.blocked_until = 0.0
+        self.semaphore = threading.BoundedSemaphore(max_concurrency) if max_concurrency > 0 else None
+
+
+class HostScheduler:
+    def __init__(
+        self,
+        requests_per_sec: float = 0,
+        burst: int = 1,
+        max_concurrency: int = 0,
+        requests_per_sec_overrides: Optional[Dict[str, float]] = None,
+        max_retry_after_sec: float = 300,
+    ) -> None:
+        """Init the per host politeness scheduler.
+
+        Each host has its own token bucket, so a slow (rate limited) host does not slow down the others.
+
+        Args:
+            requests_per_sec: The requests rate allowed for each host, 0 for no limit
+            burst: The number of requests that can be sent at once after a host was idle
+            max_concurrency: The number of requests sent at the same time to a host, 0 for no limit
+            requests_per_sec_overrides: The requests rate of specific hosts (by host name)
+            max_retry_after_sec: The maximum time a host is paused for by a Retry-After header
+        """
+        self.requests_per_sec = requests_per_sec
+        self.burst = max(1, burst)
+        self.max_concurrency = max_concurrency
+        self.requests_per_sec_overrides = requests_per_sec_overrides or {}
+        self.max_retry_after_sec = max_retry_after_sec
+
+        self.__hosts = {}
+        self.__lock = threading.Lock()
+
+    def acquire_slot(self, url: str) -> Callable[[], None]:
+        """Wait until a request can be sent to the url host, and hold its slot until it is released
+
+        Args:
+            url: The request url
+
+        Returns:
+            The function releasing the slot (it can be called more than once, the slot is only released once)
+        """
+        host_state = self._get_host_state(url)
+
+        if host_state.semaphore is None:
+            self._wait_for_token(host_state)
+            return lambda: None
+
+        host_state.semaphore.acquire()
+        try:
+            self._wait_for_token(host_state)
+        except BaseException:
+            host_state.semaphore.release()
+            raise
+
+        released = threading.Lock()
+
+        def release_slot() -> None:
+            # Only the first call takes the lock
+            if released.acquire(blocking=False):
+                host_state.semaphore.release()
+
+        return release_slot
+
+    def pause_host(self, url: str, delay_sec: float) -> None:
+        """Stop sending requests to the url host for a while (Retry-After)
+
+        Args:
+            url: The url
+            delay_sec: The pause duration
+        """
+        delay_sec = min(delay_sec, self.max_retry_after_sec)
+        logger.debug("Pausing %s for %.1f sec(s)", urlsplit(url).hostname, delay_sec)
+
+        host_state = self._get_host_state(url)
+        with self.__lock:
+            host_state.blocked_until = max(host_state.blocked_until, time.monotonic() + delay_sec)
+
+    def _get_host_state(self, url: str) -> _HostState:
+        """Get (or create) the state of the url host
+
+        Args:
+            url: The url
+
+        Returns:
+            The host state
+        """
+        host = urlsplit(url).hostname or ""
+
+        with self.__lock:
+            host_state = self.__hosts.get(host)
+            if host_state is None:
+                requests_per_sec = self.requests_per_sec_overrides.get(host, self.requests_per_sec)
+                host_state = _HostState(requests_per_sec, self.burst, self.max_concurrency)
+                self.__hosts[host] = host_state
+
+        return host_state
+
+    def _wait_for_token(self, host_state: _HostState) -> None:
+        """Sleep until the host is not paused and has a token, then take the token
+
+        Args:
+            host_state: The host state
+        """
+        while True:
+            with self.__lock:
+                now = time.monotonic()
+
+                if host_state.blocked_until > now:
+                    wait_sec = host_state.blocked_until - now
+                elif host_state.requests_per_sec <= 0:
+                    return
+                else:
+                    elapsed_sec = now - host_state.refilled_at
+                    host_state.tokens = min(self.burst, host_state.tokens + elapsed_sec * host_state.requests_per_sec)
+                    host_state.refilled_at = now
+
+                    if host_state.tokens >= 1:
+                        host_state.tokens -= 1
+                        return
+                    wait_sec = (1 - host_state.tokens) / host_state.requests_per_sec
+
+            # Sleeping outside the lock, so the other hosts are not blocked
+            time.sleep(wait_sec)
+
+
+# Pure function
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header
+
+    Args:
+        value: The header value (a number of seconds or an http date)
+
+    Returns:
+        The delay in secs, None if the header is missing or invalid
+    """
+    if not value:
+        return None
+
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+
+    # Only imported when a date is received, email.utils is slow to import
+    import email.utils
+
+    try:
+        retry_date = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    return max(0.0, retry_date.timestamp() - time.time())
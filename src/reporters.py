@@ -0,0 +1,143 @@
+import csv
+import json
+import os
+import sys
+import threading
+from abc import ABC, abstractmethod
+from typing import NamedTuple, Optional, TextIO
+
+# table: tabulate table printed once the resource is crawled (no reporter)
+# jsonl/csv: one line written as soon as a dead link is found
+REPORT_FORMATS = ("table", "jsonl", "csv")
+REPORT_FIELDS = ("resource", "source", "link", "reason", "status_code", "latency_ms")
+
+
+class DeadLink(NamedTuple):
+    """A dead link found by a crawler"""
+
+    link: str
+    reason: str
+    # The page where the link was found
+    source: Optional[str] = None
+    # None if no response was received
+    status_code: Optional[int] = None
+    # None if the status comes from the link status cache
+    latency_ms: Optional[float] = None
+
+
+class Reporter(ABC):
+    def __init__(self, stream: TextIO) -> None:
+        """Init the reporter.
+
+        Args:
+            stream: The output stream
+        """
+        self._stream = stream
+        # The concurrent crawlers (and the url list threads) share the reporter, each line is written at once
+        self.__lock = threading.Lock()
+
+    @property
+    def uses_stdout(self) -> bool:
+        """Check if the reporter writes to stdout
+
+        Returns:
+            True if the logs should not go to stdout
+        """
+        return self._stream is sys.stdout
+
+    def report(self, resource: str, dead_link: DeadLink) -> None:
+        """Write a dead link
+
+        Args:
+            resource: The crawled resource
+            dead_link: The dead link
+        """
+        values = {"resource": resource, **dead_link._asdict()}
+        row = {field: values[field] for field in REPORT_FIELDS}
+
+        with self.__lock:
+            self._write(row)
+            # Flushed so the downstream tools get the line right away
+            self._stream.flush()
+
+    @abstractmethod
+    def _write(self, row: dict) -> None:
+        raise NotImplementedError()
+
+    def close(self) -> None:
+        """Close the output stream (unless it is stdout)"""
+        with self.__lock:
+            if not self.uses_stdout:
+                self._stream.close()
+
+
+class JsonlReporter(Reporter):
+    def _write(self, row: dict) -> None:
+        self._stream.write(json.dumps(row) + "\n")
+
+
+class CsvReporter(Reporter):
+    def __init__(self, stream: TextIO, write_header: bool = True) -> None:
+        """Init the csv reporter.
+
+        Args:
+            stream: The output stream
+            write_header: Write the columns names first (False when appending to a report)
+        """
+        super().__init__(stream)
+        self.__writer = csv.DictWriter(stream, fieldnames=REPORT_FIELDS)
+        if write_header:
+            self.__writer.writeheader()
+
+    def _write(self, row: dict) -> None:
+        self.__writer.writerow(row)
+
+
+# Shared by all the crawlers of a run. None until main.py configures a streaming format (the table is printed
+# by main.py from the crawlers dead links).
+_reporter = None
+
+
+def configure_reporter(report_format: str, path: str = "-", append: bool = False) -> Optional[Reporter]:
+    """Replace the shared reporter
+
+    Args:
+        report_format: One of REPORT_FORMATS
+        path: The output file, - for stdout
+        append: Append to the output file (a resumed crawl) instead of overwriting it
+
+    Returns:
+        The new shared reporter
+    """
+    global _reporter
+
+    if _reporter is not None:
+        _reporter.close()
+        _reporter = None
+
+    if report_format == "table":
+        return None
+
+    if path == "-":
+        stream = sys.stdout
+        write_header = True
+    else:
+        write_header = not (append and os.path.exists(path) and os.path.getsize(path) > 0)
+        # newline="" is required by the csv module
+        stream = open(path, "a" if append else "w", newline="")
+
+    if report_format == "csv":
+        _reporter = CsvReporter(stream, write_header)
+    else:
+        _reporter = JsonlReporter(stream)
+
+    return _reporter
+
+
+def get_reporter() -> Optional[Reporter]:
+    """Get the shared reporter
+
+    Returns:
+        The shared reporter, None if the dead links are printed as a table
+    """
+    return _reporter
@@ -1,12 +1,19 @@
 import re
 import logging
-import requests
 from abc import ABC, abstractmethod
+from typing import Iterator
+
+from src import fast_extractor, stream_extractor
+from src.stats import timed
 
 logger = logging.getLogger(__name__)
 
 
 class Scraper(ABC):
+    # The scrapers are used as classes, so these are set for all of them by main.py
+    extractor = "fast"
+    chunk_size = 64 * 1024
+
     @classmethod
     def get_links(cls, resource: str, show_exception_tb: bool) -> list:
         """Extract the links for the resource
@@ -18,9 +25,64 @@ class Scraper(ABC):
         Returns:
             The list of links
         """
+        if cls.extractor == "streaming":
+            return list(cls.iter_links(resource, show_exception_tb))
+
+        with timed("get_page_content"):
+            page_content = cls._get_page_content(resource, show_exception_tb)
+
+        return cls._get_links_from_content(page_content)
+
+    @classmethod
+    def iter_links(cls, resource: str, show_exception_tb: bool) -> Iterator[str]:
+        """Extract the links for the resource as they are found
+
+        With the streaming extractor, the whole page is not loaded. With the other extractors, the page is
+        loaded first.
+
+        Args:
+            resource: The resource to parse
+            show_exception_tb: Enables exception trace back logging
+
+        Returns:
+            The links as they are found
+        """
+        if cls.extractor == "streaming":
+            return stream_extractor.iter_links(cls._iter_page_content(resource, show_exception_tb))
+
+        with timed("get_page_content"):
+            page_content = cls._get_page_content(resource, show_exception_tb)
+
+        if cls.extractor == "fast":
+            # The links are given as they are found, without building the list
+            return fast_extractor.iter_links(page_content)
+
+        return iter(cls._get_links_from_content(page_content))
+
+    @classmethod
+    def _get_links_from_content(cls, page_content: str) -> list:
+        """Extract the links from the page content using the selected extractor
+
+        Args:
+            page_content: The page content
+
+        Returns:
+            The list of links
+        """
+        with timed("extract_links"):
+            return CONTENT_EXTRACTORS[cls.extractor](page_content)
 
-        body = cls._get_body(resource, show_exception_tb)
+    # Pure function
+    @staticmethod
+    def _get_links_from_body(body: str) -> list:
+        """Extract the links from a page body
 
+        Args:
+            body: The page body
+
+        Returns:
+            The list of links
+        """
         # We use part of the regex proposed in https://stackoverflow.com/questions/6038061/regular-expression-to-find-urls-within-a-string
         text_and_href_links = re.findall(
             r"<a [\S]* ?href=[\'\"]?(/[^\'\">]+|http[s]?[^\r\n\t\f\v\"\']+)[\'\"]?|[^\'\"/](http[s]?://|www.)([\w_-]+(?:(?:\.[\w_-]+)+))([\w.,@?^=%&:/~+#-]*[\w@?^=%&/~+#-])?",
@@ -38,18 +100,17 @@ class Scraper(ABC):
 
         return links
 
-    @classmethod
-    def _get_body(cls, resource: str, show_exception_tb: bool) -> str:
-        """Get the page body
+    # Pure function
+    @staticmethod
+    def _extract_body(page_content: str) -> str:
+        """Extract the body from the page content
 
         Args:
-            resource: The resource to extract the body from
+            page_content: The page content
 
         Returns:
             The body string
         """
-        page_content = cls._get_page_content(resource, show_exception_tb)
-
         # If the content is not HTML the following regexp will not find the body
         # We did not check the content of the body since we wanted to get the links even
         # from a malformated html and validating html is out of this scope
@@ -68,3 +129,66 @@ class Scraper(ABC):
     @abstractmethod
     def _get_page_content(cls, resource, show_exception_tb):
         raise NotImplementedError()
+
+    @classmethod
+    def _iter_page_content(cls, resource: str, show_exception_tb: bool) -> Iterator[str]:
+        """Get the page content chunk by chunk
+
+        Args:
+            resource: The resource
+            show_exception_tb: Enables exception trace back logging
+
+        Returns:
+            The page content chunks
+        """
+        # Scrapers that can read the page by parts override this, the others split the whole content
+        page_content = cls._get_page_content(resource, show_exception_tb)
+        for chunk_start in range(0, len(page_content), cls.chunk_size):
+            yield page_content[chunk_start : chunk_start + cls.chunk_size]
+
+
+# Pure function
+def get_links_with_regex(page_content: str) -> list:
+    """Extract the links from the page content using the regex
+
+    Args:
+        page_content: The page content
+
+    Returns:
+        The list of links
+    """
+    with timed("extract_body"):
+        body = Scraper._extract_body(page_content)
+
+    return Scraper._get_links_from_body(body)
+
+
+# Pure function
+def get_links_with_lxml(page_content: str) -> list:
+    """Extract the links from the page content using the lxml html parser
+
+    Args:
+        page_content: The page content
+
+    Returns:
+        The list of links
+    """
+    # lxml is slow to import, so it is only imported when this extractor is used
+    from src import lxml_extractor
+
+    return lxml_extractor.get_links(page_content)
+
+
+# How the links are extracted from the whole page content:
+#   regex: the body is extracted and parsed with a regex
+#   fast: same links as regex, in a single pass without copying the body (see fast_extractor)
+#   lxml: the page is parsed by the lxml html parser (see lxml_extractor)
+# Another extractor can be plugged by adding a function taking the page content and returning the links.
+CONTENT_EXTRACTORS = {
+    "regex": get_links_with_regex,
+    "fast": fast_extractor.get_links,
+    "lxml": get_links_with_lxml,
+}
+
+# streaming: the page is parsed chunk by chunk (see stream_extractor)
+EXTRACTORS = (*CONTENT_EXTRACTORS, "streaming")
@@ -0,0 +1,222 @@
+"""Crawl server: run the crawl jobs received as json lines and stream their results back.
+
+The server process keeps its shared services between the jobs: the http client connection pools, the link status
+cache and the in memory link status store. A job only pays for its own crawl, not for the interpreter startup and
+the cold caches of a main.py run.
+
+Protocol (one json object per line, on stdin/stdout or on each connection of a unix socket):
+    job: {"id": 1, "type": "html", "resource": "<html>...</html>", "max_pages": 10, "time_budget_sec": 5}
+        type is one of JOB_TYPES, id is any json value given back with the results, max_pages and time_budget_sec
+        are optional
+    dead link: {"id": 1, "source": ..., "link": ..., "reason": ..., "status_code": ..., "latency_ms": ...}
+        sent as soon as the link is found dead
+    end of job: {"id": 1, "done": true, "exit_code": 0, "error": null, "links_cnt": 12, "dead_links_cnt": 1,
+        "duration_ms": 35.2}
+        sent after the last dead link of the job, exit_code is 1 if the job failed
+"""
+
+import json
+import logging
+import os
+import socketserver
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterator, Optional, TextIO
+
+from src.api import iter_link_events
+from src.crawler import Crawler, CrawlerException
+from src.reporters import REPORT_FIELDS
+
+logger = logging.getLogger(__name__)
+
+JOB_TYPES = ("url", "file", "html")
+
+
+class JobError(Exception):
+    """Invalid job"""
+
+
+class CrawlServer:
+    def __init__(
+        self,
+        create_crawler: Callable[[str, str], Crawler],
+        jobs_cnt: int = 1,
+        on_job_done: Optional[Callable[[], None]] = None,
+    ) -> None:
+        """Init the crawl server.
+
+        Args:
+            create_crawler: Creates the crawler of a job from its type and resource
+            jobs_cnt: The number of jobs of a stream run at once (the results of the jobs are mixed, their id
+                tells them apart)
+            on_job_done: Called after each job (to save the stores)
+        """
+        self.create_crawler = create_crawler
+        self.jobs_cnt = jobs_cnt
+        self.on_job_done = on_job_done
+
+    def run_job(self, job: dict) -> Iterator[dict]:
+        """Run a crawl job
+
+        Args:
+            job: The job
+
+        Returns:
+            The job messages: the dead links as they are found, then the end of job
+        """
+        start = time.perf_counter()
+        links_cnt = dead_links_cnt = 0
+        exit_code, error_message = 0, None
+
+        try:
+            crawler = self._create_job_crawler(job)
+            for event in iter_link_events(crawler, job.get("time_budget_sec"), job.get("max_pages")):
+                links_cnt += 1
+                if event.is_dead:
+                    dead_links_cnt += 1
+                    values = {**event._asdict(), "id": job.get("id")}
+                    if job["type"] == "html":
+                        # The source would be the html content sent by the client
+                        values["source"] = None
+                    yield {field: values[field] for field in ("id", *REPORT_FIELDS) if field != "resource"}
+        except (JobError, CrawlerException) as exception:
+            exit_code, error_message = 1, str(exception)
+        except Exception:
+            # Like main.py, the server keeps running whatever the job does
+            logger.exception("Error occured while running job %s", job.get("id"))
+            exit_code, error_message = 1, "Error occured while crawling"
+        finally:
+            if self.on_job_done is not None:
+                self.on_job_done()
+
+        yield self._create_end_message(job.get("id"), exit_code, error_message, links_cnt, dead_links_cnt, start)
+
+    def serve_stream(self, input_stream: TextIO, output_stream: TextIO) -> None:
+        """Run the jobs read from a stream until its end
+
+        Args:
+            input_stream: The stream of the jobs
+            output_stream: The stream of the results
+        """
+        write_lock = threading.Lock()
+
+        def run(line: str) -> None:
+            try:
+                messages = self.run_job(self._parse_job(line))
+            except JobError as e:
+                messages = [self._create_end_message(None, 1, str(e))]
+
+            for message in messages:
+                with write_lock:
+                    output_stream.write(json.dumps(message) + "\n")
+                    # Flushed so the client gets the result right away
+                    output_stream.flush()
+
+        with ThreadPoolExecutor(max_workers=self.jobs_cnt) as executor:
+            # The futures results are not read, run_job gives its errors as messages
+            for line in input_stream:
+                if line.strip():
+                    executor.submit(run, line)
+
+    def serve_socket(self, socket_path: str) -> None:
+        """Run the jobs sent on the connections of a unix socket, until the process is stopped
+
+        Args:
+            socket_path: The socket file path (replaced if it exists)
+        """
+        server = self
+
+        class RequestHandler(socketserver.StreamRequestHandler):
+            def handle(self) -> None:
+                input_stream = self.request.makefile("r", encoding="utf-8")
+                output_stream = self.request.makefile("w", encoding="utf-8")
+                with input_stream, output_stream:
+                    server.serve_stream(input_stream, output_stream)
+
+        if os.path.exists(socket_path):
+            # Left by a server that was killed
+            os.remove(socket_path)
+
+        # Each connection is served by its own thread, the connections share the warm services
+        with socketserver.ThreadingUnixStreamServer(socket_path, RequestHandler) as socket_server:
+            logger.info("Listening on %s", socket_path)
+            try:
+                socket_server.serve_forever()
+            finally:
+                os.remove(socket_path)
+
+    # Pure function
+    @staticmethod
+    def _parse_job(line: str) -> dict:
+        """Parse a job line
+
+        Args:
+            line: The json line
+
+        Raises:
+            JobError if the line is not a json object
+
+        Returns:
+            The job
+        """
+        try:
+            job = json.loads(line)
+        except ValueError as e:
+            raise JobError(f"Invalid json: {e}")
+
+        if not isinstance(job, dict):
+            raise JobError("A job must be a json object")
+
+        return job
+
+    @staticmethod
+    def _create_end_message(
+        job_id,
+        exit_code: int,
+        error_message: Optional[str],
+        links_cnt: int = 0,
+        dead_links_cnt: int = 0,
+        start: Optional[float] = None,
+    ) -> dict:
+        """Create the last message of a job
+
+        Args:
+            job_id: The job id, None if the job could not be read
+            exit_code: 0 on success, else 1
+            error_message: The error message (None on success)
+            links_cnt: The number of links checked
+            dead_links_cnt: The number of dead links
+            start: The perf_counter value when the job started, None if it did not start
+
+        Returns:
+            The message
+        """
+        return {
+            "id": job_id,
+            "done": True,
+            "exit_code": exit_code,
+            "error": error_message,
+            "links_cnt": links_cnt,
+            "dead_links_cnt": dead_links_cnt,
+            "duration_ms": round((time.perf_counter() - start) * 1000, 1) if start is not None else 0,
+        }
+
+    def _create_job_crawler(self, job: dict) -> Crawler:
+        """Create the crawler of a job
+
+        Args:
+            job: The job
+
+        Raises:
+            JobError if the job is invalid
+
+        Returns:
+            The crawler
+        """
+        if job.get("type") not in JOB_TYPES:
+            raise JobError(f"The job type must be one of {', '.join(JOB_TYPES)}")
+        if not isinstance(job.get("resource"), str):
+            raise JobError("The job resource is missing")
+
+        return self.create_crawler(job["type"], job["resource"])
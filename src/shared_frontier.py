@@ -0,0 +1,328 @@
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from src.reporters import DeadLink
+from src.url_index import canonicalize_url, fingerprint_url
+
+DEFAULT_FRONTIER_PATH = os.path.join(os.path.expanduser("~"), ".cache", "web_scraper", "frontier.sqlite")
+
+# An item of the shared frontier: (id, link, depth, page)
+FrontierItem = Tuple[int, str, int, Optional[str]]
+
+
+# Pure function
+def get_shard(full_link: str, shards_cnt: int) -> int:
+    """Get the shard of a link, all the links of a host are in the same shard
+
+    Args:
+        full_link: The full link
+        shards_cnt: The number of shards
+
+    Returns:
+        The shard index
+    """
+    try:
+        host = urlsplit(full_link).hostname or ""
+    except ValueError:
+        host = ""
+
+    return fingerprint_url(host) % shards_cnt
+
+
+class SharedFrontier:
+    def __init__(self, path: str, lease_timeout_sec: float = 300) -> None:
+        """Init the shared frontier of a distributed crawl.
+
+        The workers of a crawl (processes of one or several hosts) share the sqlite file. Each worker owns the
+        links of one shard (see get_shard): it is the only one checking them, so its visited index only holds
+        its shard. The links are added to the shard of their host by the worker that found them. The checked links
+        are kept in the frontier (done), so they are not added again by a resumed crawl or by the worker taking the
+        shard of another one, whose visited indexes are empty.
+
+        A worker that stops (or fails) gives its shard to the other workers (see leave). A worker that is killed
+        can't, so each worker also tells that it is alive when it takes or completes links: the shard of a worker
+        not seen for lease_timeout_sec is taken by the other workers, like the links leased for longer than that.
+
+        Args:
+            path: The sqlite file path (created if it does not exist)
+            lease_timeout_sec: The links taken by a worker that did not finish them within this delay, and the
+                shard of a worker not seen within this delay, are given to the other workers
+        """
+        self.lease_timeout_sec = lease_timeout_sec
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # The transactions are explicit (isolation_level=None), BEGIN IMMEDIATE takes the write lock at once so
+        # two workers can't take the same links. The timeout is how long sqlite waits for the other workers.
+        self.__lock = threading.Lock()
+        self.__connection = sqlite3.connect(path, check_same_thread=False, timeout=60, isolation_level=None)
+        # WAL lets the workers read while another one writes
+        self.__connection.execute("PRAGMA journal_mode=WAL")
+        with self._transaction():
+            self.__connection.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value)")
+            self.__connection.execute(
+                "CREATE TABLE IF NOT EXISTS frontier ("
+                "id INTEGER PRIMARY KEY, url TEXT UNIQUE, link TEXT, depth INTEGER, page TEXT, shard INTEGER, "
+                "leased_at REAL, done INTEGER DEFAULT 0)"
+            )
+            self.__connection.execute("CREATE INDEX IF NOT EXISTS frontier_shard ON frontier (done, shard, leased_at)")
+            # When the worker of each shard was last seen
+            self.__connection.execute("CREATE TABLE IF NOT EXISTS workers (shard INTEGER PRIMARY KEY, seen_at REAL)")
+            self.__connection.execute(
+                "CREATE TABLE IF NOT EXISTS dead_links ("
+                "link TEXT, reason TEXT, source TEXT, status_code INTEGER, latency_ms REAL, worker INTEGER)"
+            )
+
+    def seed(self, resource: str, shards_cnt: int, root_link: str, shard: int) -> bool:
+        """Start the crawl of a resource, unless a worker already did
+
+        Args:
+            resource: The crawled resource
+            shards_cnt: The number of shards (workers)
+            root_link: The root route of the resource (the first link to check)
+            shard: The shard of the worker
+
+        Returns:
+            False if the frontier belongs to another crawl
+        """
+        now = time.time()
+        with self._transaction():
+            meta = dict(self.__connection.execute("SELECT key, value FROM meta"))
+            if meta:
+                if meta["resource"] != resource or meta["shards_cnt"] != shards_cnt:
+                    return False
+
+                self._set_seen(shard, now)
+                return True
+
+            self.__connection.executemany(
+                "INSERT INTO meta VALUES (?, ?)",
+                [("resource", resource), ("shards_cnt", shards_cnt), ("reserved_pages_cnt", 0)],
+            )
+            # The workers that did not start yet have lease_timeout_sec to do so before their shard is taken
+            self.__connection.executemany(
+                "INSERT OR REPLACE INTO workers VALUES (?, ?)", [(index, now) for index in range(shards_cnt)]
+            )
+            self._add_items([(resource, root_link, 0, None, get_shard(resource, shards_cnt))])
+
+        return True
+
+    def lease(self, shard: int, max_items: int) -> List[FrontierItem]:
+        """Take links of a shard to check, and the links left by the stopped workers if there are not enough
+
+        Args:
+            shard: The shard of the worker
+            max_items: The maximum number of links taken
+
+        Returns:
+            The (id, link, depth, page) items, to complete or release
+        """
+        now = time.time()
+        expired_at = now - self.lease_timeout_sec
+        with self._transaction():
+            self._set_seen(shard, now)
+            items = self.__connection.execute(
+                "SELECT id, link, depth, page FROM frontier WHERE done = 0 AND shard = ? "
+                "AND (leased_at IS NULL OR leased_at < ?) ORDER BY id LIMIT ?",
+                (shard, expired_at, max_items),
+            ).fetchall()
+            if len(items) < max_items:
+                # The expired leases and the shards of the workers that are gone. Only looked for once the shard of
+                # the worker is empty (it is not indexed)
+                items += self.__connection.execute(
+                    "SELECT id, link, depth, page FROM frontier WHERE done = 0 AND shard != ? AND (leased_at < ? OR "
+                    "(leased_at IS NULL AND shard IN (SELECT shard FROM workers WHERE seen_at < ?))) "
+                    "ORDER BY id LIMIT ?",
+                    (shard, expired_at, expired_at, max_items - len(items)),
+                ).fetchall()
+            self.__connection.executemany(
+                "UPDATE frontier SET leased_at = ? WHERE id = ?", [(now, item[0]) for item in items]
+            )
+
+        return items
+
+    def complete(self, shard: int, item_id: int, new_items: List[Tuple[str, str, int, str, int]]) -> None:
+        """Mark a link as checked and add the links found on its page
+
+        Both are done in the same transaction, so the frontier is only empty once the crawl is done.
+
+        Args:
+            shard: The shard of the worker
+            item_id: The id of the checked link
+            new_items: The (full link, link, depth, page, shard) of the links found
+        """
+        with self._transaction():
+            # A lease can take a while to check, the worker is still alive
+            self._set_seen(shard, time.time())
+            self._add_items(new_items)
+            self.__connection.execute("UPDATE frontier SET done = 1 WHERE id = ?", (item_id,))
+
+    def release(self, item_ids: List[int]) -> None:
+        """Give back the links taken but not checked (a stopped worker)
+
+        Args:
+            item_ids: The ids of the links
+        """
+        with self._transaction():
+            self.__connection.executemany(
+                "UPDATE frontier SET leased_at = NULL WHERE id = ?", [(item_id,) for item_id in item_ids]
+            )
+
+    def leave(self, shard: int) -> None:
+        """Give the shard of a worker that stops to the other workers
+
+        Args:
+            shard: The shard of the worker
+        """
+        with self._transaction():
+            self.__connection.execute("UPDATE workers SET seen_at = 0 WHERE shard = ?", (shard,))
+
+    def abort(self, error_message: str) -> None:
+        """Stop the crawl of all the workers
+
+        Args:
+            error_message: The reason, raised by all the workers
+        """
+        with self._transaction():
+            self.__connection.execute("INSERT OR REPLACE INTO meta VALUES ('error', ?)", (error_message,))
+
+    def get_error(self) -> Optional[str]:
+        """Get the reason of an aborted crawl
+
+        Returns:
+            The error message, None if the crawl was not aborted
+        """
+        with self.__lock:
+            row = self.__connection.execute("SELECT value FROM meta WHERE key = 'error'").fetchone()
+
+        return row[0] if row is not None else None
+
+    def is_done(self) -> bool:
+        """Check if all the links were checked
+
+        Returns:
+            True if the frontier has no link left to check
+        """
+        with self.__lock:
+            return self.__connection.execute("SELECT COUNT(*) FROM frontier WHERE done = 0").fetchone()[0] == 0
+
+    def reserve_page(self, max_pages: Optional[int], increment: int = 1) -> bool:
+        """Reserve a page from the max_pages budget shared by the workers (or give it back)
+
+        Args:
+            max_pages: The maximum number of crawled pages, None for no limit
+            increment: 1 to reserve a page, -1 to give it back
+
+        Returns:
+            True if the page can be crawled
+        """
+        with self._transaction():
+            cursor = self.__connection.execute(
+                "UPDATE meta SET value = value + ? WHERE key = 'reserved_pages_cnt' "
+                "AND (? < 0 OR ? IS NULL OR value < ?)",
+                (increment, increment, max_pages, max_pages),
+            )
+
+        return increment < 0 or cursor.rowcount == 1
+
+    def add_dead_link(self, worker: int, dead_link: DeadLink) -> None:
+        """Add a dead link to the report shared by the workers
+
+        Args:
+            worker: The worker index
+            dead_link: The dead link
+        """
+        with self.__lock:
+            self.__connection.execute(
+                "INSERT INTO dead_links VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    dead_link.link,
+                    dead_link.reason,
+                    dead_link.source,
+                    dead_link.status_code,
+                    dead_link.latency_ms,
+                    worker,
+                ),
+            )
+
+    def get_dead_links(self) -> List[DeadLink]:
+        """Get the dead links found by all the workers
+
+        Returns:
+            The dead links, in the order they were found
+        """
+        with self.__lock:
+            # A link can be checked twice (a worker stopped after the check but before completing the link, or its
+            # lease expired), it is reported once
+            rows = self.__connection.execute(
+                "SELECT link, reason, source, status_code, latency_ms FROM dead_links "
+                "WHERE rowid IN (SELECT MIN(rowid) FROM dead_links GROUP BY link) ORDER BY rowid"
+            ).fetchall()
+
+        return [DeadLink(*row) for row in rows]
+
+    def get_resource(self) -> Optional[str]:
+        """Get the crawled resource
+
+        Returns:
+            The resource, None if the crawl was not started
+        """
+        with self.__lock:
+            row = self.__connection.execute("SELECT value FROM meta WHERE key = 'resource'").fetchone()
+
+        return row[0] if row is not None else None
+
+    def close(self) -> None:
+        """Close the frontier (the writes are already committed)"""
+        with self.__lock:
+            self.__connection.close()
+
+    def _set_seen(self, shard: int, seen_at: float) -> None:
+        """Tell that the worker of a shard is alive (the transaction must be open)
+
+        Args:
+            shard: The shard of the worker
+            seen_at: The current time
+        """
+        self.__connection.execute("INSERT OR REPLACE INTO workers VALUES (?, ?)", (shard, seen_at))
+
+    def _add_items(self, items: List[Tuple[str, str, int, Optional[str], int]]) -> None:
+        """Add links to the frontier, the links already waiting or checked are skipped (the transaction must be open)
+
+        Args:
+            items: The (full link, link, depth, page, shard) of the links
+        """
+        self.__connection.executemany(
+            "INSERT OR IGNORE INTO frontier (url, link, depth, page, shard) VALUES (?, ?, ?, ?, ?)",
+            [(canonicalize_url(full_link), link, depth, page, shard) for full_link, link, depth, page, shard in items],
+        )
+
+    @contextmanager
+    def _transaction(self) -> Iterator[None]:
+        """Run the with block in a write transaction, with the lock held"""
+        with self.__lock:
+            self.__connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield
+            except BaseException:
+                self.__connection.execute("ROLLBACK")
+                raise
+            self.__connection.execute("COMMIT")
+
+
+def remove_shared_frontier(path: str) -> None:
+    """Remove a shared frontier file (and its WAL files) to start a new crawl
+
+    Args:
+        path: The sqlite file path
+    """
+    for file_path in (path, path + "-wal", path + "-shm"):
+        if os.path.exists(file_path):
+            os.remove(file_path)
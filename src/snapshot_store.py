@@ -0,0 +1,272 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import List, Optional, Set
+
+from src.url_index import canonicalize_url, fingerprint_url
+
+DEFAULT_SNAPSHOT_PATH = os.path.join(os.path.expanduser("~"), ".cache", "web_scraper", "snapshots.sqlite")
+
+# The link sets staged by a crawl that did not stage a page for this long were left by a killed crawl
+STAGED_CRAWL_TTL_SEC = 24 * 60 * 60
+
+
+# Pure function
+def get_links_hash(links: List[str]) -> str:
+    """Get the hash of the link set of a page
+
+    Args:
+        links: The page links
+
+    Returns:
+        The hash (the same for the same links in any order)
+    """
+    return hashlib.blake2b("\n".join(sorted(set(links))).encode(), digest_size=16).hexdigest()
+
+
+class SnapshotStore:
+    def __init__(self, path: str, sample_ratio: float = 0.05, commit_every: int = 100) -> None:
+        """Init the snapshot store.
+
+        The store keeps the link set of each crawled page, with its hash, so the next snapshot run only checks
+        the links that appeared since. The page content is not hashed: a page with a date or an ad changes at each
+        run, while only its links matter here.
+
+        The links already known are not checked at all, so a link that went dead would never be found. A rotating
+        sample of them is checked at each run: the links are spread in 1/sample_ratio buckets by their fingerprint,
+        and each run checks the next bucket, so all the known links are checked again every 1/sample_ratio runs.
+        The links found dead are always checked again, so they are reported until they are fixed.
+
+        The link sets of a crawl are staged until it is done (see publish): the links of a stopped crawl are not all
+        checked, they must not be known by the next run.
+
+        Args:
+            path: The sqlite file path (created if it does not exist)
+            sample_ratio: The part of the known links checked again at each run (0 for none, 1 for all)
+            commit_every: The number of writes between two commits
+        """
+        self.commit_every = commit_every
+        self.buckets_cnt = max(1, round(1 / sample_ratio)) if sample_ratio > 0 else None
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.__lock = threading.Lock()
+        self.__connection = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self.__connection.execute(
+            "CREATE TABLE IF NOT EXISTS pages (url TEXT PRIMARY KEY, links_hash TEXT, links TEXT)"
+        )
+        self.__connection.execute(
+            "CREATE TABLE IF NOT EXISTS staged_pages "
+            "(crawl_id TEXT, url TEXT, links_hash TEXT, links TEXT, PRIMARY KEY (crawl_id, url))"
+        )
+        # When each crawl last staged a page
+        self.__connection.execute("CREATE TABLE IF NOT EXISTS staged_crawls (crawl_id TEXT PRIMARY KEY, seen_at REAL)")
+        self.__connection.execute("CREATE TABLE IF NOT EXISTS dead_links (url TEXT PRIMARY KEY)")
+        self.__connection.execute("CREATE TABLE IF NOT EXISTS runs (runs_cnt INTEGER)")
+        # Only the links that are dead are stored, so they are all loaded
+        self.__dead_links = {url for (url,) in self.__connection.execute("SELECT url FROM dead_links")}
+        row = self.__connection.execute("SELECT runs_cnt FROM runs").fetchone()
+        # The pool processes of a run open the store too, so the runs are only counted when the store is closed
+        # by the main process (see close)
+        self.run_number = row[0] if row is not None else 0
+        self.__pending_writes = 0
+        # The crawls staging link sets through this store (the other runs and processes may share the file)
+        self.__staged_crawl_ids = set()
+
+    def get_known_links(self, page_url: str, links: List[str]) -> Set[str]:
+        """Get the links of a page that were already in its last snapshot
+
+        Args:
+            page_url: The page url
+            links: The page links found by this run
+
+        Returns:
+            The known links (empty if the page is not stored)
+        """
+        with self.__lock:
+            row = self.__connection.execute(
+                "SELECT links_hash, links FROM pages WHERE url = ?", (canonicalize_url(page_url),)
+            ).fetchone()
+
+        if row is None:
+            return set()
+
+        links_hash, stored_links = row
+        if links_hash == get_links_hash(links):
+            # The links did not change, there is no need to load the stored ones
+            return set(links)
+
+        return set(json.loads(stored_links))
+
+    def is_sampled(self, link: str) -> bool:
+        """Check if a known link is in the sample checked by this run
+
+        Args:
+            link: The full link
+
+        Returns:
+            True if the link should be checked again
+        """
+        if self.buckets_cnt is None:
+            return False
+
+        return fingerprint_url(canonicalize_url(link)) % self.buckets_cnt == self.run_number % self.buckets_cnt
+
+    def is_dead(self, link: str) -> bool:
+        """Check if a link was dead when it was last checked
+
+        Args:
+            link: The full link
+
+        Returns:
+            True if the link should be checked again
+        """
+        return canonicalize_url(link) in self.__dead_links
+
+    def set_dead(self, link: str, is_dead: bool) -> None:
+        """Store the status of a checked link
+
+        Args:
+            link: The full link
+            is_dead: The link is dead
+        """
+        url = canonicalize_url(link)
+        # Most of the links stay alive, there is nothing to write for them
+        if (url in self.__dead_links) == is_dead:
+            return
+
+        with self.__lock:
+            if is_dead:
+                self.__dead_links.add(url)
+                self.__connection.execute("INSERT OR REPLACE INTO dead_links VALUES (?)", (url,))
+            else:
+                self.__dead_links.discard(url)
+                self.__connection.execute("DELETE FROM dead_links WHERE url = ?", (url,))
+            self._count_write()
+
+    def put(self, crawl_id: str, page_url: str, links: List[str]) -> None:
+        """Stage the link set of a page, until its crawl is published
+
+        Args:
+            crawl_id: The id of the crawl (see new_crawl_id)
+            page_url: The page url
+            links: The page links
+        """
+        with self.__lock:
+            self.__connection.execute(
+                "INSERT OR REPLACE INTO staged_pages VALUES (?, ?, ?, ?)",
+                (crawl_id, canonicalize_url(page_url), get_links_hash(links), json.dumps(sorted(set(links)))),
+            )
+            self.__connection.execute("INSERT OR REPLACE INTO staged_crawls VALUES (?, ?)", (crawl_id, time.time()))
+            self.__staged_crawl_ids.add(crawl_id)
+            self._count_write()
+
+    def publish(self, crawl_id: str) -> None:
+        """Store the link sets staged by a crawl that is done
+
+        Args:
+            crawl_id: The id of the crawl
+        """
+        with self.__lock:
+            self.__connection.execute(
+                "INSERT OR REPLACE INTO pages SELECT url, links_hash, links FROM staged_pages WHERE crawl_id = ?",
+                (crawl_id,),
+            )
+            self._drop_staged(crawl_id)
+            self._count_write()
+
+    def discard(self, crawl_id: str) -> None:
+        """Drop the link sets staged by a crawl that was stopped
+
+        Args:
+            crawl_id: The id of the crawl
+        """
+        with self.__lock:
+            self._drop_staged(crawl_id)
+            self._count_write()
+
+    @staticmethod
+    def new_crawl_id() -> str:
+        """Get the id staging the link sets of a crawl
+
+        Returns:
+            An id unique across the processes sharing the store
+        """
+        return uuid.uuid4().hex
+
+    def _drop_staged(self, crawl_id: str) -> None:
+        """Remove the link sets staged by a crawl (the lock must be held)
+
+        Args:
+            crawl_id: The id of the crawl
+        """
+        self.__connection.execute("DELETE FROM staged_pages WHERE crawl_id = ?", (crawl_id,))
+        self.__connection.execute("DELETE FROM staged_crawls WHERE crawl_id = ?", (crawl_id,))
+        self.__staged_crawl_ids.discard(crawl_id)
+
+    def _count_write(self) -> None:
+        """Commit once there are enough pending writes (the lock must be held)"""
+        self.__pending_writes += 1
+        if self.__pending_writes >= self.commit_every:
+            self.__connection.commit()
+            self.__pending_writes = 0
+
+    def commit(self) -> None:
+        """Commit the pending writes"""
+        with self.__lock:
+            self.__connection.commit()
+            self.__pending_writes = 0
+
+    def close(self) -> None:
+        """Count the run, commit the pending writes and close the store"""
+        with self.__lock:
+            # The crawls of this store that are not over were interrupted, another run may still be staging its own
+            for crawl_id in list(self.__staged_crawl_ids):
+                self._drop_staged(crawl_id)
+            expired_crawl_ids = self.__connection.execute(
+                "SELECT crawl_id FROM staged_crawls WHERE seen_at < ?", (time.time() - STAGED_CRAWL_TTL_SEC,)
+            ).fetchall()
+            for (crawl_id,) in expired_crawl_ids:
+                self._drop_staged(crawl_id)
+            self.__connection.execute("DELETE FROM runs")
+            self.__connection.execute("INSERT INTO runs VALUES (?)", (self.run_number + 1,))
+            self.__connection.commit()
+            self.__connection.close()
+
+
+# Shared by all the crawlers of a run. It is disabled (all the links are checked) until main.py configures it.
+_snapshot_store = None
+
+
+def configure_snapshot_store(path: Optional[str], sample_ratio: float = 0.05) -> Optional[SnapshotStore]:
+    """Replace the shared snapshot store
+
+    Args:
+        path: The sqlite file path, None disables the snapshot mode
+        sample_ratio: The part of the known links checked again at each run
+
+    Returns:
+        The new shared snapshot store
+    """
+    global _snapshot_store
+
+    if _snapshot_store is not None:
+        _snapshot_store.close()
+    _snapshot_store = SnapshotStore(path, sample_ratio) if path else None
+
+    return _snapshot_store
+
+
+def get_snapshot_store() -> Optional[SnapshotStore]:
+    """Get the shared snapshot store
+
+    Returns:
+        The shared snapshot store, None if the snapshot mode is disabled
+    """
+    return _snapshot_store
@@ -0,0 +1,306 @@
+import json
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+from urllib.parse import urlsplit
+
+# Upper bounds (in ms) of the latency histograms buckets, the last bucket holds the slower requests
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class CrawlStats:
+    def __init__(self) -> None:
+        """Init the crawl statistics.
+
+        The crawlers, scrapers and http client of a run report to the same statistics from several threads,
+        so every update holds the lock. They are only collected when --stats or --stats_json is given.
+        """
+        self.__lock = threading.Lock()
+        self.__started_at = time.perf_counter()
+        # phase -> [calls, total secs, max secs]
+        self.__phases = {}
+        # host -> {"requests", "bytes", "latency_sum_ms", "buckets"}
+        self.__hosts = {}
+        self.__counters = {"pages": 0, "links_checked": 0, "links_unchanged": 0, "connection_errors": 0}
+        self.__frontier = {"samples": 0, "size_sum": 0, "max_size": 0, "max_depth": 0}
+
+    def add_phase_time(self, phase: str, duration_sec: float) -> None:
+        """Add the duration of a call to a phase
+
+        Args:
+            phase: The phase name
+            duration_sec: The call duration
+        """
+        with self.__lock:
+            phase_stats = self.__phases.setdefault(phase, [0, 0.0, 0.0])
+            phase_stats[0] += 1
+            phase_stats[1] += duration_sec
+            phase_stats[2] = max(phase_stats[2], duration_sec)
+
+    def add_request(self, url: str, latency_sec: float, bytes_cnt: int = 0) -> None:
+        """Add a http request to its host statistics
+
+        Args:
+            url: The request url
+            latency_sec: The time until the response was received
+            bytes_cnt: The body size, if it was downloaded with the response
+        """
+        latency_ms = latency_sec * 1000
+        bucket = next(
+            (index for index, bound in enumerate(LATENCY_BUCKETS_MS) if latency_ms <= bound), len(LATENCY_BUCKETS_MS)
+        )
+
+        with self.__lock:
+            host_stats = self._get_host_stats(url)
+            host_stats["requests"] += 1
+            host_stats["bytes"] += bytes_cnt
+            host_stats["latency_sum_ms"] += latency_ms
+            host_stats["buckets"][bucket] += 1
+
+    def add_bytes(self, url: str, bytes_cnt: int) -> None:
+        """Add the bytes of a body read after the response (streamed)
+
+        Args:
+            url: The request url
+            bytes_cnt: The number of bytes read
+        """
+        with self.__lock:
+            self._get_host_stats(url)["bytes"] += bytes_cnt
+
+    def count(self, counter: str, increment: int = 1) -> None:
+        """Increment a counter
+
+        Args:
+            counter: The counter name (pages, links_checked or connection_errors)
+            increment: The increment
+        """
+        with self.__lock:
+            self.__counters[counter] += increment
+
+    def add_frontier_sample(self, size: int, depth: int) -> None:
+        """Sample the frontier when a link is taken from it
+
+        Args:
+            size: The number of links left in the frontier
+            depth: The depth of the taken link
+        """
+        with self.__lock:
+            self.__frontier["samples"] += 1
+            self.__frontier["size_sum"] += size
+            self.__frontier["max_size"] = max(self.__frontier["max_size"], size)
+            self.__frontier["max_depth"] = max(self.__frontier["max_depth"], depth)
+
+    def merge(self, snapshot: dict) -> None:
+        """Add the statistics of another process
+
+        Args:
+            snapshot: The to_dict() of the other process statistics
+        """
+        with self.__lock:
+            for phase, phase_stats in snapshot["phases"].items():
+                own_stats = self.__phases.setdefault(phase, [0, 0.0, 0.0])
+                own_stats[0] += phase_stats["calls"]
+                own_stats[1] += phase_stats["total_sec"]
+                own_stats[2] = max(own_stats[2], phase_stats["max_sec"])
+
+            for host, host_stats in snapshot["hosts"].items():
+                own_stats = self._get_host_stats(host, is_host=True)
+                for key in ("requests", "bytes", "latency_sum_ms"):
+                    own_stats[key] += host_stats[key]
+                own_stats["buckets"] = [a + b for a, b in zip(own_stats["buckets"], host_stats["buckets"])]
+
+            for counter, value in snapshot["counters"].items():
+                self.__counters[counter] += value
+
+            frontier = snapshot["frontier"]
+            self.__frontier["samples"] += frontier["samples"]
+            self.__frontier["size_sum"] += frontier["size_sum"]
+            self.__frontier["max_size"] = max(self.__frontier["max_size"], frontier["max_size"])
+            self.__frontier["max_depth"] = max(self.__frontier["max_depth"], frontier["max_depth"])
+
+    def to_dict(self) -> dict:
+        """Get the statistics as a json serializable dict
+
+        Returns:
+            The statistics
+        """
+        with self.__lock:
+            duration_sec = time.perf_counter() - self.__started_at
+            return {
+                "duration_sec": duration_sec,
+                "pages_per_sec": self.__counters["pages"] / duration_sec if duration_sec > 0 else 0.0,
+                "bytes": sum(host_stats["bytes"] for host_stats in self.__hosts.values()),
+                "counters": dict(self.__counters),
+                "frontier": dict(self.__frontier),
+                "phases": {
+                    phase: {"calls": calls, "total_sec": total_sec, "max_sec": max_sec}
+                    for phase, (calls, total_sec, max_sec) in self.__phases.items()
+                },
+                "latency_buckets_ms": list(LATENCY_BUCKETS_MS),
+                "hosts": {
+                    host: {**host_stats, "buckets": list(host_stats["buckets"])}
+                    for host, host_stats in self.__hosts.items()
+                },
+            }
+
+    def format_summary(self) -> str:
+        """Format the statistics as tables
+
+        Returns:
+            The summary
+        """
+        # tabulate is slow to import, and the summary is only printed with --stats
+        from tabulate import tabulate
+
+        stats = self.to_dict()
+        frontier = stats["frontier"]
+
+        totals = [
+            ["Duration (s)", f"{stats['duration_sec']:.2f}"],
+            ["Pages crawled", stats["counters"]["pages"]],
+            ["Links checked", stats["counters"]["links_checked"]],
+            ["Unchanged links skipped", stats["counters"]["links_unchanged"]],
+            ["Connection errors", stats["counters"]["connection_errors"]],
+            ["Pages/s", f"{stats['pages_per_sec']:.1f}"],
+            ["Bytes transferred", stats["bytes"]],
+            ["Frontier max size", frontier["max_size"]],
+            ["Frontier mean size", f"{frontier['size_sum'] / frontier['samples']:.1f}" if frontier["samples"] else 0],
+            ["Max depth", frontier["max_depth"]],
+        ]
+        phases = [
+            [
+                phase,
+                phase_stats["calls"],
+                f"{phase_stats['total_sec']:.3f}",
+                f"{phase_stats['total_sec'] / phase_stats['calls'] * 1000:.2f}",
+                f"{phase_stats['max_sec'] * 1000:.2f}",
+            ]
+            for phase, phase_stats in sorted(stats["phases"].items())
+        ]
+        hosts = [
+            [
+                host,
+                host_stats["requests"],
+                host_stats["bytes"],
+                f"{host_stats['latency_sum_ms'] / host_stats['requests']:.1f}" if host_stats["requests"] else "-",
+                get_percentile_bound(host_stats["buckets"], 0.5),
+                get_percentile_bound(host_stats["buckets"], 0.9),
+                get_percentile_bound(host_stats["buckets"], 0.99),
+            ]
+            for host, host_stats in sorted(stats["hosts"].items())
+        ]
+
+        return "\n\n".join(
+            [
+                tabulate(totals, headers=["Total", "Value"]),
+                tabulate(phases, headers=["Phase", "Calls", "Total (s)", "Mean (ms)", "Max (ms)"]),
+                tabulate(hosts, headers=["Host", "Requests", "Bytes", "Mean (ms)", "p50 (ms)", "p90 (ms)", "p99 (ms)"]),
+            ]
+        )
+
+    def _get_host_stats(self, url: str, is_host: bool = False) -> dict:
+        """Get (or create) the statistics of the url host (the lock must be held)
+
+        Args:
+            url: The url
+            is_host: url is already a host name
+
+        Returns:
+            The host statistics
+        """
+        host = url if is_host else urlsplit(url).hostname or ""
+
+        host_stats = self.__hosts.get(host)
+        if host_stats is None:
+            host_stats = {
+                "requests": 0,
+                "bytes": 0,
+                "latency_sum_ms": 0.0,
+                "buckets": [0] * (len(LATENCY_BUCKETS_MS) + 1),
+            }
+            self.__hosts[host] = host_stats
+
+        return host_stats
+
+
+# Pure function
+def get_percentile_bound(buckets: list, percentile: float) -> str:
+    """Get the upper bound of the histogram bucket holding a percentile
+
+    Args:
+        buckets: The histogram buckets counts (see LATENCY_BUCKETS_MS)
+        percentile: The percentile (between 0 and 1)
+
+    Returns:
+        The bucket upper bound in ms, as a string ("-" for an empty histogram)
+    """
+    total = sum(buckets)
+    if total == 0:
+        return "-"
+
+    cumulated = 0
+    for index, bucket_cnt in enumerate(buckets):
+        cumulated += bucket_cnt
+        if cumulated >= percentile * total:
+            return f"<={LATENCY_BUCKETS_MS[index]}" if index < len(LATENCY_BUCKETS_MS) else f">{LATENCY_BUCKETS_MS[-1]}"
+
+    return "-"
+
+
+# Shared by all the crawlers of a run. It is disabled (no overhead) until main.py configures it.
+_stats = None
+
+
+def configure_stats(enabled: bool) -> Optional[CrawlStats]:
+    """Replace the shared statistics
+
+    Args:
+        enabled: False disables the statistics
+
+    Returns:
+        The new shared statistics
+    """
+    global _stats
+
+    _stats = CrawlStats() if enabled else None
+
+    return _stats
+
+
+def get_stats() -> Optional[CrawlStats]:
+    """Get the shared statistics
+
+    Returns:
+        The shared statistics, None if they are disabled
+    """
+    return _stats
+
+
+@contextmanager
+def timed(phase: str) -> Iterator[None]:
+    """Add the duration of the with block to a phase of the shared statistics
+
+    Args:
+        phase: The phase name
+    """
+    stats = _stats
+    if stats is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.add_phase_time(phase, time.perf_counter() - start)
+
+
+def dump_stats(path: str) -> None:
+    """Write the shared statistics as json
+
+    Args:
+        path: The json file path
+    """
+    with open(path, "w") as file_handle:
+        json.dump(_stats.to_dict() if _stats is not None else {}, file_handle, indent=2)
@@ -0,0 +1,135 @@
+import re
+from typing import Iterable, Iterator, List, Tuple
+
+# Same regex as Scraper._get_links_from_body
+LINK_PATTERN = re.compile(
+    r"<a [\S]* ?href=[\'\"]?(/[^\'\">]+|http[s]?[^\r\n\t\f\v\"\']+)[\'\"]?|[^\'\"/](http[s]?://|www.)([\w_-]+(?:(?:\.[\w_-]+)+))([\w.,@?^=%&:/~+#-]*[\w@?^=%&/~+#-])?"
+)
+BODY_START_PATTERN = re.compile(r"<body[^\>]*>")
+BODY_END_TAG = "</body>"
+
+
+class StreamingLinkExtractor:
+    def __init__(self, max_link_length: int = 2048) -> None:
+        """Init the streaming link extractor.
+
+        The page is fed chunk by chunk and only the text that may hold a link cut by a chunk boundary is
+        kept, so the memory is bounded by the chunk size plus max_link_length instead of the page size.
+
+        Like Scraper._extract_body, only the links between the <body> tag and the last </body> tag are
+        extracted. The links found after a </body> tag are held until another </body> tag is found.
+        Unlike Scraper._extract_body, a page without a </body> tag (truncated page) still gives its links.
+
+        Args:
+            max_link_length: The length after which a link that may continue in the next chunk is cut
+        """
+        self.max_link_length = max_link_length
+
+        self.__buffer = ""
+        self.__in_body = False
+        self.__body_closed = False
+        self.__pending_links = []
+
+    def feed(self, chunk: str) -> Iterator[str]:
+        """Feed a chunk of the page
+
+        Args:
+            chunk: The chunk
+
+        Returns:
+            The links that can be confirmed with the text received so far
+        """
+        self.__buffer += chunk
+
+        if not self.__in_body:
+            match = BODY_START_PATTERN.search(self.__buffer)
+            if match is None:
+                # Keep what may be an incomplete <body ...> tag
+                tag_start = self.__buffer.rfind("<")
+                self.__buffer = self.__buffer[tag_start:] if tag_start != -1 else ""
+                return
+
+            self.__in_body = True
+            self.__buffer = self.__buffer[match.end() :]
+
+        end_tag_index = self.__buffer.find(BODY_END_TAG)
+        while end_tag_index != -1:
+            # The text before a </body> tag is inside the body, so everything found until it is confirmed
+            yield from self.__pending_links
+            self.__pending_links = []
+            links, _ = self._scan(self.__buffer[:end_tag_index], True)
+            yield from links
+
+            self.__body_closed = True
+            self.__buffer = self.__buffer[end_tag_index + len(BODY_END_TAG) :]
+            end_tag_index = self.__buffer.find(BODY_END_TAG)
+
+        # A part of the </body> tag may be at the end of the buffer, _scan always keeps it
+        links, self.__buffer = self._scan(self.__buffer, False)
+        if self.__body_closed:
+            # Only confirmed if another </body> tag follows
+            self.__pending_links.extend(links)
+        else:
+            yield from links
+
+    def close(self) -> Iterator[str]:
+        """Signal the end of the page
+
+        Returns:
+            The remaining links
+        """
+        if self.__in_body and not self.__body_closed:
+            links, _ = self._scan(self.__buffer, True)
+            yield from links
+
+        self.__buffer = ""
+        self.__pending_links = []
+
+    def _scan(self, text: str, is_final: bool) -> Tuple[List[str], str]:
+        """Extract the links of the text
+
+        Args:
+            text: The text to scan
+            is_final: No more text follows, all the matches are complete
+
+        Returns:
+            (links, rest). rest is the end of the text that may hold an incomplete link and must be scanned
+            again with the next chunk
+        """
+        links = []
+        # Only the matches starting in the last max_link_length characters may be incomplete. The ones
+        # starting before are already too long and are cut.
+        incomplete_start = len(text) if is_final else max(0, len(text) - self.max_link_length)
+        keep_from = incomplete_start
+
+        for match in LINK_PATTERN.finditer(text):
+            if match.start() >= incomplete_start:
+                keep_from = match.start()
+                break
+
+            href_link, text_link_scheme, text_link_host, text_link_path = match.groups()
+            if href_link:
+                links.append(href_link)
+            if text_link_scheme:
+                links.append(text_link_scheme + text_link_host + (text_link_path or ""))
+            keep_from = max(keep_from, match.end())
+
+        return links, text[keep_from:]
+
+
+def iter_links(chunks: Iterable[str], max_link_length: int = 2048) -> Iterator[str]:
+    """Extract the links from a page given by chunks
+
+    Args:
+        chunks: The page chunks
+        max_link_length: See StreamingLinkExtractor
+
+    Returns:
+        The links as they are found
+    """
+    extractor = StreamingLinkExtractor(max_link_length)
+
+    for chunk in chunks:
+        yield from extractor.feed(chunk)
+
+    yield from extractor.close()
@@ -0,0 +1,167 @@
+import hashlib
+from typing import Optional, Tuple, Union
+from urllib.parse import urlsplit, urlunsplit
+
+# Ports that are implied by the scheme, so http://hello.com:80 and http://hello.com are the same
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+# Pure function
+def canonicalize_url(url: str) -> str:
+    """Get the canonical form of a url.
+
+    The scheme and the host are lower cased, the default port, the trailing slash and the fragment are
+    removed and the query parameters are sorted. Anything that is not an absolute url is returned as is.
+
+    Args:
+        url: The url
+
+    Returns:
+        The canonical url
+    """
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        # Malformed urls (invalid port, ...) can't be normalized, but they still need to be checked
+        return url
+
+    if not parts.scheme or not parts.netloc:
+        return url
+
+    scheme = parts.scheme.lower()
+    netloc = parts.hostname or ""
+    if ":" in netloc:
+        # IPv6 hosts lose their brackets when parsed
+        netloc = f"[{netloc}]"
+    if parts.username or parts.password:
+        netloc = parts.netloc.rsplit("@", 1)[0] + "@" + netloc
+    if port is not None and port != DEFAULT_PORTS.get(scheme):
+        netloc += f":{port}"
+
+    path = parts.path.rstrip("/")
+
+    # We sort the raw "key=value" pairs (instead of parsing them) to keep the original encoding
+    query = "&".join(sorted(pair for pair in parts.query.split("&") if pair))
+
+    return urlunsplit((scheme, netloc, path, query, ""))
+
+
+# Pure function
+def fingerprint_url(url: str) -> int:
+    """Get the 64 bits fingerprint of a url.
+
+    Args:
+        url: The url
+
+    Returns:
+        The fingerprint
+    """
+    return int.from_bytes(hashlib.blake2b(url.encode(), digest_size=8).digest(), "big")
+
+
+# Pure function
+def split_url_prefix(url: str) -> Tuple[str, str]:
+    """Split a url after its host, so the urls of a host can share the same prefix string
+
+    Args:
+        url: The url
+
+    Returns:
+        (scheme://host prefix, rest of the url). The prefix is empty if the url is not absolute
+    """
+    host_start = url.find("://")
+    if host_start == -1:
+        return "", url
+
+    host_end = len(url)
+    for separator in "/?#":
+        position = url.find(separator, host_start + 3)
+        if position != -1 and position < host_end:
+            host_end = position
+
+    return url[:host_end], url[host_end:]
+
+
+# The digits of the host codes of the visited index
+HOST_CODE_DIGITS = b"0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ"
+# Starts the key of a url that is not absolute (never a host code digit)
+NO_HOST_CODE = b"!"
+
+
+# Pure function
+def encode_host_number(host_number: int) -> bytes:
+    """Encode the number of a host with the host code digits
+
+    Args:
+        host_number: The host number
+
+    Returns:
+        The host code
+    """
+    digits = [HOST_CODE_DIGITS[host_number % len(HOST_CODE_DIGITS)]]
+    host_number //= len(HOST_CODE_DIGITS)
+    while host_number:
+        digits.append(HOST_CODE_DIGITS[host_number % len(HOST_CODE_DIGITS)])
+        host_number //= len(HOST_CODE_DIGITS)
+
+    return bytes(digits)
+
+
+class VisitedIndex:
+    def __init__(self, compact: bool = False) -> None:
+        """Init the visited index.
+
+        The scheme://host prefix of the canonical urls is stored once: a url key is the short code of its host
+        followed by the rest of the url, as bytes (smaller than a str). The rest of an absolute url starts with
+        /, ? or # (or is empty), never with a host code digit, so two urls can't have the same key.
+
+        Args:
+            compact: Store 64 bits fingerprints instead of the urls to bound the memory usage.
+                A collision (very unlikely under a few billions urls) would skip a link.
+        """
+        self.compact = compact
+        self.__keys = set()
+        # {scheme://host prefix: host code}
+        self.__host_codes = {}
+
+    def _get_key(self, url: str, add_host: bool = False) -> Optional[Union[int, bytes]]:
+        """Get the key used to index the url
+
+        Args:
+            url: The url
+            add_host: Give a code to the host of the url if it has none
+
+        Returns:
+            The fingerprint of the canonical url in compact mode, else its key. None if the host has no code
+        """
+        canonical_url = canonicalize_url(url)
+        if self.compact:
+            return fingerprint_url(canonical_url)
+
+        prefix, rest = split_url_prefix(canonical_url)
+        if not prefix:
+            return NO_HOST_CODE + rest.encode()
+
+        host_code = self.__host_codes.get(prefix)
+        if host_code is None:
+            if not add_host:
+                return None
+            host_code = self.__host_codes[prefix] = encode_host_number(len(self.__host_codes))
+
+        return host_code + rest.encode()
+
+    def add(self, url: str) -> None:
+        """Add a url to the index
+
+        Args:
+            url: The url to add
+        """
+        self.__keys.add(self._get_key(url, add_host=True))
+
+    def __contains__(self, url: str) -> bool:
+        key = self._get_key(url)
+        return key is not None and key in self.__keys
+
+    def __len__(self) -> int:
+        return len(self.__keys)
@@ -1,26 +1,67 @@
+from typing import Optional
+
 from src.crawler import Crawler, CrawlerException
 from src.web_scrapper import WebScrapper
 
 
 class WebCrawler(Crawler):
     def __init__(
-        self, webpage_url: str, show_exception_tb: bool, throttle_duration_sec: int, disable_crawling: bool
+        self,
+        webpage_url: str,
+        show_exception_tb: bool,
+        throttle_duration_sec: int,
+        disable_crawling: bool,
+        concurrency: int = 1,
+        compact_visited_index: bool = False,
+        liveness_check: str = "head",
+        max_depth: Optional[int] = None,
+        max_pages: Optional[int] = None,
+        checkpoint_path: Optional[str] = None,
+        checkpoint_interval: int = 100,
+        resume: bool = False,
+        time_budget_sec: Optional[float] = None,
     ) -> None:
         """Init the web crawler object.
 
         Args:
             web_page_url: The web page url to crawl
             show_exception_tb: Enables exception trace back logging
+            concurrency: The number of concurrent fetchers
+            compact_visited_index: Store urls fingerprints instead of urls in the visited index
+            liveness_check: How the links that are not crawled are checked (one of LIVENESS_CHECKS)
+            max_depth: The maximum depth of the crawled pages, None for no limit
+            max_pages: The maximum number of crawled pages, None for no limit
+            checkpoint_path: The file where the crawl state is saved, None to disable the checkpoints
+            checkpoint_interval: The number of crawled pages between two checkpoints
+            resume: Continue the crawl from the checkpoint (if there is one)
+            time_budget_sec: Stop the crawl after this duration, None for no limit
         """
         webpage_url = WebCrawler._verify_url(webpage_url)
-        super().__init__(webpage_url, show_exception_tb, disable_crawling, throttle_duration_sec, WebScrapper)
+        super().__init__(
+            webpage_url,
+            show_exception_tb,
+            disable_crawling,
+            throttle_duration_sec,
+            WebScrapper,
+            concurrency,
+            compact_visited_index,
+            liveness_check,
+            max_depth,
+            max_pages,
+            checkpoint_path,
+            checkpoint_interval,
+            resume,
+            time_budget_sec,
+        )
 
     # Pure function
     def _get_root_route(self) -> str:
         return "/"
 
     def _verify_source_resource(self):
-        is_dead_link, _ = self._is_dead_link(self._resource)
+        # The root page is always scraped, so its body is kept. It is kept under the url the scraper will ask for
+        root_page = self._create_full_link(self._resource, self._get_root_route())
+        is_dead_link, _ = self._is_dead_link(root_page, keep_body=True)
         if is_dead_link:
             # If the web site is not accessible in the first place there is no need to continue
             raise CrawlerException(f"The source web page link ({self._resource}) is not accessible")
@@ -1,32 +1,164 @@
+import codecs
 import logging
+from typing import Iterator, Optional
+
 import requests
 
+from src.http_client import get_client
+from src.page_store import get_page_store
+from src import stream_extractor
 from src.scrapper import Scraper
+from src.stats import timed
 
 logger = logging.getLogger(__name__)
 
 
 class WebScrapper(Scraper):
+    @classmethod
+    def get_links(cls, resource: str, show_exception_tb: bool) -> list:
+        """Extract the links for the resource
+
+        In incremental mode (see page_store), a conditional request is sent and the stored links are
+        reused when the page did not change. The pages that are not html are not scraped (no links).
+
+        Args:
+            resource: The resource web link
+            show_exception_tb: Enables exception trace back logging
+
+        Returns:
+            The list of links
+        """
+        page_store = get_page_store()
+        headers = page_store.get_conditional_headers(resource) if page_store is not None else None
+
+        with timed("get_page_content"):
+            response = cls._get_response(resource, show_exception_tb, headers, stream=cls.extractor == "streaming")
+
+        if response is not None and response.status_code == 304:
+            # A 304 has no body, but a streamed response holds its pooled connection until it is closed
+            response.close()
+            links = page_store.get_links(resource)
+            if links is not None:
+                logger.debug("Not modified: %s", resource)
+                return links
+
+            # The page was removed from the store since the request was sent
+            response = cls._get_response(resource, show_exception_tb, stream=cls.extractor == "streaming")
+
+        if response is None:
+            return []
+
+        if cls.extractor == "streaming":
+            links = list(stream_extractor.iter_links(cls._iter_response_content(response)))
+        elif get_client().is_body_cut(response):
+            # The </body> tag was cut, the streaming extractor still gives the links found before the cut
+            links = list(stream_extractor.iter_links([cls._decode_content(response)]))
+        else:
+            links = cls._get_links_from_content(cls._decode_content(response))
+
+        if page_store is not None:
+            page_store.put(resource, response.headers.get("ETag"), response.headers.get("Last-Modified"), links)
+
+        return links
+
     @classmethod
     def _get_page_content(cls, resource: str, show_exception_tb: bool) -> str:
         """Get the page content
 
         Args:
-            resource: The resource web link 
+            resource: The resource web link
             show_exception_tb: Enables exception trace back logging
 
         Returns:
             The page content string on success else returns an empty string
         """
-        try:
-            response = requests.get(resource)
-            response.raise_for_status()
-
-        except Exception as e:
-            # Raising an Exception, the scraper is expected to be called on an existing page
-            logger.error("Failed to get page content for %s", resource)
-            if show_exception_tb:
-                logger.exception(e)
+        response = cls._get_response(resource, show_exception_tb)
+        if response is None:
             return ""
 
-        return response.content.decode()
+        return cls._decode_content(response)
+
+    # Pure function
+    @staticmethod
+    def _decode_content(response: requests.Response) -> str:
+        """Decode the downloaded body
+
+        Args:
+            response: The response
+
+        Returns:
+            The body string
+        """
+        # A body cut at max_body_bytes may end in the middle of a character, and a broken page must not stop
+        # the crawl, so the invalid bytes are replaced
+        return response.content.decode(errors="replace")
+
+    @classmethod
+    def _iter_page_content(cls, resource: str, show_exception_tb: bool) -> Iterator[str]:
+        """Get the page content chunk by chunk
+
+        Args:
+            resource: The resource web link
+            show_exception_tb: Enables exception trace back logging
+
+        Returns:
+            The page content chunks (no chunk on failure)
+        """
+        response = cls._get_response(resource, show_exception_tb, stream=True)
+        if response is not None:
+            yield from cls._iter_response_content(response)
+
+    @classmethod
+    def _iter_response_content(cls, response: requests.Response) -> Iterator[str]:
+        """Read and decode the response body chunk by chunk
+
+        Args:
+            response: The response
+
+        Returns:
+            The body chunks
+        """
+        # Decoded as utf-8 like the whole content in _get_page_content
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        for chunk in get_client().iter_body(response, cls.chunk_size):
+            yield decoder.decode(chunk)
+        yield decoder.decode(b"", final=True)
+
+    @classmethod
+    def _get_response(
+        cls, resource: str, show_exception_tb: bool, headers: dict = None, stream: bool = False
+    ) -> Optional[requests.Response]:
+        """Get the page response
+
+        Args:
+            resource: The resource web link
+            show_exception_tb: Enables exception trace back logging
+            headers: The request headers
+            stream: Do not download the body before it is read
+
+        Returns:
+            The response on success else None
+        """
+        client = get_client()
+
+        # The page was most likely downloaded by the dead link check just before
+        response = client.pop_prefetched(resource)
+        if response is None:
+            try:
+                response = client.get(resource, headers=headers, stream=stream)
+                response.raise_for_status()
+
+            except Exception as e:
+                # Raising an Exception, the scraper is expected to be called on an existing page
+                logger.error("Failed to get page content for %s", resource)
+                if show_exception_tb:
+                    logger.exception(e)
+                return None
+
+        if response.status_code != 304 and not client.is_scraped(response):
+            # An image, a pdf, ... linked as an internal page. Its body was not downloaded
+            logger.debug("Not scraped: %s (%s)", resource, response.headers.get("Content-Type"))
+            response.close()
+            return None
+
+        return response